@@ -1,71 +1,155 @@
 import os
 import sys
+import argparse
 import subprocess
-import re
+import json
+import wave
+import shutil
+import hashlib
+import tempfile
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from PIL import Image, ImageDraw, ImageFont
 import pyttsx3
 
+from script_parser import iter_utterances
+
 # --- Configuration ---
-AI_CLIPS_DIR = "ai_clips"
-SLIDES_DIR = "static_slides"
-AUDIO_DIR = "narration_audio"
+# Per-job scratch files, created inside the job's own work directory
 ASSEMBLY_LIST = "concat_list.txt"
+# Inputs for single-pass assembly
+SLIDE_LIST = "slide_list.txt"
+NARRATION_TRACK = "narration_full.wav"
+# Where job work directories are created; tmpfs keeps scratch I/O off the disk
+WORK_DIR_BASE = os.environ.get("VIDEO_WORK_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else None)
+# Build artifacts shared by every video
+VIDEO_CACHE_DIR = os.environ.get(
+    "VIDEO_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "video_cache")
+)
+# Synthesized lines, keyed by text, voice and rate
+NARRATION_CACHE_DIR = os.environ.get("NARRATION_CACHE_DIR", os.path.join(VIDEO_CACHE_DIR, "narration"))
+# Rendered slides and segment videos, named by a hash of everything that affects them
+ARTIFACT_DIR = os.path.join(VIDEO_CACHE_DIR, "artifacts")
+# One build manifest per script, listing the artifacts its last build used
+MANIFEST_DIR = os.path.join(VIDEO_CACHE_DIR, "manifests")
+TTS_RATE = 180  # Faster speech rate
+TTS_VOICE = os.environ.get("TTS_VOICE")  # pyttsx3 voice id; unset uses the system default
 
 # Use fallback background if the specified one doesn't exist
 BACKGROUND_IMG = r"C:\Users\anita\OneDrive\Desktop\genrate\WhatsApp Image 2025-08-05 at 12.05.43 PM.jpeg"
 INTRO_VIDEO_PATH = r"C:\Users\anita\OneDrive\Desktop\genrate\WhatsApp Video 2025-08-05 at 12.05.53 PM.mp4"
 INTRO_NARRATION = "Welcome to your lesson! Let's begin the adventure."
-# --- 1. Parse script into blocks ---
-def parse_script_to_blocks(script_path):
-    with open(script_path, encoding='utf-8') as f:
-        content = f.read()
-    # Split by Scene: pattern to match our enhanced script format
-    blocks = re.split(r'\n\s*Scene:\s*', content)
-    blocks = [blk.strip() for blk in blocks if blk.strip()]
-    return blocks
-
-# --- 1a. Extract each Pet utterance on its own slide ---
-def extract_pet_lines(block):
-    # Supports curly and straight quotes, and multi-line content
-    pet_lines = re.findall(r'Pet:\s*["\"](.*?)[\"\"]', block, re.DOTALL)
-    # Clean up the extracted text
-    cleaned_lines = []
-    for line in pet_lines:
-        # Remove extra whitespace and newlines
-        cleaned = re.sub(r'\s+', ' ', line.strip())
-        if cleaned:
-            cleaned_lines.append(cleaned)
-    return cleaned_lines
+SLIDE_SIZE = (800, 600)
+# Slides rendered, narrated and encoded at the same time
+RENDER_WORKERS = int(os.environ.get("VIDEO_RENDER_WORKERS", os.cpu_count() or 1))
+# Seconds a slide stays on screen after its narration ends
+NARRATION_PADDING = float(os.environ.get("VIDEO_NARRATION_PADDING", 0.75))
+# libx264 settings per encoding profile; None keeps ffmpeg's default.
+# "still" suits slides: nothing moves, so a few frames per second and
+# stillimage tuning look the same at a fraction of the encode time and size
+ENCODING_PROFILES = {
+    "default": {"fps": None, "preset": None, "crf": None, "keyint": None, "tune": None},
+    "still": {"fps": 2, "preset": "veryfast", "crf": 26, "keyint": 10, "tune": "stillimage"},
+}
+
+# --- 1. Slide background and fonts, prepared once per process ---
+def gradient_background(size=SLIDE_SIZE):
+    """Top-to-bottom white-to-blue gradient, built from one column instead of per-row draws"""
+    height = size[1]
+    column = Image.new("L", (1, height))
+    column.putdata([int(255 * (1 - y / height)) for y in range(height)])
+    shade = column.resize(size, Image.Resampling.NEAREST)
+    return Image.merge("RGB", (shade, shade, Image.new("L", size, 255)))
+
+class RenderContext:
+    """
+    Background image and fonts for a video job. The background is decoded,
+    converted and resized once; each slide draws on its own copy.
+    """
+
+    def __init__(self, background_path=BACKGROUND_IMG, size=SLIDE_SIZE):
+        self.size = size
+        self.background = self._load_background(background_path)
+        self.fonts = {}
+
+    def _load_background(self, background_path):
+        try:
+            # Try to use the specified background image
+            if not os.path.exists(background_path):
+                return gradient_background(self.size)
+            background = Image.open(background_path).convert("RGB")
+            # Resize for consistency
+            if background.size != self.size:
+                background = background.resize(self.size, Image.Resampling.LANCZOS)
+            return background
+        except Exception as e:
+            print(f"Background image error: {e}, using fallback")
+            # Fallback to simple background if image loading fails
+            return Image.new("RGB", self.size, color="lightblue")
+
+    def font(self, size=32):
+        if size not in self.fonts:
+            try:
+                self.fonts[size] = ImageFont.truetype("arial.ttf", size)
+            except OSError:
+                self.fonts[size] = ImageFont.load_default()
+        return self.fonts[size]
+
+    def new_slide(self):
+        return self.background.copy()
+
+_render_context = None
+
+def get_render_context():
+    global _render_context
+    if _render_context is None:
+        _render_context = RenderContext()
+    return _render_context
+
+def _init_render_worker(background_path):
+    # Runs once in each pool process so slides never reload the background
+    global _render_context
+    _render_context = RenderContext(background_path)
 
 # --- 2. Generate slide with TTS narration ---
-def generate_slide_video(text, img_path, audio_path, out_path, duration=15):
-    # Load the background image and resize it to consistent dimensions
+def wav_duration(path):
+    """Length of a WAV file in seconds from its header, or None if it can't be read"""
     try:
-        # Try to use the specified background image
-        if os.path.exists(BACKGROUND_IMG):
-            background = Image.open(BACKGROUND_IMG).convert("RGB")
-        else:
-            # Create a simple gradient background
-            background = Image.new("RGB", (800, 600), color="lightblue")
-            draw = ImageDraw.Draw(background)
-            # Create a simple gradient effect
-            for y in range(600):
-                color = int(255 * (1 - y / 600))
-                draw.line([(0, y), (800, y)], fill=(color, color, 255))
-        
-        # Resize to 800x600 for consistency
-        background = background.resize((800, 600), Image.Resampling.LANCZOS)
-    except Exception as e:
-        print(f"Background image error: {e}, using fallback")
-        # Fallback to simple background if image loading fails
-        background = Image.new("RGB", (800, 600), color="lightblue")
-    
-    img = background.copy()
+        with wave.open(path, "rb") as wav:
+            rate = wav.getframerate()
+            return wav.getnframes() / rate if rate else None
+    except (OSError, EOFError, wave.Error):
+        return None
+
+def encoding_settings(profile="default", **overrides):
+    """Settings of a named profile with any non-None overrides applied"""
+    if profile not in ENCODING_PROFILES:
+        raise ValueError(f"Unknown encoding profile: {profile}")
+    settings = dict(ENCODING_PROFILES[profile])
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return settings
+
+def video_encode_args(settings):
+    """ffmpeg output options for the video stream"""
+    args = ["-c:v", "libx264"]
+    if settings.get("preset"):
+        args += ["-preset", settings["preset"]]
+    if settings.get("tune"):
+        args += ["-tune", settings["tune"]]
+    if settings.get("crf") is not None:
+        args += ["-crf", str(settings["crf"])]
+    if settings.get("keyint"):
+        args += ["-g", str(settings["keyint"])]
+    if settings.get("fps"):
+        args += ["-r", str(settings["fps"])]
+    return args + ["-pix_fmt", "yuv420p"]
+
+def render_slide_image(text, img_path, context=None):
+    """Draw the word-wrapped text on a copy of the background and save it"""
+    context = context or get_render_context()
+    img = context.new_slide()
     draw = ImageDraw.Draw(img)
-    try:
-        font = ImageFont.truetype("arial.ttf", 32)
-    except:
-        font = ImageFont.load_default()
+    font = context.font(32)
     
     # Word wrap text
     lines = []
@@ -88,34 +172,102 @@ def generate_slide_video(text, img_path, audio_path, out_path, duration=15):
         y_offset += 50
     
     img.save(img_path)
-    
-    # Narration
+
+def write_silence(audio_path, duration, framerate=22050):
+    """Write `duration` seconds of 16-bit mono silence as a WAV file"""
+    with wave.open(audio_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(framerate)
+        wav.writeframes(b"\x00\x00" * int(duration * framerate))
+
+def synthesize_narration(text, audio_path, duration=15):
+    """Speak text into a WAV file, writing `duration` seconds of silence if TTS fails"""
     try:
         engine = pyttsx3.init()
-        engine.setProperty('rate', 180)  # Faster speech rate
+        engine.setProperty('rate', TTS_RATE)
         engine.save_to_file(text, audio_path)
         engine.runAndWait()
     except Exception as e:
         print(f"TTS error: {e}, creating silent audio")
         # Create a silent audio file as fallback
-        silent_cmd = [
-            "ffmpeg", "-y", "-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=44100",
-            "-t", str(duration), "-c:a", "aac", audio_path
-        ]
-        try:
-            subprocess.run(silent_cmd, check=True)
-        except:
-            print("Failed to create silent audio")
-    
-    # Create video from image and audio
+        write_silence(audio_path, duration)
+
+class NarrationService:
+    """
+    One TTS engine per job. synthesize() queues every line that isn't in the
+    content-addressed WAV cache and speaks them all in a single runAndWait(),
+    so engine startup is paid once and repeated lines cost nothing.
+    """
+
+    def __init__(self, cache_dir=NARRATION_CACHE_DIR, voice=TTS_VOICE, rate=TTS_RATE):
+        self.cache_dir = cache_dir
+        self.voice = voice
+        self.rate = rate
+        self.hits = 0
+        self.misses = 0
+        self._engine = None
+
+    def _get_engine(self):
+        if self._engine is None:
+            engine = pyttsx3.init()
+            engine.setProperty('rate', self.rate)
+            if self.voice:
+                engine.setProperty('voice', self.voice)
+            self._engine = engine
+        return self._engine
+
+    def cache_path(self, text):
+        key = hashlib.sha256(f"{self.voice or 'default'}\0{self.rate}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def synthesize(self, texts):
+        """Return a cached WAV path per text, or None where synthesis failed"""
+        paths = [self.cache_path(text) for text in texts]
+        pending = {}
+        for text, path in zip(texts, paths):
+            if os.path.exists(path) or path in pending:
+                self.hits += 1
+            else:
+                self.misses += 1
+                pending[path] = text
+
+        if pending:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Speak into temp names so an interrupted run never leaves a truncated cache entry
+            temp_paths = {path: f"{path}.{os.getpid()}.tmp.wav" for path in pending}
+            try:
+                engine = self._get_engine()
+                for path, text in pending.items():
+                    engine.save_to_file(text, temp_paths[path])
+                engine.runAndWait()
+            except Exception as e:
+                print(f"TTS error: {e}")
+            for path, temp_path in temp_paths.items():
+                if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
+                    os.replace(temp_path, path)
+                elif os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+        return [path if os.path.exists(path) else None for path in paths]
+
+    def summary(self):
+        return f"Narration cache: {self.hits} hits, {self.misses} lines synthesized"
+
+def encode_segment(img_path, audio_path, out_path, duration, settings):
+    """Encode one still slide with its narration into an MP4 of `duration` seconds"""
+    # apad fills the padding with silence and -t stops the encoder once the
+    # narration (plus padding) is over. Reading the still image at the output
+    # rate avoids decoding frames that get dropped
+    input_rate = ["-framerate", str(settings["fps"])] if settings.get("fps") else []
     cmd = [
-        "ffmpeg", "-y", "-loop", "1", "-i", img_path, "-i", audio_path,
-        "-c:v", "libx264", "-t", str(duration), "-pix_fmt", "yuv420p",
-        "-c:a", "aac", "-ar", "44100", "-ac", "1", "-shortest", out_path
+        "ffmpeg", "-y", "-loop", "1", *input_rate, "-i", img_path, "-i", audio_path,
+        *video_encode_args(settings), "-t", f"{duration:.3f}",
+        "-af", "apad", "-c:a", "aac", "-ar", "44100", "-ac", "1", out_path
     ]
     try:
         subprocess.run(cmd, check=True)
-        print(f"Generated slide video: {out_path}")
+        print(f"Generated slide video: {out_path} ({duration:.1f}s)")
         return True
     except FileNotFoundError:
         print("ERROR: FFmpeg not found! Please install FFmpeg and add to PATH.")
@@ -125,59 +277,324 @@ def generate_slide_video(text, img_path, audio_path, out_path, duration=15):
         print(f"FFmpeg error: {e}")
         return False
 
+def generate_slide_video(text, img_path, audio_path, out_path, duration=15, context=None,
+                         pad=NARRATION_PADDING, profile="default"):
+    """
+    Render, narrate and encode one slide. The segment lasts as long as the
+    narration plus `pad` seconds; `duration` is only used when the narration
+    length can't be read. `profile` is an ENCODING_PROFILES name or a dict
+    from encoding_settings(). Returns the segment length in seconds, or None on failure.
+    """
+    settings = profile if isinstance(profile, dict) else encoding_settings(profile)
+    render_slide_image(text, img_path, context)
+    synthesize_narration(text, audio_path, duration)
+    spoken = wav_duration(audio_path)
+    if spoken:
+        duration = spoken + pad
+    return duration if encode_segment(img_path, audio_path, out_path, duration, settings) else None
+
 # --- 3. Generate intro slide with TTS and same parameters as slides ---
-def generate_intro_slide(narration_text, img_path, audio_path, out_path, duration=15):
-    return generate_slide_video(narration_text, img_path, audio_path, out_path, duration)
+def generate_intro_slide(narration_text, img_path, audio_path, out_path, duration=15,
+                         pad=NARRATION_PADDING, profile="default"):
+    return generate_slide_video(narration_text, img_path, audio_path, out_path, duration, pad=pad, profile=profile)
 
-# --- 4. Main orchestration ---
-def main():
-    # Check command line arguments
-    if len(sys.argv) != 3:
-        print("[ERROR] Usage: python complete_video_current.py <input_script_path> <output_video_path>")
-        sys.exit(1)
-    
-    script_file = sys.argv[1]
-    final_video = sys.argv[2]
-    
-    # Check if input script exists
-    if not os.path.exists(script_file):
-        print(f"[ERROR] Script file not found: {script_file}")
-        sys.exit(1)
-    
-    # Create output directory if it doesn't exist
-    os.makedirs(os.path.dirname(final_video), exist_ok=True)
-    
-    # Create working directories
-    for d in [AI_CLIPS_DIR, SLIDES_DIR, AUDIO_DIR]:
-        os.makedirs(d, exist_ok=True)
+# --- 4. Render all segments in parallel ---
+def _run_in_pool(task, segments, workers, *task_args, progress=None):
+    """
+    Run task(segment, *task_args) for every segment on a process pool.
+    Returns a list of (result, error) in input order; error is None when
+    the task returned a truthy result. progress(done, total) is called as
+    segments finish, in completion order.
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, workers), initializer=_init_render_worker,
+                             initargs=(BACKGROUND_IMG,)) as executor:
+        futures = [executor.submit(task, segment, *task_args) for segment in segments]
+        if progress:
+            for done, _ in enumerate(as_completed(futures), 1):
+                progress(done, len(futures))
+        for future in futures:
+            result = None
+            try:
+                result = future.result()
+                error = None if result else "rendering failed"
+            except Exception as e:
+                error = str(e)
+            results.append((result, error))
+    return results
 
-    print(f"[INFO] Processing script: {script_file}")
-    blocks = parse_script_to_blocks(script_file)
-    all_pet_lines = []
-    for block in blocks:
-        pet_lines = extract_pet_lines(block)
-        all_pet_lines.extend(pet_lines)
+def _temp_path(path):
+    # Keeps the extension so PIL and ffmpeg still pick the right format
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}.tmp{ext}"
 
-    print(f"[INFO] Found {len(all_pet_lines)} Pet lines to process")
+def _render_slide_once(text, img_path):
+    # Artifacts are content-addressed, so an existing file is already up to date
+    if not os.path.exists(img_path):
+        temp_path = _temp_path(img_path)
+        render_slide_image(text, temp_path)
+        os.replace(temp_path, img_path)
 
-    # Generate intro slide (replace/modify narration as needed)
-    intro_slide = os.path.join(SLIDES_DIR, "slide_intro.png")
-    intro_audio = os.path.join(AUDIO_DIR, "narration_intro.wav")
-    intro_vid = os.path.join(SLIDES_DIR, "slidevid_intro.mp4")
-    
-    print("[INFO] Generating intro slide...")
-    generate_intro_slide(INTRO_NARRATION, intro_slide, intro_audio, intro_vid, duration=8)
-
-    video_segments = [intro_vid]
-    for i, pet_line in enumerate(all_pet_lines, 1):
-        print(f"\n[Slide+TTS] Pet line {i}: {pet_line[:50]}...")
-        slide_path = os.path.join(SLIDES_DIR, f"slide_{i:03d}.png")
-        audio_path = os.path.join(AUDIO_DIR, f"narration_{i:03d}.wav")
-        out_vid = os.path.join(SLIDES_DIR, f"slidevid_{i:03d}.mp4")
-        if generate_slide_video(pet_line, slide_path, audio_path, out_vid, duration=30):
+def _render_segment(segment, pad, profile):
+    # Narration was synthesized up front by narrate_segments()
+    text, img_path, audio_path, out_path, duration = segment
+    settings = profile if isinstance(profile, dict) else encoding_settings(profile)
+    spoken = wav_duration(audio_path)
+    if spoken:
+        duration = spoken + pad
+    if os.path.exists(out_path):
+        return duration
+    _render_slide_once(text, img_path)
+    temp_path = _temp_path(out_path)
+    if not encode_segment(img_path, audio_path, temp_path, duration, settings):
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return None
+    os.replace(temp_path, out_path)
+    return duration
+
+def render_segments(segments, workers=RENDER_WORKERS, pad=NARRATION_PADDING, profile="default", progress=None):
+    """
+    Render (text, img_path, audio_path, out_path, duration) segments on a
+    process pool. Returns a list of (out_path, seconds, error) in input
+    order; error is None for segments that rendered successfully.
+    """
+    results = _run_in_pool(_render_segment, segments, workers, pad, profile, progress=progress)
+    return [(segment[3], seconds, error) for segment, (seconds, error) in zip(segments, results)]
+
+def _prepare_segment(segment, pad):
+    text, img_path, audio_path, _, duration = segment
+    _render_slide_once(text, img_path)
+    spoken = wav_duration(audio_path)
+    return spoken + pad if spoken else duration
+
+def prepare_segments(segments, workers=RENDER_WORKERS, pad=NARRATION_PADDING, progress=None):
+    """Render slide images only, returning (seconds, error) per segment"""
+    return _run_in_pool(_prepare_segment, segments, workers, pad, progress=progress)
+
+def narrate_segments(segments, narration):
+    """
+    Synthesize every segment's narration with one engine in this process and
+    point each segment at its cached WAV. Lines that fail get a silent track
+    at the segment's own audio path.
+    """
+    cached = narration.synthesize([segment[0] for segment in segments])
+    narrated = []
+    for (text, img_path, audio_path, out_path, duration), wav_path in zip(segments, cached):
+        if wav_path is None:
+            print(f"[WARNING] No narration for: {text[:50]}..., using silence")
+            write_silence(audio_path, duration)
+            wav_path = audio_path
+        narrated.append((text, img_path, wav_path, out_path, duration))
+    print(f"[INFO] {narration.summary()}")
+    return narrated
+
+# --- 5. Incremental builds: content-addressed artifacts and manifests ---
+@contextlib.contextmanager
+def job_work_dir(keep=False):
+    """Private scratch directory for one job, removed when the job ends unless `keep`"""
+    base = WORK_DIR_BASE if WORK_DIR_BASE and os.access(WORK_DIR_BASE, os.W_OK) else None
+    work_dir = tempfile.mkdtemp(prefix="video_job_", dir=base)
+    try:
+        yield work_dir
+    finally:
+        if keep:
+            print(f"[INFO] Kept work directory: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+@contextlib.contextmanager
+def cache_lock():
+    """
+    Exclusive lock on the shared artifact cache, held while a job claims
+    artifacts in its manifest and while it deletes orphans, so one job's
+    cleanup never removes files another job is about to use.
+    """
+    os.makedirs(VIDEO_CACHE_DIR, exist_ok=True)
+    with open(os.path.join(VIDEO_CACHE_DIR, ".lock"), "a+b") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    # LK_LOCK gives up after ~10 seconds, so keep retrying
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _digest(*parts):
+    return hashlib.sha256("\0".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+def _is_cached_narration(audio_path):
+    return os.path.dirname(os.path.abspath(audio_path)) == os.path.abspath(NARRATION_CACHE_DIR)
+
+def plan_artifacts(segments, pad, settings):
+    """
+    Point each segment's slide and video at content-addressed artifact
+    paths. The slide hash covers the text and background; the video hash
+    adds the narration, padding and encoding settings. An unchanged line
+    therefore maps to the files its previous build left behind.
+    """
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    encoding = json.dumps(settings, sort_keys=True)
+    planned = []
+    for text, _, audio_path, _, duration in segments:
+        slide_key = _digest("slide", text, BACKGROUND_IMG, SLIDE_SIZE)
+        # Cached narration is named by its content; a silent fallback only by its length
+        audio_key = os.path.basename(audio_path) if _is_cached_narration(audio_path) else f"silence:{duration}"
+        video_key = _digest("video", slide_key, audio_key, pad, encoding)
+        planned.append((
+            text,
+            os.path.join(ARTIFACT_DIR, f"{slide_key}.png"),
+            audio_path,
+            os.path.join(ARTIFACT_DIR, f"{video_key}.mp4"),
+            duration
+        ))
+    return planned
+
+def manifest_path(script_file):
+    script_file = os.path.abspath(script_file)
+    name = os.path.splitext(os.path.basename(script_file))[0]
+    return os.path.join(MANIFEST_DIR, f"{name}-{_digest(script_file)[:12]}.json")
+
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _manifest_artifacts(manifest):
+    artifacts = set()
+    for entry in (manifest or {}).get("segments", []):
+        artifacts.update(entry[kind] for kind in ("slide", "audio", "video") if entry.get(kind))
+    return artifacts
+
+def save_manifest(path, script_file, segments, settings, existing_only=True):
+    """
+    Record which artifacts each line of this build used, relative to
+    VIDEO_CACHE_DIR. With existing_only=False every planned artifact is
+    listed, which claims files before they have been rendered.
+    """
+    def artifact(file_path):
+        if existing_only and not os.path.exists(file_path):
+            return None
+        return os.path.relpath(file_path, VIDEO_CACHE_DIR)
+    entries = []
+    for text, img_path, audio_path, out_path, _ in segments:
+        entries.append({
+            "text_hash": _digest(text),
+            "slide": artifact(img_path),
+            "audio": artifact(audio_path) if _is_cached_narration(audio_path) else None,
+            "video": artifact(out_path),
+        })
+    manifest = {"script": os.path.abspath(script_file), "settings": settings, "segments": entries}
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    temp_path = _temp_path(path)
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, path)
+
+def clean_orphans(previous):
+    """Delete artifacts the previous build used that no manifest references any more"""
+    referenced = set()
+    for name in os.listdir(MANIFEST_DIR):
+        if name.endswith(".json"):
+            referenced |= _manifest_artifacts(load_manifest(os.path.join(MANIFEST_DIR, name)))
+    removed = 0
+    for artifact in _manifest_artifacts(previous) - referenced:
+        try:
+            os.remove(os.path.join(VIDEO_CACHE_DIR, artifact))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+# --- 6. Assemble the final video ---
+def _silence(nchannels, sampwidth, nframes):
+    # 8-bit WAV samples are unsigned, so their silence is 0x80 rather than 0
+    sample = b"\x80" if sampwidth == 1 else b"\x00" * sampwidth
+    return sample * nchannels * nframes
+
+def concat_narration(audio_paths, durations, out_path):
+    """
+    Join WAV files into one track, padding each with silence to its slide's
+    duration. Returns False when the files don't share one sample format.
+    """
+    params = None
+    for path in audio_paths:
+        try:
+            with wave.open(path, "rb") as wav:
+                current = (wav.getnchannels(), wav.getsampwidth(), wav.getframerate())
+        except (OSError, EOFError, wave.Error):
+            continue
+        if params is None:
+            params = current
+        elif current != params:
+            return False
+    # No narration at all: a silent mono track still keeps the timing
+    nchannels, sampwidth, framerate = params or (1, 2, 22050)
+
+    with wave.open(out_path, "wb") as out:
+        out.setnchannels(nchannels)
+        out.setsampwidth(sampwidth)
+        out.setframerate(framerate)
+        for path, duration in zip(audio_paths, durations):
+            target = int(round(duration * framerate))
+            written = 0
+            try:
+                with wave.open(path, "rb") as wav:
+                    frames = wav.readframes(target)
+                out.writeframes(frames)
+                written = len(frames) // (sampwidth * nchannels)
+            except (OSError, EOFError, wave.Error):
+                pass
+            if target > written:
+                out.writeframes(_silence(nchannels, sampwidth, target - written))
+    return True
+
+def write_image_list(image_paths, durations, list_path):
+    """Concat-demuxer input that shows each image for its duration"""
+    def entry(path):
+        return "file '" + os.path.abspath(path).replace("'", "'\\''") + "'\n"
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("ffconcat version 1.0\n")
+        for path, duration in zip(image_paths, durations):
+            f.write(entry(path))
+            f.write(f"duration {duration:.3f}\n")
+        # The demuxer ignores the last entry's duration unless the file is repeated
+        if image_paths:
+            f.write(entry(image_paths[-1]))
+
+def _stage(progress, stage):
+    # Adapts a progress(stage, done, total) reporter to the pool's progress(done, total)
+    if progress is None:
+        return None
+    return lambda done, total: progress(stage, done, total)
+
+def assemble_segments(segments, final_video, work_dir, workers, pad, settings, progress=None):
+    """Encode one MP4 per slide, then join them with the concat demuxer. Returns the length in seconds."""
+    video_segments = []
+    total_seconds = 0.0
+    for i, (out_vid, seconds, error) in enumerate(render_segments(segments, workers, pad, settings, _stage(progress, "rendering"))):
+        label = "intro" if i == 0 else f"line {i}"
+        if error is None:
             video_segments.append(out_vid)
+            total_seconds += seconds
         else:
-            print(f"[WARNING] Failed to generate video for line {i}")
+            print(f"[WARNING] Failed to generate video for {label}: {error}")
 
     print(f"[INFO] Generated {len(video_segments)} video segments")
     
@@ -187,7 +604,8 @@ def main():
         pass
 
     # Create concatenation list
-    with open(ASSEMBLY_LIST, "w") as f:
+    assembly_list = os.path.join(work_dir, ASSEMBLY_LIST)
+    with open(assembly_list, "w") as f:
         for path in video_segments:
             if os.path.exists(path):
                 f.write(f"file '{os.path.abspath(path)}'\n")
@@ -197,20 +615,170 @@ def main():
     # Improved concatenation with consistent parameters
     concat_cmd = [
         "ffmpeg", "-y", "-f", "concat", "-safe", "0",
-        "-i", ASSEMBLY_LIST, 
+        "-i", assembly_list, 
         "-c:v", "copy",  # Copy video stream without re-encoding
         "-c:a", "copy",  # Copy audio stream without re-encoding
         "-avoid_negative_ts", "make_zero",
         final_video
     ]
+    if progress:
+        progress("assembling", 0, 1)
     try:
         subprocess.run(concat_cmd, check=True)
-        print(f"\n[SUCCESS] Final video created: {final_video}")
-        print(f"[INFO] Duration: ~{len(video_segments) * 30 // 60} minutes")
+        return total_seconds
     except FileNotFoundError:
         print("ERROR: FFmpeg not found for final concatenation!")
     except subprocess.CalledProcessError as e:
         print(f"Concatenation error: {e}")
+    return None
+
+def assemble_single_pass(segments, final_video, work_dir, workers, pad, settings, progress=None):
+    """
+    Render every slide image and narration, then encode the whole lesson in
+    one ffmpeg run from an image list and a single narration track. Falls
+    back to per-segment assembly if the narration files can't be joined.
+    Returns the length in seconds.
+    """
+    images, audio, durations = [], [], []
+    for i, (segment, (seconds, error)) in enumerate(zip(segments, prepare_segments(segments, workers, pad, _stage(progress, "rendering")))):
+        label = "intro" if i == 0 else f"line {i}"
+        if error is None:
+            images.append(segment[1])
+            audio.append(segment[2])
+            durations.append(seconds)
+        else:
+            print(f"[WARNING] Failed to prepare slide for {label}: {error}")
+
+    if not images:
+        print("[ERROR] No slides to assemble")
+        return None
+
+    narration_track = os.path.join(work_dir, NARRATION_TRACK)
+    slide_list = os.path.join(work_dir, SLIDE_LIST)
+    if not concat_narration(audio, durations, narration_track):
+        print("[WARNING] Narration files differ in format, falling back to per-segment assembly")
+        return assemble_segments(segments, final_video, work_dir, workers, pad, settings, progress)
+    write_image_list(images, durations, slide_list)
+
+    total_seconds = sum(durations)
+    # The image list has no frame rate of its own, so always set one
+    settings = dict(settings, fps=settings.get("fps") or 25)
+    cmd = [
+        "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", slide_list, "-i", narration_track,
+        *video_encode_args(settings), "-t", f"{total_seconds:.3f}",
+        "-c:a", "aac", "-ar", "44100", "-ac", "1", final_video
+    ]
+    if progress:
+        progress("assembling", 0, 1)
+    try:
+        subprocess.run(cmd, check=True)
+        return total_seconds
+    except FileNotFoundError:
+        print("ERROR: FFmpeg not found! Please install FFmpeg and add to PATH.")
+    except subprocess.CalledProcessError as e:
+        print(f"FFmpeg error: {e}")
+    return None
+
+# --- 7. Main orchestration ---
+def build_video(script_file, final_video, jobs=RENDER_WORKERS, pad=NARRATION_PADDING, settings=None,
+                assembly="segments", keep_workdir=False, progress=None):
+    """
+    Turn a lesson script into final_video. progress(stage, done, total) is
+    called as the job moves through narrating, rendering and assembling.
+    Returns the video length in seconds, or None if assembly failed.
+    """
+    # Create output directory if it doesn't exist
+    os.makedirs(os.path.dirname(final_video) or ".", exist_ok=True)
+    
+    print(f"[INFO] Processing script: {script_file}")
+    # Each Pet utterance gets its own slide
+    all_pet_lines = [utterance.text for utterance in iter_utterances(script_file, speaker="Pet")]
+
+    print(f"[INFO] Found {len(all_pet_lines)} Pet lines to process")
+
+    settings = settings or encoding_settings()
+    manifest_file = manifest_path(script_file)
+
+    # Scratch files live in a private directory so concurrent jobs never collide
+    with job_work_dir(keep_workdir) as work_dir:
+        # Intro slide first (replace/modify narration as needed), then one slide per Pet line.
+        # Slide and video paths are filled in by plan_artifacts()
+        segments = [(INTRO_NARRATION, None, os.path.join(work_dir, "narration_intro.wav"), None, 8)]
+        for i, pet_line in enumerate(all_pet_lines, 1):
+            segments.append((pet_line, None, os.path.join(work_dir, f"narration_{i:03d}.wav"), None, 15))
+
+        if progress:
+            progress("narrating", 0, len(segments))
+        # TTS runs here, once, before the parallel stage. It needs no lock: cached
+        # WAVs are content-addressed and appear through atomic renames
+        narration = NarrationService()
+        segments = narrate_segments(segments, narration)
+        with cache_lock():
+            segments = plan_artifacts(segments, pad, settings)
+            reusable = [segment[3] if assembly == "segments" else segment[1] for segment in segments]
+            reused = sum(1 for path in reusable if os.path.exists(path))
+            # Claim every planned artifact so other jobs' cleanup leaves them alone
+            previous = load_manifest(manifest_file)
+            save_manifest(manifest_file, script_file, segments, settings, existing_only=False)
+        # Another job's cleanup may have removed a WAV between synthesis and the
+        # claim; now that it is claimed, speak it again
+        missing = [segment for segment in segments if _is_cached_narration(segment[2]) and not os.path.exists(segment[2])]
+        if missing:
+            print(f"[INFO] Re-synthesizing {len(missing)} narration lines removed by another job")
+            for (text, *_), wav_path in zip(missing, narration.synthesize([segment[0] for segment in missing])):
+                if wav_path is None:
+                    print(f"[WARNING] Could not re-synthesize narration for: {text[:50]}...")
+        print(f"[INFO] Reusing {reused} of {len(segments)} segments from earlier builds")
+
+        print(f"[INFO] Rendering {len(segments)} segments with {jobs} workers ({assembly} assembly)...")
+        if assembly == "single":
+            total_seconds = assemble_single_pass(segments, final_video, work_dir, jobs, pad, settings, progress)
+        else:
+            total_seconds = assemble_segments(segments, final_video, work_dir, jobs, pad, settings, progress)
+
+    # Record what this build produced and drop artifacts that only the previous one used
+    with cache_lock():
+        save_manifest(manifest_file, script_file, segments, settings)
+        removed = clean_orphans(previous)
+    if removed:
+        print(f"[INFO] Removed {removed} stale artifacts")
+
+    if total_seconds is not None:
+        print(f"\n[SUCCESS] Final video created: {final_video}")
+        print(f"[INFO] Duration: {int(total_seconds // 60)}m {total_seconds % 60:.0f}s")
+    return total_seconds
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a lesson script into a narrated slide video")
+    parser.add_argument("script_file", help="Input script (Chunk/Scene/Pet format)")
+    parser.add_argument("final_video", help="Output video path")
+    parser.add_argument("--jobs", type=int, default=RENDER_WORKERS,
+                        help="Slides to render in parallel (default: VIDEO_RENDER_WORKERS or CPU count)")
+    parser.add_argument("--pad", type=float, default=NARRATION_PADDING,
+                        help="Seconds each slide stays up after its narration ends")
+    parser.add_argument("--profile", choices=sorted(ENCODING_PROFILES), default="default",
+                        help="Encoding profile; 'still' is tuned for static slides")
+    parser.add_argument("--preset", help="libx264 preset, overriding the profile")
+    parser.add_argument("--crf", type=int, help="libx264 CRF, overriding the profile")
+    parser.add_argument("--fps", type=float, help="Output frame rate, overriding the profile")
+    parser.add_argument("--keyint", type=int, help="Maximum frames between keyframes, overriding the profile")
+    parser.add_argument("--assembly", choices=["segments", "single"], default="segments",
+                        help="'segments' encodes one MP4 per slide and joins them; "
+                             "'single' encodes the whole lesson in one ffmpeg pass")
+    parser.add_argument("--keep-workdir", action="store_true",
+                        help="Keep the job's scratch directory for debugging")
+    args = parser.parse_args()
+
+    # Check if input script exists
+    if not os.path.exists(args.script_file):
+        print(f"[ERROR] Script file not found: {args.script_file}")
+        sys.exit(1)
+
+    settings = encoding_settings(args.profile, preset=args.preset, crf=args.crf, fps=args.fps, keyint=args.keyint)
+    total_seconds = build_video(args.script_file, args.final_video, jobs=args.jobs, pad=args.pad,
+                                settings=settings, assembly=args.assembly, keep_workdir=args.keep_workdir)
+    if total_seconds is None:
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,20 +2,23 @@ import os
 import sys
 import PyPDF2
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF using PyPDF2"""
+# Shared helpers live next to the dashboard's pdfProcessor.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'lib'))
+from extraction_cache import cached_extract_pages
+
+def _extract_pages(pdf_path):
     try:
         with open(pdf_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text.strip()
+            return [page.extract_text() or '' for page in reader.pages]
     except Exception as e:
         print(f"Error extracting text: {e}")
-        return ""
+        return []
+
+def extract_text_from_pdf(pdf_path):
+    """Extract text from PDF using PyPDF2"""
+    pages = cached_extract_pages(pdf_path, 'pypdf2', 1, _extract_pages)
+    return "\n".join(page for page in pages if page).strip()
 
 def main():
     if len(sys.argv) != 2:
@@ -3,35 +3,38 @@ import sys
 import PyPDF2
 import pdfplumber
 import gc
-from ollama import chat  # Official Python client
+from ollama import Client  # Official Python client
 
-def extract_text_from_pdf(pdf_path):
-    text = ''
+# Shared helpers live next to the dashboard's pdfProcessor.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'lib'))
+from extraction_cache import cached_extract_pages
+from llm_pool import generate_in_order, LLM_CONCURRENCY, LLM_TIMEOUT, LLM_CONTEXT_TOKENS, LLM_REPLY_TOKENS
+from llm_cache import LLMCache
+from text_chunker import iter_chunks, chunk_budget, CHUNK_OVERLAP_TOKENS
+
+# Shared by the generation threads; the timeout bounds each chunk request
+OLLAMA_CLIENT = Client(timeout=LLM_TIMEOUT)
+LESSON_MODEL = "gemma3n"
+LLM_CACHE = LLMCache()
+
+def _extract_pages(pdf_path):
     try:
         with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ''
+            return [page.extract_text() or '' for page in pdf.pages]
     except Exception as e:
         print(f"[ERROR] pdfplumber failed on {pdf_path}: {e}, trying PyPDF2...")
         try:
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() or ''
+                return [page.extract_text() or '' for page in pdf_reader.pages]
         except Exception as e2:
             print(f"[ERROR] PyPDF2 also failed: {e2}")
-    return text
+    return []
 
-def chunk_text(text, max_chars=4500, overlap=700):
-    start = 0
-    length = len(text)
-    while start < length:
-        end = min(start + max_chars, length)
-        yield text[start:end]
-        start += max_chars - overlap
+def extract_text_from_pdf(pdf_path):
+    return ''.join(cached_extract_pages(pdf_path, 'pdfplumber+pypdf2', 1, _extract_pages))
 
-def generate_lesson_script(raw_text, subject, chunk_idx=None):
-    prompt = f"""You are Gemma 3n, an expert children's script generator. Transform the given raw lesson text into only the pet's spoken lines, organized with chunk and scene headings exactly as in this example:
+LESSON_PROMPT_TEMPLATE = """You are Gemma 3n, an expert children's script generator. Transform the given raw lesson text into only the pet's spoken lines, organized with chunk and scene headings exactly as in this example:
 
 Chunk 1: Introduction  
 Pet: "Hello, superstar learners! I'm Pippin the Puppy, and today we're going on an amazing adventure—right inside your wonderful body! We'll sing, clap, wiggle, and explore all the parts that make you, you! Are you ready? Let's go!"
@@ -56,23 +59,39 @@ One little body that belongs to me!"
 Pet: "That's right—your body is yours, a special gift to play, learn, and grow!"
 this is the format in which you have to generate the script and stick to the format do not generating anything like actions sepcification or additional. but keep it engaging
 Raw Lesson Text:  
-{raw_text}
+{text}
 
 Instructions:  
 - Produce only the "Chunk/Scene" headings and the Pet's lines in this exact format.  
 - Do not include any other narration, stage directions, or metadata.  
 - Preserve line breaks and punctuation as shown.  
 """
+
+# Each chunk fills whatever the context window has left after the prompt and the reply
+CHUNK_TOKENS = chunk_budget(LLM_CONTEXT_TOKENS, LESSON_PROMPT_TEMPLATE, LLM_REPLY_TOKENS)
+LLM_OPTIONS = {'num_ctx': LLM_CONTEXT_TOKENS}
+
+def request_lesson_script(raw_text, chunk_idx=None):
+    """Generate the Pet script for one chunk; errors propagate to the caller"""
+    cached = LLM_CACHE.get(LESSON_MODEL, LESSON_PROMPT_TEMPLATE, raw_text)
+    if cached is not None:
+        print(f"[CACHE] Chunk {chunk_idx} served from LLM response cache.")
+        return cached
+    prompt = LESSON_PROMPT_TEMPLATE.format(text=raw_text)
+    response = OLLAMA_CLIENT.chat(model=LESSON_MODEL, messages=[{"role": "user", "content": prompt}], options=LLM_OPTIONS)
+    result = response['message']['content'].strip()
+    print(f"[SUCCESS] Chunk {chunk_idx} generated successfully.")
+    LLM_CACHE.put(LESSON_MODEL, LESSON_PROMPT_TEMPLATE, raw_text, result)
+    return result
+
+def generate_lesson_script(raw_text, subject, chunk_idx=None):
     try:
-        response = chat(model="gemma3n", messages=[{"role": "user", "content": prompt}])
-        result = response['message']['content']
-        print(f"[SUCCESS] Chunk {chunk_idx} generated successfully.")
-        return result.strip()
+        return request_lesson_script(raw_text, chunk_idx=chunk_idx)
     except Exception as e:
         print(f"[ERROR] Error in generating lesson: {e}")
         return "[Error: Ollama generation failed]"
 
-def run_script_generation(pdf_path, script_path):
+def run_script_generation(pdf_path, script_path, concurrency=None):
     if not os.path.exists(pdf_path):
         print(f"[ERROR] PDF file not found: {pdf_path}")
         return
@@ -86,24 +105,36 @@ def run_script_generation(pdf_path, script_path):
         print(f"[WARNING] Extracted text is empty for: {pdf_path}")
         return
     
-    chunks = list(chunk_text(raw_text, max_chars=4500, overlap=700))
+    chunks = list(iter_chunks(raw_text, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS))
     print(f"[INFO] File: {os.path.basename(pdf_path)} | Total chunks: {len(chunks)}")
 
     with open(script_path, 'w', encoding='utf-8') as f:
         f.write("")  # Clear file
 
-    for idx, chunk in enumerate(chunks, 1):
+    def generate_chunk(idx, chunk):
         print(f"[PROCESSING] Processing chunk {idx} ({len(chunk)} chars)...")
-        lesson_script = generate_lesson_script(chunk, "lesson", chunk_idx=idx)
+        return request_lesson_script(chunk, chunk_idx=idx)
+
+    def chunk_failed(idx, error):
+        print(f"[ERROR] Error in generating lesson for chunk {idx}: {error}")
+        return "[Error: Ollama generation failed]"
+
+    # Chunks are generated concurrently but appended to the script in order
+    for idx, lesson_script in generate_in_order(chunks, generate_chunk, concurrency=concurrency or LLM_CONCURRENCY,
+                                                on_error=chunk_failed):
         with open(script_path, 'a', encoding='utf-8') as f:
             f.write(f"\n---\n[Script for Chunk {idx}]\n{lesson_script}\n")
         gc.collect()
         print(f"[SAVED] Appended chunk {idx} to {script_path}")
 
     print(f"[FINISHED] Script saved to: {script_path}")
+    print(f"[INFO] {LLM_CACHE.summary()}")
 
 # === RUN SCRIPT ===
 if __name__ == "__main__":
+    if "--no-llm-cache" in sys.argv:
+        sys.argv.remove("--no-llm-cache")
+        LLM_CACHE.bypass = True
     if len(sys.argv) > 1:
         # Get PDF path from command line argument
         pdf_path = sys.argv[1]
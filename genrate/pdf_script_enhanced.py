@@ -4,19 +4,18 @@ import PyPDF2
 import pdfplumber
 import re
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF using multiple methods"""
-    text = ""
-    
+# Shared helpers live next to the dashboard's pdfProcessor.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'lib'))
+from extraction_cache import cached_extract_pages
+
+def _extract_pages(pdf_path):
+    """Extract page texts using multiple methods"""
     # Try pdfplumber first
     try:
         with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        if text.strip():
-            return text.strip()
+            pages = [page.extract_text() or '' for page in pdf.pages]
+        if any(page.strip() for page in pages):
+            return pages
     except Exception as e:
         print(f"pdfplumber failed: {e}")
     
@@ -24,36 +23,15 @@ def extract_text_from_pdf(pdf_path):
     try:
         with open(pdf_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text.strip()
+            return [page.extract_text() or '' for page in reader.pages]
     except Exception as e:
         print(f"PyPDF2 failed: {e}")
-        return ""
+        return []
 
-def chunk_text(text, chunk_size=500):
-    """Split text into chunks for processing"""
-    words = text.split()
-    chunks = []
-    current_chunk = []
-    current_length = 0
-    
-    for word in words:
-        if current_length + len(word) + 1 <= chunk_size:
-            current_chunk.append(word)
-            current_length += len(word) + 1
-        else:
-            if current_chunk:
-                chunks.append(' '.join(current_chunk))
-            current_chunk = [word]
-            current_length = len(word)
-    
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
-    
-    return chunks
+def extract_text_from_pdf(pdf_path):
+    """Extract text from PDF, one line break between pages"""
+    pages = cached_extract_pages(pdf_path, 'pdfplumber-or-pypdf2', 1, _extract_pages)
+    return "\n".join(page for page in pages if page).strip()
 
 def generate_detailed_lesson_script(text):
     """Generate a detailed educational script with multiple scenes"""
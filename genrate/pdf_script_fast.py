@@ -4,19 +4,22 @@ import PyPDF2
 import pdfplumber
 import re
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF using multiple methods"""
-    text = ""
-    
+# Shared helpers live next to the dashboard's pdfProcessor.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'lib'))
+from extraction_cache import cached_extract_pages
+from text_chunker import iter_chunks
+
+# No model is involved, so this only sets how much text feeds each "Chunk" of the script
+FAST_CHUNK_TOKENS = 1000
+
+def _extract_pages(pdf_path):
+    """Extract page texts using multiple methods"""
     # Try pdfplumber first
     try:
         with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        if text.strip():
-            return text.strip()
+            pages = [page.extract_text() or '' for page in pdf.pages]
+        if any(page.strip() for page in pages):
+            return pages
     except Exception as e:
         print(f"pdfplumber failed: {e}")
     
@@ -24,44 +27,15 @@ def extract_text_from_pdf(pdf_path):
     try:
         with open(pdf_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text.strip()
+            return [page.extract_text() or '' for page in reader.pages]
     except Exception as e:
         print(f"PyPDF2 failed: {e}")
-        return ""
+        return []
 
-def chunk_text(text, max_chars=4000):
-    """Split text into chunks"""
-    if len(text) <= max_chars:
-        return [text]
-    
-    chunks = []
-    current_chunk = ""
-    
-    for paragraph in text.split('\n'):
-        if len(current_chunk) + len(paragraph) > max_chars:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = paragraph
-            else:
-                # If paragraph is too long, split it
-                words = paragraph.split()
-                for word in words:
-                    if len(current_chunk) + len(word) + 1 > max_chars:
-                        chunks.append(current_chunk.strip())
-                        current_chunk = word
-                    else:
-                        current_chunk += " " + word if current_chunk else word
-        else:
-            current_chunk += "\n" + paragraph if current_chunk else paragraph
-    
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
-    
-    return chunks
+def extract_text_from_pdf(pdf_path):
+    """Extract text from PDF, one line break between pages"""
+    pages = cached_extract_pages(pdf_path, 'pdfplumber-or-pypdf2', 1, _extract_pages)
+    return "\n".join(page for page in pages if page).strip()
 
 def generate_simple_script(text_chunks):
     """Generate a simple script without AI"""
@@ -117,7 +91,7 @@ def main():
         sys.exit(1)
     
     # Split into chunks
-    chunks = chunk_text(text)
+    chunks = list(iter_chunks(text, FAST_CHUNK_TOKENS, overlap_tokens=0))
     print(f"[INFO] File: {os.path.basename(pdf_path)} | Total chunks: {len(chunks)}")
     
     # Generate simple script
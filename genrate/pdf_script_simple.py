@@ -3,22 +3,26 @@ import sys
 import PyPDF2
 import pdfplumber
 
-def extract_text_from_pdf(pdf_path):
-    text = ''
+# Shared helpers live next to the dashboard's pdfProcessor.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'lib'))
+from extraction_cache import cached_extract_pages
+
+def _extract_pages(pdf_path):
     try:
         with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ''
+            return [page.extract_text() or '' for page in pdf.pages]
     except Exception as e:
         print(f"[ERROR] pdfplumber failed on {pdf_path}: {e}, trying PyPDF2...")
         try:
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() or ''
+                return [page.extract_text() or '' for page in pdf_reader.pages]
         except Exception as e2:
             print(f"[ERROR] PyPDF2 also failed: {e2}")
-    return text
+    return []
+
+def extract_text_from_pdf(pdf_path):
+    return ''.join(cached_extract_pages(pdf_path, 'pdfplumber+pypdf2', 1, _extract_pages))
 
 def generate_simple_script(raw_text):
     """Generate a simple educational script without using Ollama"""
@@ -0,0 +1,218 @@
+"""
+Streaming parser for the Chunk/Scene/Pet lesson scripts written by pdf_script.py.
+
+Reads one line at a time and yields an Utterance per quoted speaker line, so
+a full-book script parses in a single linear pass with constant memory.
+Straight and curly quotes are both accepted, and an utterance may span any
+number of lines (blank ones included) until its closing quote.
+
+    python script_parser.py scripts/aemr101_script.txt
+    python script_parser.py --benchmark --size-mb 20
+"""
+
+import os
+import re
+import time
+import argparse
+import tempfile
+import tracemalloc
+from typing import NamedTuple, Optional
+
+OPEN_QUOTES = '"“'
+CLOSE_QUOTES = '"”'
+
+# "Chunk 1: Intro", "Scene 2: Eyes", "Scene: Summary", "[Script for Chunk 3]"
+HEADING = re.compile(r'^(?:\[Script for\s+)?(chunk|scene)\b([^:\]]{0,20})[:\]]\s*(.*)$', re.IGNORECASE)
+# 'Pet: "...', also with markdown bold around the speaker ("**Pet:** ...")
+SPEAKER = re.compile(r'^([A-Za-z][\w ]{0,30}?)\**:\**\s*[' + OPEN_QUOTES + r'](.*)$')
+
+class Utterance(NamedTuple):
+    chunk: Optional[str]   # chunk number or title the line belongs to
+    scene: Optional[str]   # scene title
+    speaker: str
+    text: str              # whitespace-collapsed, without the quotes
+    line: int              # 1-based source line where the utterance starts
+
+def _clean(line):
+    line = line.strip()
+    # Drop markdown decoration Gemma sometimes wraps around headings and speakers
+    if line and (line[0] in '*#>' or line[-1] in '*#'):
+        line = line.strip('*#> ').strip()
+    return line
+
+def _heading(line):
+    # Cheap first-character test keeps the regex off most lines
+    if line[:1] not in 'CcSs[':
+        return None
+    match = HEADING.match(line)
+    if match is None:
+        return None
+    kind, label, title = match.groups()
+    return kind.lower(), label.strip() or None, title.strip('* ') or None
+
+def _is_boundary(line):
+    # Every heading and speaker line has a ':' or ']', so plain continuation lines skip the regexes
+    if ':' not in line and ']' not in line:
+        return line.startswith('---')
+    return _heading(line) is not None or SPEAKER.match(line) is not None
+
+def _finish(chunk, scene, speaker, parts, start, closed):
+    text = ' '.join(parts)
+    if not closed:
+        # No line ended on a quote: keep what came before the last closing quote,
+        # dropping trailing stage directions like '"Hi!" she waves'
+        cut = max(text.rfind(quote) for quote in CLOSE_QUOTES)
+        if cut >= 0:
+            text = text[:cut]
+    text = ' '.join(text.split())
+    return Utterance(chunk, scene, speaker, text, start) if text else None
+
+def parse_script(lines):
+    """Yield an Utterance for every quoted speaker line in an iterable of script lines"""
+    chunk = scene = None
+    speaker = None
+    parts = []
+    start = 0
+    for number, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if line and (line[0] in '*#>' or line[-1] in '*#'):
+            line = _clean(line)
+        if speaker is not None:
+            if not _is_boundary(line):
+                if line and line[-1] in CLOSE_QUOTES:
+                    parts.append(line[:-1])
+                    utterance = _finish(chunk, scene, speaker, parts, start, closed=True)
+                    if utterance:
+                        yield utterance
+                    speaker = None
+                else:
+                    parts.append(line)
+                continue
+            # A new heading or speaker ends an utterance that never closed its quote
+            utterance = _finish(chunk, scene, speaker, parts, start, closed=False)
+            if utterance:
+                yield utterance
+            speaker = None
+
+        heading = _heading(line)
+        if heading:
+            kind, label, title = heading
+            if kind == 'chunk':
+                chunk, scene = label or title, None
+            else:
+                scene = title or label
+            continue
+
+        match = SPEAKER.match(line)
+        if match is None:
+            continue
+        speaker, rest = match.group(1).strip(), match.group(2).rstrip()
+        start = number
+        if rest and rest[-1] in CLOSE_QUOTES:
+            # Most utterances open and close on one line
+            text = ' '.join(rest[:-1].split())
+            if text:
+                yield Utterance(chunk, scene, speaker, text, start)
+            speaker = None
+        else:
+            parts = [rest]
+
+    if speaker is not None:
+        utterance = _finish(chunk, scene, speaker, parts, start, closed=False)
+        if utterance:
+            yield utterance
+
+def iter_utterances(script_path, speaker=None):
+    """Stream utterances from a script file, optionally only those of one speaker"""
+    with open(script_path, encoding='utf-8') as f:
+        for utterance in parse_script(f):
+            if speaker is None or utterance.speaker == speaker:
+                yield utterance
+
+# --- Benchmark ---
+def _legacy_pet_lines(script_path):
+    # The regex parser this module replaced, kept for comparison
+    with open(script_path, encoding='utf-8') as f:
+        content = f.read()
+    lines = []
+    for block in re.split(r'\n\s*Scene:\s*', content):
+        for line in re.findall(r'Pet:\s*["\"](.*?)[\"\"]', block, re.DOTALL):
+            cleaned = re.sub(r'\s+', ' ', line.strip())
+            if cleaned:
+                lines.append(cleaned)
+    return lines
+
+SAMPLE_SCENE = '''Scene {n}: Learning Point {n}
+Pet: “Let's learn about counting! One, two, three,
+    four little ducks went out one day.
+
+    Can you count them with me?”
+Pet: "Great job! Now clap {n} times with me."
+
+'''
+
+def _write_sample(size_mb):
+    fd, path = tempfile.mkstemp(suffix='_script.txt')
+    target = int(size_mb * 1024 * 1024)
+    written = 0
+    chunk = 0
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        while written < target:
+            chunk += 1
+            block = f"\n---\n[Script for Chunk {chunk}]\n" + ''.join(SAMPLE_SCENE.format(n=n) for n in range(1, 21))
+            f.write(block)
+            written += len(block.encode('utf-8'))
+    return path
+
+def _measure(parse, path):
+    started = time.perf_counter()
+    count = parse(path)
+    elapsed = time.perf_counter() - started
+    # Memory is measured on a second run; tracing would distort the timing
+    tracemalloc.start()
+    parse(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+def benchmark(paths, size_mb):
+    generated = None
+    if not paths:
+        generated = _write_sample(size_mb)
+        paths = [generated]
+    try:
+        for path in paths:
+            size = os.path.getsize(path) / (1024 * 1024)
+            print(f"[BENCH] {os.path.basename(path)} ({size:.1f} MB)")
+            for name, parse in (
+                ('streaming', lambda p: sum(1 for _ in iter_utterances(p, speaker='Pet'))),
+                ('legacy regex', lambda p: len(_legacy_pet_lines(p))),
+            ):
+                count, elapsed, peak = _measure(parse, path)
+                print(f"  {name:<13} {count:>8} Pet lines  {elapsed:6.2f}s  "
+                      f"{size / elapsed if elapsed else 0:7.1f} MB/s  peak {peak / (1024 * 1024):7.1f} MB")
+    finally:
+        if generated:
+            os.remove(generated)
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse Chunk/Scene/Pet lesson scripts")
+    parser.add_argument("scripts", nargs="*", help="Script files to parse")
+    parser.add_argument("--speaker", help="Only show lines from this speaker")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Time the parser against the old regex one (on a generated script if no files are given)")
+    parser.add_argument("--size-mb", type=float, default=10, help="Size of the generated benchmark script")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.scripts, args.size_mb)
+        return
+    if not args.scripts:
+        parser.error("give at least one script file, or --benchmark")
+    for path in args.scripts:
+        for utterance in iter_utterances(path, args.speaker):
+            print(f"{path}:{utterance.line} [chunk {utterance.chunk or '-'} | {utterance.scene or '-'}] "
+                  f"{utterance.speaker}: {utterance.text}")
+
+if __name__ == "__main__":
+    main()
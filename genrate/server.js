@@ -2,12 +2,51 @@ const express = require('express');
 const path = require('path');
 const fs = require('fs').promises;
 const fsSync = require('fs');
-const { exec } = require('child_process');
+const { exec, spawn } = require('child_process');
 const { promisify } = require('util');
+const crypto = require('crypto');
 
 const execAsync = promisify(exec);
 const app = express();
 const PORT = process.env.PORT || 3003;
+// Video jobs are queued as files and picked up by video_queue.py workers
+const VIDEO_QUEUE_DIR = process.env.VIDEO_QUEUE_DIR || path.join(__dirname, 'video_jobs');
+// Worker processes started with the server; 0 means they are run separately
+const VIDEO_WORKERS = parseInt(process.env.VIDEO_WORKERS || '2', 10);
+
+async function writeJsonAtomic(filePath, data) {
+  const tempPath = `${filePath}.${process.pid}.tmp`;
+  await fs.writeFile(tempPath, JSON.stringify(data));
+  await fs.rename(tempPath, filePath);
+}
+
+async function queueVideoJob(scriptPath, outputPath, options = {}) {
+  // Same id format as video_queue.py: sortable by submission time
+  const jobId = `${Date.now()}-${crypto.randomBytes(4).toString('hex')}`;
+  await fs.mkdir(path.join(VIDEO_QUEUE_DIR, 'pending'), { recursive: true });
+  await fs.mkdir(path.join(VIDEO_QUEUE_DIR, 'status'), { recursive: true });
+  await writeJsonAtomic(path.join(VIDEO_QUEUE_DIR, 'status', `${jobId}.json`), {
+    id: jobId, state: 'queued', videoPath: outputPath, updated_at: Date.now() / 1000
+  });
+  await writeJsonAtomic(path.join(VIDEO_QUEUE_DIR, 'pending', `${jobId}.json`), {
+    id: jobId, scriptPath, outputPath, options
+  });
+  return jobId;
+}
+
+function startVideoWorkers() {
+  if (VIDEO_WORKERS <= 0) {
+    return;
+  }
+  const pool = spawn('python', ['video_queue.py', 'worker', '--workers', String(VIDEO_WORKERS)], {
+    cwd: __dirname,
+    stdio: 'inherit',
+    env: { ...process.env, VIDEO_QUEUE_DIR }
+  });
+  pool.on('exit', (code) => {
+    console.error(`Video worker pool exited with code ${code}`);
+  });
+}
 
 // Middleware
 app.use(express.json());
@@ -19,22 +58,35 @@ app.get('/', (req, res) => {
   res.sendFile(path.join(__dirname, 'dist', 'index.html'));
 });
 
+// Chapter lists by subject directory, reused until the directory's mtime
+// changes (a PDF added, removed or renamed)
+const chapterCache = new Map();
+
+async function listChapters(subject) {
+  const subjectPath = path.join(__dirname, 'books', `class1_${subject}[1]`);
+  const { mtimeMs } = await fs.stat(subjectPath);
+  const cached = chapterCache.get(subjectPath);
+  if (cached && cached.mtimeMs === mtimeMs) {
+    return cached.chapters;
+  }
+
+  const files = await fs.readdir(subjectPath);
+  const pdfFiles = files.filter(file => file.endsWith('.pdf')).sort();
+
+  const chapters = pdfFiles.map((file, index) => ({
+    id: index + 1,
+    name: `Chapter ${index + 1}`,
+    filename: file,
+    path: `/books/class1_${subject}[1]/${file}`
+  }));
+  chapterCache.set(subjectPath, { mtimeMs, chapters });
+  return chapters;
+}
+
 // API Routes
 app.get('/api/chapters/:subject', async (req, res) => {
   try {
-    const { subject } = req.params;
-    const subjectPath = path.join(__dirname, 'books', `class1_${subject}[1]`);
-    
-    const files = await fs.readdir(subjectPath);
-    const pdfFiles = files.filter(file => file.endsWith('.pdf'));
-    
-    const chapters = pdfFiles.map((file, index) => ({
-      id: index + 1,
-      name: `Chapter ${index + 1}`,
-      filename: file,
-      path: `/books/class1_${subject}[1]/${file}`
-    }));
-    
+    const chapters = await listChapters(req.params.subject);
     res.json({ chapters });
   } catch (error) {
     console.error('Error reading chapters:', error);
@@ -92,21 +144,34 @@ app.post('/api/generate-video', async (req, res) => {
       console.log('Corrected script path:', actualScriptPath);
     }
     
-    const { stdout, stderr } = await execAsync(`python complete_video_current.py "${actualScriptPath}" "${outputPath}"`);
-    
-    if (stderr) {
-      console.error('Video generation error:', stderr);
-    }
+    // Queue the job and answer right away; clients poll /api/jobs/:id
+    const jobId = await queueVideoJob(actualScriptPath, outputPath);
+    console.log('Queued video job:', jobId);
     
-    res.json({ 
+    res.status(202).json({ 
       success: true, 
-      message: 'Video generation completed',
-      output: stdout,
+      message: 'Video generation queued',
+      jobId,
+      statusUrl: `/api/jobs/${jobId}`,
       videoPath: outputPath
     });
   } catch (error) {
-    console.error('Error generating video:', error);
-    res.status(500).json({ error: 'Failed to generate video' });
+    console.error('Error queueing video:', error);
+    res.status(500).json({ error: 'Failed to queue video generation' });
+  }
+});
+
+app.get('/api/jobs/:id', async (req, res) => {
+  const { id } = req.params;
+  if (!/^[\w-]+$/.test(id)) {
+    return res.status(400).json({ error: 'Invalid job id' });
+  }
+  try {
+    const status = await fs.readFile(path.join(VIDEO_QUEUE_DIR, 'status', `${id}.json`), 'utf8');
+    res.set('Cache-Control', 'no-store');
+    res.json(JSON.parse(status));
+  } catch (error) {
+    res.status(404).json({ error: 'Job not found' });
   }
 });
 
@@ -134,4 +199,5 @@ app.get('*', (req, res) => {
 app.listen(PORT, () => {
   console.log(`Server running on port ${PORT}`);
   console.log(`App available at: http://localhost:${PORT}`);
+  startVideoWorkers();
 }); 
\ No newline at end of file
@@ -10,6 +10,18 @@ interface Chapter {
 
 type Step = 'extracting' | 'generating' | 'creating' | 'complete';
 
+interface JobStatus {
+  state: 'queued' | 'running' | 'done' | 'failed';
+  stage?: string;
+  done?: number;
+  total?: number;
+  eta_seconds?: number | null;
+  videoPath?: string;
+  error?: string;
+}
+
+const JOB_POLL_INTERVAL_MS = 2000;
+
 const VideoGenerator: React.FC = () => {
   const { subject, chapterId } = useParams<{ subject: string; chapterId: string }>();
   const navigate = useNavigate();
@@ -19,6 +31,7 @@ const VideoGenerator: React.FC = () => {
   const [chapter, setChapter] = useState<Chapter | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [videoPath, setVideoPath] = useState<string | null>(null);
+  const [jobStatus, setJobStatus] = useState<JobStatus | null>(null);
 
   useEffect(() => {
     const fetchChapterDetails = async () => {
@@ -42,6 +55,29 @@ const VideoGenerator: React.FC = () => {
     }
   }, [subject, chapterId]);
 
+  // Poll the queued video job until a worker finishes it
+  const waitForVideoJob = async (jobId: string): Promise<JobStatus> => {
+    while (true) {
+      await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+      const response = await fetch(`/api/jobs/${jobId}`, { cache: 'no-store' });
+      if (!response.ok) {
+        throw new Error('Lost track of the video generation job');
+      }
+      const status: JobStatus = await response.json();
+      setJobStatus(status);
+      if (status.state === 'done') {
+        return status;
+      }
+      if (status.state === 'failed') {
+        throw new Error(status.error || 'Failed to generate video');
+      }
+      if (status.stage === 'rendering' && status.total) {
+        // Rendering covers the 75-99% stretch of the bar
+        setProgress(75 + Math.floor(((status.done || 0) / status.total) * 24));
+      }
+    }
+  };
+
   const startVideoGeneration = async (chapterData: Chapter) => {
     try {
       // Step 1: Extract text from PDF
@@ -87,7 +123,8 @@ const VideoGenerator: React.FC = () => {
       }
 
       const videoData = await videoResponse.json();
-      setVideoPath(videoData.videoPath);
+      const finished = await waitForVideoJob(videoData.jobId);
+      setVideoPath(finished.videoPath || videoData.videoPath);
 
       // Step 4: Complete
       setCurrentStep('complete');
@@ -108,6 +145,26 @@ const VideoGenerator: React.FC = () => {
     return labels[step];
   };
 
+  const describeJob = (status: JobStatus | null) => {
+    if (currentStep !== 'creating' || !status) {
+      return null;
+    }
+    if (status.state === 'queued') {
+      return 'Waiting for a free video worker...';
+    }
+    if (status.stage === 'rendering' && status.total) {
+      const eta = status.eta_seconds != null ? ` (about ${Math.ceil(status.eta_seconds)}s left)` : '';
+      return `Rendered ${status.done || 0} of ${status.total} slides${eta}`;
+    }
+    if (status.stage === 'narrating') {
+      return 'Recording narration...';
+    }
+    if (status.stage === 'assembling') {
+      return 'Putting the video together...';
+    }
+    return null;
+  };
+
   const getStepIcon = (step: Step) => {
     const icons = {
       extracting: '📄',
@@ -211,7 +268,7 @@ const VideoGenerator: React.FC = () => {
             <div className="spinner"></div>
             <div>
               <h3>{getStepLabel(currentStep)}</h3>
-              <p>Please wait while we process your request...</p>
+              <p>{describeJob(jobStatus) || 'Please wait while we process your request...'}</p>
             </div>
           </div>
 
@@ -0,0 +1,246 @@
+"""
+File-backed queue of video generation jobs and the worker pool that runs them.
+
+server.js drops a job file into pending/. A worker claims it with an atomic
+rename into running/, stamps it with its pid, builds the video with
+complete_video_current.build_video and moves it to done/ or failed/. The
+pool requeues running jobs whose owner process is gone when it starts, when
+one of its workers exits (and is restarted), and every REQUEUE_INTERVAL
+seconds. Progress is written to status/<id>.json after every stage and
+slide, for /api/jobs/:id to serve.
+
+    python video_queue.py worker --workers 2
+    python video_queue.py submit scripts/aemr101_script.txt generated_videos/english_chapter1.mp4
+    python video_queue.py status <job_id>
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import traceback
+import multiprocessing
+import multiprocessing.connection
+
+import complete_video_current as video
+
+QUEUE_DIR = os.environ.get(
+    "VIDEO_QUEUE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "video_jobs")
+)
+# Videos built at the same time; each one gets an equal share of the CPUs for slide rendering
+WORKERS = int(os.environ.get("VIDEO_WORKERS", 2))
+POLL_INTERVAL = 1.0
+# Minimum seconds between progress writes for the same job
+STATUS_INTERVAL = 0.5
+# A running job not yet stamped with its owner's pid is left alone this long
+CLAIM_GRACE = 30.0
+# Seconds between sweeps for jobs whose worker died, in this pool or another
+REQUEUE_INTERVAL = float(os.environ.get("VIDEO_REQUEUE_INTERVAL", 60))
+
+def _dir(name):
+    path = os.path.join(QUEUE_DIR, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _write_json(path, data):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+def read_status(job_id):
+    try:
+        with open(os.path.join(_dir("status"), f"{job_id}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_status(job_id, **fields):
+    """Merge fields into the job's status file"""
+    status = read_status(job_id) or {"id": job_id}
+    status.update(fields, updated_at=time.time())
+    _write_json(os.path.join(_dir("status"), f"{job_id}.json"), status)
+    return status
+
+def submit(script_path, output_path, options=None):
+    """Queue a job and return its id. Ids sort in submission order."""
+    job_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+    job = {"id": job_id, "scriptPath": script_path, "outputPath": output_path, "options": options or {}}
+    write_status(job_id, state="queued", videoPath=output_path)
+    _write_json(os.path.join(_dir("pending"), f"{job_id}.json"), job)
+    return job_id
+
+def claim():
+    """Take the oldest pending job, or return None. Safe with many workers."""
+    pending = _dir("pending")
+    running = _dir("running")
+    for name in sorted(os.listdir(pending)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            os.rename(os.path.join(pending, name), os.path.join(running, name))
+        except OSError:
+            continue  # another worker got it first
+        with open(os.path.join(running, name), encoding="utf-8") as f:
+            job = json.load(f)
+        # Lets another pool tell this job apart from one a crashed worker left behind
+        job["owner_pid"] = os.getpid()
+        _write_json(os.path.join(running, name), job)
+        return job
+    return None
+
+def _finish(job_id, state):
+    name = f"{job_id}.json"
+    os.replace(os.path.join(_dir("running"), name), os.path.join(_dir(state), name))
+
+def _pid_alive(pid):
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def requeue_running():
+    """Put jobs left in running/ by a crashed worker back in the queue"""
+    running = _dir("running")
+    for name in os.listdir(running):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(running, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                owner = json.load(f).get("owner_pid")
+            claimed_for = time.time() - os.path.getmtime(path)
+        except (OSError, ValueError):
+            continue  # finished, or mid-claim, while we looked
+        if (owner and _pid_alive(owner)) or (not owner and claimed_for < CLAIM_GRACE):
+            continue  # still being built by a live worker, possibly in another pool
+        try:
+            os.replace(path, os.path.join(_dir("pending"), name))
+        except OSError:
+            continue
+        print(f"[INFO] Requeued interrupted job {name[:-5]}")
+
+class ProgressReporter:
+    """progress(stage, done, total) callback that writes throttled status updates with an ETA"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.stage = None
+        self.stage_started = None
+        self.last_write = 0.0
+
+    def __call__(self, stage, done, total):
+        now = time.time()
+        if stage != self.stage:
+            self.stage, self.stage_started = stage, now
+        elif done < total and now - self.last_write < STATUS_INTERVAL:
+            return
+        eta = None
+        if done and total:
+            eta = round((now - self.stage_started) / done * (total - done), 1)
+        write_status(self.job_id, state="running", stage=stage, done=done, total=total, eta_seconds=eta)
+        self.last_write = now
+
+def run_job(job, jobs_per_video):
+    job_id = job["id"]
+    options = job.get("options") or {}
+    write_status(job_id, state="running", stage="starting", started_at=time.time(), pid=os.getpid())
+    print(f"[INFO] Job {job_id}: {job['scriptPath']} -> {job['outputPath']}")
+    try:
+        if not os.path.exists(job["scriptPath"]):
+            raise FileNotFoundError(f"Script file not found: {job['scriptPath']}")
+        settings = video.encoding_settings(options.get("profile", "default"))
+        seconds = video.build_video(
+            job["scriptPath"], job["outputPath"], jobs=jobs_per_video, settings=settings,
+            assembly=options.get("assembly", "segments"), progress=ProgressReporter(job_id)
+        )
+        if seconds is None:
+            raise RuntimeError("Video assembly failed")
+    except Exception as e:
+        traceback.print_exc()
+        write_status(job_id, state="failed", error=str(e), finished_at=time.time())
+        _finish(job_id, "failed")
+        return
+    write_status(job_id, state="done", stage="done", duration_seconds=seconds,
+                 videoPath=job["outputPath"], eta_seconds=0, finished_at=time.time())
+    _finish(job_id, "done")
+
+def worker_loop(jobs_per_video):
+    while True:
+        job = claim()
+        if job is None:
+            time.sleep(POLL_INTERVAL)
+            continue
+        run_job(job, jobs_per_video)
+
+def _start_worker(index, jobs_per_video):
+    # Not daemonic: each worker starts its own process pool for slide rendering
+    process = multiprocessing.Process(target=worker_loop, args=(jobs_per_video,), name=f"video-worker-{index}")
+    process.start()
+    return process
+
+def supervise(processes, jobs_per_video, timeout=REQUEUE_INTERVAL):
+    """Wait for a worker to exit or the timeout, then requeue orphaned jobs and restart exited workers"""
+    multiprocessing.connection.wait([process.sentinel for process in processes], timeout)
+    requeue_running()
+    for index, process in enumerate(processes):
+        if not process.is_alive():
+            print(f"[WARNING] {process.name} exited with code {process.exitcode}, restarting it")
+            processes[index] = _start_worker(index, jobs_per_video)
+
+def run_pool(workers=WORKERS):
+    """Run `workers` worker processes until interrupted"""
+    requeue_running()
+    jobs_per_video = max(1, (os.cpu_count() or 1) // max(1, workers))
+    print(f"[INFO] Video worker pool: {workers} workers, {jobs_per_video} render processes each, queue at {QUEUE_DIR}")
+    processes = [_start_worker(i, jobs_per_video) for i in range(max(1, workers))]
+    try:
+        while True:
+            supervise(processes, jobs_per_video)
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+def main():
+    parser = argparse.ArgumentParser(description="Video generation job queue")
+    commands = parser.add_subparsers(dest="command", required=True)
+    worker = commands.add_parser("worker", help="Run the worker pool")
+    worker.add_argument("--workers", type=int, default=WORKERS)
+    submit_cmd = commands.add_parser("submit", help="Queue a video job")
+    submit_cmd.add_argument("script_file")
+    submit_cmd.add_argument("final_video")
+    submit_cmd.add_argument("--profile", default="default")
+    submit_cmd.add_argument("--assembly", choices=["segments", "single"], default="segments")
+    status_cmd = commands.add_parser("status", help="Show a job's status")
+    status_cmd.add_argument("job_id")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        run_pool(args.workers)
+    elif args.command == "submit":
+        print(submit(args.script_file, args.final_video, {"profile": args.profile, "assembly": args.assembly}))
+    else:
+        status = read_status(args.job_id)
+        if status is None:
+            print(f"[ERROR] Unknown job: {args.job_id}")
+            sys.exit(1)
+        print(json.dumps(status, indent=2))
+
+if __name__ == "__main__":
+    main()
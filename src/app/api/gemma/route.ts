@@ -2,9 +2,49 @@ import { NextRequest, NextResponse } from 'next/server';
 import { spawn } from 'child_process';
 import path from 'path';
 
+// Resident chat service (`python src/components/gemma3n.py --serve`); when set,
+// messages go to it over HTTP instead of spawning Python for every message
+const GEMMA_SERVICE_URL = process.env.GEMMA_SERVICE_URL;
+const SERVICE_TIMEOUT_MS = 60000;
+
+async function askService(message: string, sessionId?: string, stream?: boolean): Promise<Response | null> {
+  // The timeout covers the wait for the service to answer; once a streamed
+  // body is passed through it must not cut the answer off mid-token
+  const controller = new AbortController();
+  const timer = setTimeout(() => controller.abort(), SERVICE_TIMEOUT_MS);
+  try {
+    const response = await fetch(`${GEMMA_SERVICE_URL}/chat${stream ? '/stream' : ''}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ message, session_id: sessionId }),
+      signal: controller.signal
+    });
+    if (!response.ok) {
+      console.error('Gemma service error:', response.status);
+      return null;
+    }
+    if (stream && response.body) {
+      clearTimeout(timer);
+      // Pass the service's NDJSON token stream straight through to the browser
+      return new Response(response.body, {
+        headers: {
+          'Content-Type': 'application/x-ndjson; charset=utf-8',
+          'Cache-Control': 'no-cache'
+        }
+      });
+    }
+    return NextResponse.json(await response.json());
+  } catch (error) {
+    console.error('Gemma service unavailable, falling back to spawn:', error);
+    return null;
+  } finally {
+    clearTimeout(timer);
+  }
+}
+
 export async function POST(request: NextRequest) {
   try {
-    const { message } = await request.json();
+    const { message, sessionId, stream } = await request.json();
 
     if (!message || typeof message !== 'string') {
       return NextResponse.json(
@@ -13,6 +53,13 @@ export async function POST(request: NextRequest) {
       );
     }
 
+    if (GEMMA_SERVICE_URL) {
+      const serviceResponse = await askService(message, sessionId, stream === true);
+      if (serviceResponse) {
+        return serviceResponse;
+      }
+    }
+
     // Create a temporary Python script that can be called with arguments
     const tempScript = `
 import sys
@@ -63,7 +110,7 @@ if __name__ == "__main__":
     fs.default.writeFileSync(tempScriptPath, tempScript);
 
     // Execute the Python script
-    return new Promise<NextResponse>((resolve) => {
+    return new Promise<Response>((resolve) => {
       const pythonProcess = spawn('python', [tempScriptPath, message], {
         stdio: ['pipe', 'pipe', 'pipe'],
         env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
@@ -1,10 +1,247 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { writeFile, mkdir, readFile } from 'fs/promises';
 import { join } from 'path';
-import { exec } from 'child_process';
-import { promisify } from 'util';
+import { exec, spawn } from 'child_process';
 
-const execAsync = promisify(exec);
+// Resolves with the exit code instead of rejecting, so a failed run is caught
+// before anything reads the manifest it may not have updated
+function runPythonScript(command: string): Promise<{ code: number; stdout: string; stderr: string }> {
+  return new Promise(resolve => {
+    exec(command, { cwd: process.cwd() }, (error, stdout, stderr) => {
+      const code = error ? (typeof error.code === 'number' ? error.code : 1) : 0;
+      resolve({ code, stdout, stderr });
+    });
+  });
+}
+
+interface ContentSummary {
+  subject: string;
+  chapter: string;
+  total_quizzes: number;
+  total_flashcards: number;
+  file_path: string;
+}
+
+// Per-chapter counts written by pdfProcessor.py next to the <subject>_<chapter>_content.json files
+async function readContentManifest(scriptsDir: string): Promise<Record<string, ContentSummary> | null> {
+  try {
+    const manifest = JSON.parse(await readFile(join(scriptsDir, 'manifest.json'), 'utf-8'));
+    return manifest.chapters || {};
+  } catch (error) {
+    return null;
+  }
+}
+
+// A chapter file whose manifest entry is missing (e.g. written before the
+// manifest existed) is summarised from the file itself
+async function summarizeJsonContent(scriptsDir: string, file: string): Promise<ContentSummary> {
+  const content = JSON.parse(await readFile(join(scriptsDir, file), 'utf-8'));
+  return {
+    subject: content.subject,
+    chapter: content.chapter,
+    total_quizzes: content.total_quizzes ?? (content.quizzes || []).length,
+    total_flashcards: content.total_flashcards ?? (content.flashcards || []).length,
+    file_path: file
+  };
+}
+
+// Chapters generated before the JSON output exist only as TypeScript modules;
+// count their items the old way
+async function summarizeLegacyContent(scriptsDir: string, file: string): Promise<ContentSummary> {
+  const contentData = await readFile(join(scriptsDir, file), 'utf-8');
+  const quizMatch = contentData.match(/export const generatedQuizzes: QuizQuestion\[\] = \[([\s\S]*?)\];/);
+  const flashcardMatch = contentData.match(/export const generatedFlashcards: Flashcard\[\] = \[([\s\S]*?)\];/);
+  const fileNameParts = file.replace('_content.ts', '').split('_');
+  return {
+    subject: fileNameParts[0],
+    chapter: fileNameParts.slice(1).join('_'),
+    total_quizzes: quizMatch ? (quizMatch[1].match(/\{/g) || []).length : 0,
+    total_flashcards: flashcardMatch ? (flashcardMatch[1].match(/\{/g) || []).length : 0,
+    file_path: file
+  };
+}
+
+// Resident pdfProcessor.py worker (`python pdfProcessor.py --serve`); when set,
+// jobs go to it instead of spawning a new Python process per request
+const PDF_WORKER_URL = process.env.PDF_WORKER_URL;
+const WORKER_POLL_INTERVAL_MS = 1000;
+// Streams poll more often so token events arrive close to when they are generated
+const WORKER_STREAM_POLL_INTERVAL_MS = 250;
+// Longest the request waits for a worker job before giving up on it
+const WORKER_JOB_TIMEOUT_MS = Number(process.env.PDF_WORKER_TIMEOUT_MS) || 30 * 60 * 1000;
+
+// A worker job that failed, timed out or could not be polled; status is the HTTP status to answer with
+class WorkerJobError extends Error {
+  constructor(message: string, public status: number) {
+    super(message);
+  }
+}
+
+// Submit a job to the worker and wait for it to finish.
+// Returns false when the worker can't be reached so the caller can fall back to exec.
+async function runOnWorker(subject: string, chapter: string): Promise<boolean> {
+  let job;
+  try {
+    const response = await fetch(`${PDF_WORKER_URL}/jobs`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ subject, chapter })
+    });
+    if (!response.ok) return false;
+    job = await response.json();
+  } catch (error) {
+    console.error('PDF worker unavailable, falling back to exec:', error);
+    return false;
+  }
+
+  const deadline = Date.now() + WORKER_JOB_TIMEOUT_MS;
+  while (job.status === 'queued' || job.status === 'running') {
+    if (Date.now() > deadline) {
+      throw new WorkerJobError(`PDF worker job ${job.id} did not finish within ${WORKER_JOB_TIMEOUT_MS / 1000}s`, 504);
+    }
+    await new Promise(resolve => setTimeout(resolve, WORKER_POLL_INTERVAL_MS));
+    let response;
+    try {
+      response = await fetch(`${PDF_WORKER_URL}/jobs/${job.id}`);
+    } catch (error) {
+      throw new WorkerJobError(`Lost contact with the PDF worker while polling job ${job.id}: ${error}`, 502);
+    }
+    if (!response.ok) {
+      throw new WorkerJobError(`PDF worker answered ${response.status} for job ${job.id}`, 502);
+    }
+    job = await response.json();
+  }
+
+  if (job.status !== 'done') {
+    throw new WorkerJobError(job.error || 'PDF worker job failed', 500);
+  }
+  return true;
+}
+
+// Relay a worker job's progress events to the client as NDJSON, in the same
+// shape --stream produces. Returns null when the worker can't be reached so
+// the caller can spawn the script instead.
+async function streamOnWorker(subject: string, chapter: string): Promise<Response | null> {
+  let job;
+  try {
+    const response = await fetch(`${PDF_WORKER_URL}/jobs`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ subject, chapter })
+    });
+    if (!response.ok) return null;
+    job = await response.json();
+  } catch (error) {
+    console.error('PDF worker unavailable, falling back to spawn:', error);
+    return null;
+  }
+
+  const encoder = new TextEncoder();
+  let cancelled = false;
+
+  const stream = new ReadableStream({
+    async start(controller) {
+      const send = (event: Record<string, unknown>) => {
+        if (!cancelled) controller.enqueue(encoder.encode(JSON.stringify(event) + '\n'));
+      };
+      const deadline = Date.now() + WORKER_JOB_TIMEOUT_MS;
+      let sent = 0;
+      try {
+        while (!cancelled) {
+          const response = await fetch(`${PDF_WORKER_URL}/jobs/${job.id}?events_after=${sent}`);
+          if (!response.ok) {
+            throw new Error(`PDF worker answered ${response.status} for job ${job.id}`);
+          }
+          job = await response.json();
+          for (const event of job.events) send(event);
+          sent += job.events.length;
+          if (job.status === 'done' || job.status === 'failed') break;
+          if (Date.now() > deadline) {
+            throw new Error(`PDF worker job ${job.id} did not finish within ${WORKER_JOB_TIMEOUT_MS / 1000}s`);
+          }
+          await new Promise(resolve => setTimeout(resolve, WORKER_STREAM_POLL_INTERVAL_MS));
+        }
+        if (job.status === 'failed') {
+          send({ event: 'error', message: job.error || 'PDF worker job failed' });
+        }
+        send({ event: 'exit', code: job.status === 'done' ? 0 : 1 });
+      } catch (error) {
+        send({ event: 'error', message: error instanceof Error ? error.message : String(error) });
+      }
+      if (!cancelled) controller.close();
+    },
+    cancel() {
+      // The worker has no way to stop a job; it finishes and saves the chapter
+      // as a non-streamed request would, we just stop polling for it
+      cancelled = true;
+    }
+  });
+
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'application/x-ndjson; charset=utf-8',
+      'Cache-Control': 'no-cache'
+    }
+  });
+}
+
+// Stream pdfProcessor.py's NDJSON progress events (chunk started, tokens,
+// chunk done, flashcards, done) to the client as they are produced
+function streamPdfProcessing(pythonScriptPath: string, subject: string, chapter: string): Response {
+  const encoder = new TextEncoder();
+  let pythonProcess: ReturnType<typeof spawn> | null = null;
+
+  const stream = new ReadableStream({
+    start(controller) {
+      let buffered = '';
+      let closed = false;
+      const finish = (event: Record<string, unknown>) => {
+        if (closed) return;
+        closed = true;
+        if (buffered.trim()) {
+          controller.enqueue(encoder.encode(buffered + '\n'));
+        }
+        controller.enqueue(encoder.encode(JSON.stringify(event) + '\n'));
+        controller.close();
+      };
+
+      pythonProcess = spawn('python', [pythonScriptPath, '--subject', subject, '--chapter', chapter, '--stream'], {
+        cwd: process.cwd(),
+        env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
+      });
+
+      pythonProcess.stdout?.on('data', (data) => {
+        if (closed) return;
+        buffered += data.toString('utf-8');
+        const lines = buffered.split('\n');
+        buffered = lines.pop() ?? '';
+        for (const line of lines) {
+          if (line.trim()) {
+            controller.enqueue(encoder.encode(line + '\n'));
+          }
+        }
+      });
+
+      pythonProcess.stderr?.on('data', (data) => {
+        console.log('Python script:', data.toString('utf-8'));
+      });
+
+      pythonProcess.on('close', (code) => finish({ event: 'exit', code }));
+      pythonProcess.on('error', (error) => finish({ event: 'error', message: error.message }));
+    },
+    cancel() {
+      // The client went away; don't leave the model working for nobody
+      pythonProcess?.kill();
+    }
+  });
+
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'application/x-ndjson; charset=utf-8',
+      'Cache-Control': 'no-cache'
+    }
+  });
+}
 
 export async function POST(request: NextRequest) {
   try {
@@ -43,53 +280,64 @@ export async function POST(request: NextRequest) {
 
     // Process the PDF using Python script
     const pythonScriptPath = join(process.cwd(), 'src', 'lib', 'pdfProcessor.py');
-    
-    // Run the Python script
-    const { stdout, stderr } = await execAsync(
-      `python "${pythonScriptPath}" --subject "${subject}" --chapter "${chapter}"`,
-      { cwd: process.cwd() }
-    );
 
-    if (stderr) {
-      console.error('Python script stderr:', stderr);
+    if (formData.get('stream') === 'true') {
+      const workerStream = PDF_WORKER_URL ? await streamOnWorker(subject, chapter) : null;
+      return workerStream ?? streamPdfProcessing(pythonScriptPath, subject, chapter);
     }
+    
+    const handledByWorker = PDF_WORKER_URL ? await runOnWorker(subject, chapter) : false;
 
-    console.log('Python script stdout:', stdout);
+    if (!handledByWorker) {
+      // Run the Python script
+      const { code, stdout, stderr } = await runPythonScript(
+        `python "${pythonScriptPath}" --subject "${subject}" --chapter "${chapter}"`
+      );
 
-    // Read the generated TypeScript content
-    const generatedContentPath = join(scriptsDir, `${subject}_${chapter}_content.ts`);
-    
-    try {
-      const contentData = await readFile(generatedContentPath, 'utf-8');
-      
-      // Extract content stats from the TypeScript file
-      const quizMatch = contentData.match(/export const generatedQuizzes: QuizQuestion\[\] = \[([\s\S]*?)\];/);
-      const flashcardMatch = contentData.match(/export const generatedFlashcards: Flashcard\[\] = \[([\s\S]*?)\];/);
-      
-      const quizCount = quizMatch ? (quizMatch[1].match(/\{/g) || []).length : 0;
-      const flashcardCount = flashcardMatch ? (flashcardMatch[1].match(/\{/g) || []).length : 0;
+      if (stderr) {
+        console.error('Python script stderr:', stderr);
+      }
 
-      return NextResponse.json({
-        success: true,
-        content: {
-          subject,
-          chapter,
-          total_quizzes: quizCount,
-          total_flashcards: flashcardCount,
-          file_path: `${subject}_${chapter}_content.ts`
-        },
-        message: 'PDF processed successfully and content generated'
-      });
-    } catch (readError) {
-      console.error('Error reading generated content:', readError);
+      console.log('Python script stdout:', stdout);
+
+      if (code !== 0) {
+        console.error(`pdfProcessor.py exited with code ${code} for ${subject} - ${chapter}`);
+        return NextResponse.json({
+          success: false,
+          error: `PDF processing failed (exit code ${code})`
+        }, { status: 500 });
+      }
+    }
+
+    // Counts come from the content manifest rather than the chapter file itself
+    const manifest = await readContentManifest(scriptsDir);
+    const summary = manifest?.[`${subject}_${chapter}`]
+      ?? await summarizeJsonContent(scriptsDir, `${subject}_${chapter}_content.json`).catch(() => null);
+    if (!summary) {
+      console.error(`No generated content recorded for ${subject} - ${chapter}`);
       return NextResponse.json({
         success: false,
         error: 'Failed to read generated content'
       }, { status: 500 });
     }
 
+    return NextResponse.json({
+      success: true,
+      content: {
+        subject,
+        chapter,
+        total_quizzes: summary.total_quizzes,
+        total_flashcards: summary.total_flashcards,
+        file_path: summary.file_path
+      },
+      message: 'PDF processed successfully and content generated'
+    });
+
   } catch (error) {
     console.error('Error processing PDF:', error);
+    if (error instanceof WorkerJobError) {
+      return NextResponse.json({ success: false, error: error.message }, { status: error.status });
+    }
     return NextResponse.json(
       { error: 'Failed to process PDF' },
       { status: 500 }
@@ -132,6 +380,21 @@ export async function GET(request: NextRequest) {
       }
     }
 
+    if (action === 'chapter-data' && subject) {
+      // One chapter's flashcards and quizzes, loaded by the dashboard at runtime
+      const chapter = searchParams.get('chapter');
+      const scriptsDir = join(process.cwd(), 'src', 'lib', 'scripts');
+      if (!chapter || /[\\/]|\.\./.test(subject + chapter)) {
+        return NextResponse.json({ error: 'Invalid subject or chapter' }, { status: 400 });
+      }
+      try {
+        const contentData = await readFile(join(scriptsDir, `${subject}_${chapter}_content.json`), 'utf-8');
+        return new NextResponse(contentData, { headers: { 'Content-Type': 'application/json; charset=utf-8' } });
+      } catch (error) {
+        return NextResponse.json({ error: 'No content for this chapter' }, { status: 404 });
+      }
+    }
+
     if (action === 'content') {
       // Get content for all subjects or a specific subject
       const fs = await import('fs/promises');
@@ -139,49 +402,30 @@ export async function GET(request: NextRequest) {
       const chapter = searchParams.get('chapter');
       
       try {
+        const manifest = (await readContentManifest(scriptsDir)) || {};
+        const content = Object.values(manifest);
         const files = await fs.readdir(scriptsDir);
-        let contentFiles = files.filter(file => file.endsWith('_content.ts'));
-        
-        // If subject is specified, filter for that specific subject
-        if (subject) {
-          contentFiles = contentFiles.filter(file => 
-            file.startsWith(`${subject}_`)
-          );
+        for (const file of files.filter(file => file.endsWith('_content.json'))) {
+          if (!(file.replace('_content.json', '') in manifest)) {
+            try {
+              content.push(await summarizeJsonContent(scriptsDir, file));
+            } catch (error) {
+              console.error(`Skipping unreadable content file ${file}:`, error);
+            }
+          }
         }
-        
-        // If chapter is specified, filter for that specific chapter
-        if (chapter) {
-          contentFiles = contentFiles.filter(file => 
-            file.includes(`_${chapter}_`)
-          );
+        const listed = new Set(content.map(entry => `${entry.subject}_${entry.chapter}`));
+        for (const file of files.filter(file => file.endsWith('_content.ts'))) {
+          if (!listed.has(file.replace('_content.ts', ''))) {
+            content.push(await summarizeLegacyContent(scriptsDir, file));
+          }
         }
-        
-        const content = [];
-        for (const file of contentFiles) {
-          const contentData = await fs.readFile(join(scriptsDir, file), 'utf-8');
-          
-          // Extract stats from TypeScript file
-          const quizMatch = contentData.match(/export const generatedQuizzes: QuizQuestion\[\] = \[([\s\S]*?)\];/);
-          const flashcardMatch = contentData.match(/export const generatedFlashcards: Flashcard\[\] = \[([\s\S]*?)\];/);
-          
-          const quizCount = quizMatch ? (quizMatch[1].match(/\{/g) || []).length : 0;
-          const flashcardCount = flashcardMatch ? (flashcardMatch[1].match(/\{/g) || []).length : 0;
-          
-          // Extract subject and chapter name from filename
-          const fileNameParts = file.replace('_content.ts', '').split('_');
-          const fileSubject = fileNameParts[0];
-          const fileChapter = fileNameParts.slice(1).join('_');
-          
-          content.push({
-            subject: fileSubject,
-            chapter: fileChapter,
-            total_quizzes: quizCount,
-            total_flashcards: flashcardCount,
-            file_path: file
-          });
-        }
-        
-        return NextResponse.json({ content });
+
+        return NextResponse.json({
+          content: content.filter(entry =>
+            (!subject || entry.subject === subject) && (!chapter || entry.chapter === chapter)
+          )
+        });
       } catch (error) {
         console.error('Error reading content files:', error);
         return NextResponse.json({ content: [] });
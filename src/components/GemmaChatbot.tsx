@@ -26,6 +26,15 @@ interface ChatbotProps {
   onClose: () => void;
 }
 
+// crypto.randomUUID only exists in secure contexts (HTTPS or localhost), not
+// when the dashboard is opened over plain HTTP on a LAN address
+function newSessionId(): string {
+  if (typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function') {
+    return crypto.randomUUID();
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
 export default function GemmaChatbot({ isOpen, onClose }: ChatbotProps) {
   const [messages, setMessages] = useState<Message[]>([
     {
@@ -40,6 +49,8 @@ export default function GemmaChatbot({ isOpen, onClose }: ChatbotProps) {
   const [isMuted, setIsMuted] = useState(false);
   const [showSettings, setShowSettings] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  // Lets the chat service keep conversation context for follow-up questions
+  const sessionIdRef = useRef<string | null>(null);
   const inputRef = useRef<HTMLInputElement>(null);
 
   const scrollToBottom = () => {
@@ -70,6 +81,10 @@ export default function GemmaChatbot({ isOpen, onClose }: ChatbotProps) {
     setInputText('');
     setIsLoading(true);
 
+    if (!sessionIdRef.current) {
+      sessionIdRef.current = newSessionId();
+    }
+
     try {
       // Always call the API route for every question
       const response = await fetch('/api/gemma', {
@@ -77,13 +92,52 @@ export default function GemmaChatbot({ isOpen, onClose }: ChatbotProps) {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ message: userMessage.text }),
+        body: JSON.stringify({ message: userMessage.text, sessionId: sessionIdRef.current, stream: true }),
       });
 
+      const botMessageId = (Date.now() + 1).toString();
+
+      if (response.body && response.headers.get('Content-Type')?.includes('application/x-ndjson')) {
+        // Streamed reply: show tokens as they arrive
+        setMessages(prev => [...prev, { id: botMessageId, text: '', sender: 'bot', timestamp: new Date() }]);
+        setIsLoading(false);
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        let text = '';
+
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffered += decoder.decode(value, { stream: true });
+          const lines = buffered.split('\n');
+          buffered = lines.pop() ?? '';
+
+          for (const line of lines) {
+            if (!line.trim()) continue;
+            let event;
+            try {
+              event = JSON.parse(line);
+            } catch {
+              continue;
+            }
+            if (event.token) {
+              text += event.token;
+            } else if (event.done && !event.success) {
+              text = text || "Sorry, I couldn't process your request.";
+            }
+          }
+          const current = text;
+          setMessages(prev => prev.map(msg => (msg.id === botMessageId ? { ...msg, text: current } : msg)));
+        }
+        return;
+      }
+
       const data = await response.json();
       
       const botMessage: Message = {
-        id: (Date.now() + 1).toString(),
+        id: botMessageId,
         text: data.response || "Sorry, I couldn't process your request.",
         sender: 'bot',
         timestamp: new Date()
@@ -127,6 +181,7 @@ export default function GemmaChatbot({ isOpen, onClose }: ChatbotProps) {
   };
 
   const clearChat = () => {
+    sessionIdRef.current = null;
     setMessages([{
       id: '1',
       text: "Hello! I'm your offline AI assistant powered by Gemma 3n. Ask me anything!",
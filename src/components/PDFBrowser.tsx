@@ -136,17 +136,55 @@ export default function PDFBrowser({ onClose, onContentGenerated }: PDFBrowserPr
       formData.append('subject', selectedSubject);
       formData.append('chapter', selectedChapter);
       formData.append('action', 'generate'); // Indicate this is for existing PDF
+      formData.append('stream', 'true'); // Receive progress events while the model works
       
       const response = await fetch('/api/pdf-process', {
         method: 'POST',
         body: formData
       });
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
 
-      const result = await response.json();
+      // Read NDJSON progress events as they arrive
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = '';
+      let result: { success: boolean; total_quizzes?: number; total_flashcards?: number; error?: string } = {
+        success: false,
+        error: 'Processing ended without a result'
+      };
+      let generatedFlashcards = 0;
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split('\n');
+        buffered = lines.pop() ?? '';
+
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          let event;
+          try {
+            event = JSON.parse(line);
+          } catch {
+            // A stray log line is not an event; skip it rather than abort the stream
+            continue;
+          }
+          if (event.event === 'chunk_started') {
+            setGenerationProgress(`Generating chunk ${event.chunk} of ${event.total} with Gemma3n...`);
+          } else if (event.event === 'flashcards') {
+            generatedFlashcards += event.flashcards.length;
+            setGenerationProgress(`Chunk ${event.chunk} done - ${generatedFlashcards} flashcards so far...`);
+          } else if (event.event === 'done') {
+            result = { success: true, total_quizzes: event.total_quizzes, total_flashcards: event.total_flashcards };
+          } else if (event.event === 'error') {
+            result = { success: false, error: event.message };
+          }
+        }
+      }
       
       if (result.success) {
         const newContent = {
@@ -154,7 +192,7 @@ export default function PDFBrowser({ onClose, onContentGenerated }: PDFBrowserPr
           chapter: selectedChapter,
           total_quizzes: result.total_quizzes || 0,
           total_flashcards: result.total_flashcards || 0,
-          file_path: `${selectedSubject}_${selectedChapter}_content.ts`
+          file_path: `${selectedSubject}_${selectedChapter}_content.json`
         };
 
         setGenerationProgress('Content generated successfully!');
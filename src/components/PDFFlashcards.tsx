@@ -3,6 +3,7 @@
 import { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { Sparkles, Star, Smile, PartyPopper, ArrowLeft, ArrowRight, RotateCcw, Shuffle, BookOpen, CheckCircle, XCircle, Eye, FileText } from 'lucide-react';
+import { getGeneratedContent } from '@/lib/pdfGeneratedContent';
 
 interface Flashcard {
   id: number;
@@ -44,10 +45,13 @@ export default function PDFFlashcards({
       
       try {
         // Try to load PDF-generated content
-        const module = await import(`@/lib/scripts/${subject}_${chapter}_content.ts`);
+        const content = await getGeneratedContent(subject, chapter);
+        if (!content) {
+          throw new Error(`No generated content for ${subject} - ${chapter}`);
+        }
         
-        if (module.generatedFlashcards && module.generatedFlashcards.length > 0) {
-          let flashcardSet = module.generatedFlashcards;
+        if (content.flashcards.length > 0) {
+          let flashcardSet = content.flashcards;
           
           // Limit to cardCount
           flashcardSet = flashcardSet.slice(0, cardCount);
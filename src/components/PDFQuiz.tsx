@@ -19,6 +19,7 @@ import {
   BookOpen,
   FileText
 } from 'lucide-react';
+import { getGeneratedContent } from '@/lib/pdfGeneratedContent';
 
 interface QuizQuestion {
   id: number;
@@ -59,10 +60,13 @@ export default function PDFQuiz({ onClose, onComplete, subject, chapter, questio
       
       try {
         // Try to load PDF-generated content
-        const module = await import(`@/lib/scripts/${subject}_${chapter}_content.ts`);
+        const content = await getGeneratedContent(subject, chapter);
+        if (!content) {
+          throw new Error(`No generated content for ${subject} - ${chapter}`);
+        }
         
-        if (module.generatedQuizzes && module.generatedQuizzes.length > 0) {
-          let quizQuestions = module.generatedQuizzes;
+        if (content.quizzes.length > 0) {
+          let quizQuestions = content.quizzes;
           
           // Shuffle and limit
           quizQuestions = quizQuestions.sort(() => 0.5 - Math.random()).slice(0, questionCount);
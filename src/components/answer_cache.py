@@ -0,0 +1,151 @@
+import os
+import re
+import json
+import time
+import atexit
+import tempfile
+import threading
+from collections import OrderedDict
+
+# === CONFIGURATION ===
+CACHE_PATH = os.environ.get(
+    "ANSWER_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "answer_cache.json")
+)
+MAX_ENTRIES = int(os.environ.get("ANSWER_CACHE_SIZE", 5000))
+# Minimum word-overlap (Jaccard) score for a fuzzy match to count as the same question
+SIMILARITY_THRESHOLD = float(os.environ.get("ANSWER_CACHE_THRESHOLD", 0.8))
+# Seconds between background saves of new entries
+SAVE_INTERVAL = 5.0
+
+# Filler words that don't change what is being asked
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "of", "in", "on", "at", "to", "for",
+    "what", "whats", "who", "whos", "which", "does", "do", "did", "me", "tell", "please",
+    "can", "could", "you", "explain", "define", "about", "i", "want", "know", "give",
+    "meaning", "s", "and", "it", "its"
+}
+
+def normalize(question):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    question = question.lower().replace("'", "")
+    return " ".join(re.sub(r"[^\w\s]", " ", question).split())
+
+def _keywords(normalized):
+    words = set()
+    for word in normalized.split():
+        if word in STOPWORDS:
+            continue
+        # Fold simple plurals so "planets" and "planet" match
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.add(word)
+    return frozenset(words)
+
+class AnswerCache:
+    """
+    Bounded LRU cache of answers to frequently asked questions.
+
+    Lookups try the normalized question exactly first, then the most similar
+    cached question by keyword overlap. Entries persist to a JSON file.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, threshold=SIMILARITY_THRESHOLD):
+        self.path = path
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.entries = OrderedDict()   # normalized question -> answer
+        self.index = {}                # keyword -> set of normalized questions
+        self.lock = threading.Lock()
+        self.dirty = False
+        self._load()
+        self._saver = None
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        for question, answer in saved.get("entries", []):
+            self._insert(question, answer)
+
+    def _insert(self, key, answer):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        else:
+            for word in _keywords(key):
+                self.index.setdefault(word, set()).add(key)
+        self.entries[key] = answer
+        while len(self.entries) > self.max_entries:
+            old_key, _ = self.entries.popitem(last=False)
+            for word in _keywords(old_key):
+                keys = self.index.get(word)
+                if keys:
+                    keys.discard(old_key)
+                    if not keys:
+                        del self.index[word]
+
+    def _best_match(self, key):
+        words = _keywords(key)
+        # Numbers change the answer ("2+3" vs "2+5"), so only exact matches are safe
+        if not words or any(ch.isdigit() for ch in key):
+            return None
+        candidates = set()
+        for word in words:
+            candidates |= self.index.get(word, set())
+        best, best_score = None, 0.0
+        for candidate in candidates:
+            other = _keywords(candidate)
+            score = len(words & other) / len(words | other)
+            if score > best_score:
+                best, best_score = candidate, score
+        return best if best_score >= self.threshold else None
+
+    def get(self, question):
+        """Return (answer, match_kind) with match_kind "exact" or "similar", or None"""
+        key = normalize(question)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key], "exact"
+            match = self._best_match(key)
+            if match is None:
+                return None
+            self.entries.move_to_end(match)
+            return self.entries[match], "similar"
+
+    def put(self, question, answer):
+        key = normalize(question)
+        if not key or not answer.strip():
+            return
+        with self.lock:
+            self._insert(key, answer)
+            self.dirty = True
+            if self._saver is None:
+                self._start_saver()
+
+    def _start_saver(self):
+        # Persist from a background thread so the chat path never waits on disk
+        def run():
+            while True:
+                time.sleep(SAVE_INTERVAL)
+                self.save()
+        self._saver = threading.Thread(target=run, name="answer-cache-saver", daemon=True)
+        self._saver.start()
+        atexit.register(self.save)
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            entries = list(self.entries.items())
+            self.dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"entries": entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save answer cache: {e}")
@@ -5,6 +5,7 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { Sparkles, Star, Smile, PartyPopper, ArrowLeft, ArrowRight, RotateCcw, Shuffle, BookOpen, CheckCircle, XCircle, Eye } from 'lucide-react';
 // Correct import for your flashcard data/offline utilities
 import { Flashcard, getRandomFlashcards } from '@/lib/quizData';
+import { getPDFFlashcards } from '@/lib/pdfGeneratedContent';
 
 interface FlashcardsProps {
   onClose: () => void;
@@ -40,9 +41,9 @@ export default function Flashcards({
       if (usePDFContent && subject && chapter) {
         try {
           // Try to load PDF-generated content
-          const module = await import(`@/lib/scripts/${subject}_${chapter}_content.ts`);
-          if (module.generatedFlashcards && module.generatedFlashcards.length > 0) {
-            flashcardSet = module.generatedFlashcards;
+          const pdfFlashcards = await getPDFFlashcards(subject, chapter);
+          if (pdfFlashcards.length > 0) {
+            flashcardSet = pdfFlashcards;
             setContentSource('pdf');
           }
         } catch (error) {
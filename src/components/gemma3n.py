@@ -1,11 +1,41 @@
+import os
+import sys
+import json
+import argparse
 import requests
 import re
 import datetime
 import random
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests.adapters import HTTPAdapter
+from answer_cache import AnswerCache
+from interaction_log import InteractionLogger
 
 # === CONFIGURATION ===
 MODEL_NAME = "gemma3n:e4b"
-OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+if "://" not in OLLAMA_HOST:
+    OLLAMA_HOST = f"http://{OLLAMA_HOST}"
+OLLAMA_URL = f"{OLLAMA_HOST}/api/chat"
+REQUEST_TIMEOUT = 60
+SYSTEM_PROMPT = "You are a helpful and friendly AI tutor for students. Answer clearly."
+# How long Ollama keeps the model loaded after a request
+KEEP_ALIVE = os.environ.get("GEMMA_KEEP_ALIVE", "30m")
+# Approximate tokens of earlier turns resent with each follow-up question
+HISTORY_TOKEN_BUDGET = int(os.environ.get("GEMMA_HISTORY_TOKENS", 2048))
+MAX_SESSIONS = 500
+
+# === Service mode (--serve) ===
+SERVICE_HOST = os.environ.get("GEMMA_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("GEMMA_SERVICE_PORT", 8766))
+# Keep-alive connections to Ollama shared by concurrent chat requests
+POOL_SIZE = int(os.environ.get("GEMMA_POOL_SIZE", 8))
+
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE))
 
 # === Friendly small-talk keywords ===
 GREETINGS = [
@@ -38,21 +68,145 @@ def is_greeting(query):
     query_lower = query.lower()
     return any(greet in query_lower for greet in GREETINGS)
 
-# === Send prompt to Ollama (Gemma 3n)
-def generate_response(prompt):
+# === Per-session conversation history for follow-up questions
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+class ChatSessions:
+    """Recent turns per session, trimmed to a token budget; least recently used sessions are dropped"""
+
+    def __init__(self, token_budget=HISTORY_TOKEN_BUDGET, max_sessions=MAX_SESSIONS):
+        self.token_budget = token_budget
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def history(self, session_id):
+        if session_id is None:
+            return []
+        with self.lock:
+            messages = self.sessions.get(session_id)
+            if messages is None:
+                return []
+            self.sessions.move_to_end(session_id)
+            return list(messages)
+
+    def append(self, session_id, question, reply):
+        if session_id is None:
+            return
+        with self.lock:
+            messages = self.sessions.setdefault(session_id, [])
+            self.sessions.move_to_end(session_id)
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": reply})
+            # Drop the oldest question/answer pairs until the history fits the budget.
+            # Between trims the prefix is unchanged, so Ollama can reuse its KV cache
+            while len(messages) > 2 and sum(estimate_tokens(m["content"]) for m in messages) > self.token_budget:
+                del messages[:2]
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+
+    def reset(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+SESSIONS = ChatSessions()
+# Answers to common questions, served without calling the model
+ANSWER_CACHE = AnswerCache()
+
+# === Stream a reply from Ollama (Gemma 3n), token by token
+def stream_response(prompt, session_id=None):
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    messages += SESSIONS.history(session_id)
+    messages.append({"role": "user", "content": prompt})
     data = {
         "model": MODEL_NAME,
-        "prompt": f"You are a helpful and friendly AI tutor for students. Answer this clearly:\n\n{prompt}",
-        "stream": False
+        "messages": messages,
+        "stream": True,
+        "keep_alive": KEEP_ALIVE
     }
-    response = requests.post(OLLAMA_URL, json=data)
-    response.raise_for_status()
-    return response.json()["response"]
+    parts = []
+    with SESSION.post(OLLAMA_URL, json=data, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if "error" in chunk:
+                raise RuntimeError(chunk["error"])
+            token = chunk.get("message", {}).get("content", "")
+            if token:
+                parts.append(token)
+                yield token
+            if chunk.get("done"):
+                break
+    SESSIONS.append(session_id, prompt, "".join(parts))
+
+# === Send prompt to Ollama (Gemma 3n)
+def generate_response(prompt, session_id=None):
+    return "".join(stream_response(prompt, session_id))
+
+# === Answer one message as it streams in: small talk, model call and logging
+def stream_answer(user_input, session_id=None):
+    start = time.perf_counter()
+    first_token_at = None
+    cache_match = None
+    if is_greeting(user_input):
+        response = random.choice(SMALL_TALK_RESPONSES)
+        cache_match = "small_talk"
+        yield response
+    else:
+        # Follow-up questions depend on earlier turns, so only fresh questions use the
+        # cache, both to look up and to store their answers
+        history = SESSIONS.history(session_id)
+        cached = None if history else ANSWER_CACHE.get(user_input)
+        if cached:
+            response, cache_match = cached
+            SESSIONS.append(session_id, user_input, response)
+            yield response
+        else:
+            parts = []
+            for token in stream_response(user_input, session_id):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                parts.append(token)
+                yield token
+            response = "".join(parts)
+
+            if not response.strip():
+                response = "Hmm, I couldn't find a clear answer. Can you rephrase or ask another question?"
+                yield response
+            elif not history:
+                ANSWER_CACHE.put(user_input, response)
+
+    log_interaction(
+        user_input, response,
+        latency_ms=round((time.perf_counter() - start) * 1000, 1),
+        first_token_ms=round((first_token_at - start) * 1000, 1) if first_token_at else None,
+        cache_hit=cache_match is not None,
+        cache_match=cache_match,
+        session_id=session_id
+    )
+
+def answer(user_input, session_id=None):
+    return "".join(stream_answer(user_input, session_id)).strip()
 
-# === Log Q&A to file
-def log_interaction(question, answer):
-    with open("chat_log.txt", "a", encoding="utf-8") as f:
-        f.write(f"\n[{datetime.datetime.now()}]\nUser: {question}\nBot: {answer}\n")
+# === Log Q&A as JSONL; written in batches by a background thread, off the response path
+INTERACTION_LOG = InteractionLogger()
+
+def log_interaction(question, answer, latency_ms=None, first_token_ms=None,
+                    cache_hit=False, cache_match=None, session_id=None):
+    INTERACTION_LOG.log({
+        "timestamp": datetime.datetime.now().isoformat(timespec="milliseconds"),
+        "session_id": session_id,
+        "question": question,
+        "answer": answer,
+        "latency_ms": latency_ms,
+        "first_token_ms": first_token_ms,
+        "cache_hit": cache_hit,
+        "cache_match": cache_match,
+        "model": MODEL_NAME
+    })
 
 # === Main chat loop
 def main():
@@ -67,20 +221,119 @@ def main():
             break
 
         try:
-            if is_greeting(user_input):
-                response = random.choice(SMALL_TALK_RESPONSES)
-            else:
-                print("🤔 Thinking...")
-                response = generate_response(user_input)
+            print("Bot: ", end="", flush=True)
+            # One session for the whole loop, so follow-up questions keep their context
+            for piece in stream_answer(user_input, session_id="cli"):
+                print(piece, end="", flush=True)
+            print()
+
+        except Exception as e:
+            print(f"\nBot: Oops! Something went wrong: {e}")
+
+# === Resident HTTP service: POST /chat, POST /chat/stream, GET /health
+class ChatHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            SESSION.get(f"{OLLAMA_HOST}/api/tags", timeout=2).raise_for_status()
+            self._send_json(200, {"status": "ok", "model": MODEL_NAME, "ollama": "up"})
+        except requests.exceptions.RequestException as e:
+            self._send_json(503, {"status": "degraded", "model": MODEL_NAME, "ollama": str(e)})
+
+    def _read_message(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return None, None
+        message, session_id = payload.get("message"), payload.get("session_id")
+        if not message or not isinstance(message, str):
+            return None, None
+        return message.strip(), session_id if isinstance(session_id, str) else None
 
-                if not response.strip():
-                    response = "Hmm, I couldn't find a clear answer. Can you rephrase or ask another question?"
+    def do_POST(self):
+        if self.path not in ("/chat", "/chat/stream"):
+            self._send_json(404, {"error": "Not found"})
+            return
+        message, session_id = self._read_message()
+        if message is None:
+            self._send_json(400, {"error": "Message is required and must be a string"})
+            return
+        if self.path == "/chat/stream":
+            self._stream_chat(message, session_id)
+            return
+        try:
+            self._send_json(200, {"response": answer(message, session_id), "success": True})
+        except requests.exceptions.RequestException as e:
+            self._send_json(200, {
+                "response": "Sorry, I'm having trouble connecting to my brain right now. Please make sure Ollama is running with the Gemma 3n model.",
+                "success": False,
+                "error": str(e)
+            })
+        except Exception as e:
+            self._send_json(500, {"response": f"An error occurred: {e}", "success": False, "error": str(e)})
 
-            print(f"Bot: {response}")
-            log_interaction(user_input, response)
+    def _stream_chat(self, message, session_id):
+        # NDJSON, one {"token": ...} per piece, then {"done": true}; the body ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
 
+        def send(payload):
+            self.wfile.write((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            for piece in stream_answer(message, session_id):
+                send({"token": piece})
+            send({"done": True, "success": True})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
         except Exception as e:
-            print(f"Bot: Oops! Something went wrong: {e}")
+            send({"done": True, "success": False, "error": str(e)})
+
+    def do_DELETE(self):
+        # DELETE /sessions/<id> forgets a conversation
+        if not self.path.startswith("/sessions/"):
+            self._send_json(404, {"error": "Not found"})
+            return
+        SESSIONS.reset(self.path[len("/sessions/"):])
+        self._send_json(200, {"success": True})
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(host=SERVICE_HOST, port=SERVICE_PORT):
+    server = ThreadingHTTPServer((host, port), ChatHandler)
+    print(f"Gemma3n chat service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down.")
+    finally:
+        server.server_close()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Offline educational chatbot (Gemma3n via Ollama)")
+    parser.add_argument("--serve", action="store_true", help="Run as a resident HTTP chat service")
+    parser.add_argument("--host", default=SERVICE_HOST, help="Service bind address")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="Service port")
+    args = parser.parse_args()
+
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    if args.serve:
+        serve(args.host, args.port)
+    else:
+        main()
@@ -0,0 +1,135 @@
+import os
+import gzip
+import json
+import time
+import queue
+import atexit
+import shutil
+import datetime
+import threading
+
+# === CONFIGURATION ===
+LOG_PATH = os.environ.get("CHAT_LOG_PATH", "chat_log.jsonl")
+# Rotate when the live file reaches this size or age
+MAX_BYTES = int(os.environ.get("CHAT_LOG_MAX_BYTES", 10 * 1024 * 1024))
+MAX_AGE = float(os.environ.get("CHAT_LOG_MAX_AGE", 24 * 3600))
+# Compressed rotated files kept on disk
+BACKUP_COUNT = int(os.environ.get("CHAT_LOG_BACKUPS", 14))
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 1.0
+# Records waiting to be written; beyond this new records are dropped, never blocking a reply
+QUEUE_SIZE = 10000
+
+class InteractionLogger:
+    """
+    Queue-fed JSONL writer. log() only enqueues; a background thread writes
+    records in batches and rotates the file by size and age, gzipping the
+    rotated copies.
+    """
+
+    def __init__(self, path=LOG_PATH, max_bytes=MAX_BYTES, max_age=MAX_AGE, backup_count=BACKUP_COUNT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = 0
+        self._file = None
+        self._opened_at = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def log(self, record):
+        if self._thread is None:
+            self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="interaction-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def close(self):
+        """Write out everything queued so far and stop the writer"""
+        if self._thread is None:
+            return
+        self.queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                first = self.queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                try:
+                    self._rotate_if_needed()
+                except OSError as e:
+                    print(f"Could not rotate chat log: {e}")
+                continue
+            batch = [first]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            self._write([record for record in batch if record is not None])
+            if stop:
+                self._close_file()
+                return
+
+    def _write(self, records):
+        if not records:
+            return
+        if self.dropped:
+            records.append({"event": "log_overflow", "dropped": self.dropped})
+            self.dropped = 0
+        try:
+            self._rotate_if_needed()
+            if self._file is None:
+                self._open()
+            self._file.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+            self._file.flush()
+        except OSError as e:
+            print(f"Could not write chat log: {e}")
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._opened_at = time.time()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate_if_needed(self):
+        if self._file is None:
+            return
+        too_big = self._file.tell() >= self.max_bytes
+        too_old = time.time() - self._opened_at >= self.max_age
+        if not (too_big or too_old) or self._file.tell() == 0:
+            return
+        self._close_file()
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        rotated = f"{self.path}.{stamp}"
+        os.replace(self.path, rotated)
+        with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
+        self._prune_backups()
+
+    def _prune_backups(self):
+        directory = os.path.dirname(self.path) or "."
+        prefix = os.path.basename(self.path) + "."
+        backups = sorted(name for name in os.listdir(directory) if name.startswith(prefix) and name.endswith(".gz"))
+        for name in backups[:max(0, len(backups) - self.backup_count)]:
+            os.remove(os.path.join(directory, name))
@@ -19,6 +19,7 @@ import {
   BookOpen
 } from 'lucide-react';
 import { QuizQuestion, getRandomQuizQuestions, quizData } from '@/lib/quizData';
+import { getPDFQuizzes } from '@/lib/pdfGeneratedContent';
 
 interface QuizProps {
   onClose: () => void;
@@ -50,9 +51,9 @@ export default function Quiz({ onClose, onComplete, subject, questionCount = 10,
       if (usePDFContent && subject && chapter) {
         try {
           // Try to load PDF-generated content
-          const module = await import(`@/lib/scripts/${subject}_${chapter}_content.ts`);
-          if (module.generatedQuizzes && module.generatedQuizzes.length > 0) {
-            quizQuestions = module.generatedQuizzes;
+          const pdfQuizzes = await getPDFQuizzes(subject, chapter);
+          if (pdfQuizzes.length > 0) {
+            quizQuestions = pdfQuizzes;
             setContentSource('pdf');
           }
         } catch (error) {
@@ -0,0 +1,142 @@
+"""
+Validation of the flashcard and quiz JSON that Gemma returns in JSON mode.
+
+JsonStreamChecker follows the reply token by token so a response that is
+not a JSON object can be abandoned at its first character, and a complete
+one is recognised the moment its closing brace arrives. validate_content
+turns the parsed object into typed QuizQuestion / Flashcard items (see
+quizData.ts), fixing what can be fixed locally and dropping the rest.
+"""
+
+import json
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+DEFAULT_POINTS = 10
+# Runs of whitespace this long mean the model is stuck padding a JSON reply
+MAX_WHITESPACE_RUN = 200
+
+class ContentError(ValueError):
+    """The reply can't be used; the message is fed back to the model on a repair retry"""
+
+class JsonStreamChecker:
+    """
+    Incremental check of a streamed JSON object. feed() raises ContentError
+    as soon as the text can no longer be a single JSON object and returns
+    True once the object's closing brace has been seen.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.whitespace_run = 0
+
+    def feed(self, text):
+        for char in text:
+            if char.isspace():
+                self.whitespace_run += 1
+                if self.whitespace_run > MAX_WHITESPACE_RUN:
+                    raise ContentError("reply is only whitespace")
+                continue
+            self.whitespace_run = 0
+            if not self.started:
+                if char != '{':
+                    raise ContentError(f"reply must start with '{{', got {char!r}")
+                self.started = True
+                self.depth = 1
+                continue
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+def parse_reply(reply):
+    """Parse a reply into a dict, raising ContentError with the reason"""
+    try:
+        data = json.loads(reply)
+    except ValueError as e:
+        raise ContentError(f"invalid JSON: {e}") from None
+    if not isinstance(data, dict):
+        raise ContentError("reply must be a JSON object with 'flashcards' and 'quizzes' lists")
+    return data
+
+def _text(item, key):
+    value = item.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise ContentError(f"'{key}' must be a non-empty string")
+    return ' '.join(value.split())
+
+def _difficulty(item):
+    value = str(item.get('difficulty', '')).strip().lower()
+    return value if value in DIFFICULTIES else 'easy'
+
+def _flashcard(item, subject, chapter):
+    return {
+        'front': _text(item, 'front'),
+        'back': _text(item, 'back'),
+        'subject': subject,
+        'category': chapter,
+        'difficulty': _difficulty(item),
+    }
+
+def _quiz(item, subject):
+    options = item.get('options')
+    if not isinstance(options, list) or len(options) < 2:
+        raise ContentError("'options' must be a list of at least two choices")
+    options = [' '.join(str(option).split()) for option in options]
+    if any(not option for option in options) or len(set(options)) != len(options):
+        raise ContentError("'options' must be distinct and non-empty")
+    answer = item.get('answer')
+    # Models often give the correct option's text instead of its index
+    if isinstance(answer, str):
+        answer = answer.strip()
+        answer = options.index(answer) if answer in options else int(answer) if answer.isdigit() else None
+    if isinstance(answer, bool) or not isinstance(answer, int) or not 0 <= answer < len(options):
+        raise ContentError(f"'answer' must be the index of the correct option (0-{len(options) - 1})")
+    points = item.get('points', DEFAULT_POINTS)
+    return {
+        'question': _text(item, 'question'),
+        'options': options,
+        'answer': answer,
+        'hint': ' '.join(str(item.get('hint') or '').split()),
+        'subject': subject,
+        'difficulty': _difficulty(item),
+        'points': points if isinstance(points, int) and not isinstance(points, bool) and points > 0 else DEFAULT_POINTS,
+    }
+
+def validate_content(data, subject, chapter):
+    """
+    Return (flashcards, quizzes, problems) from a parsed reply. Invalid items
+    are dropped and described in problems; ContentError is raised when
+    nothing usable is left.
+    """
+    flashcards, quizzes, problems = [], [], []
+    for key, build, target in (('flashcards', lambda item: _flashcard(item, subject, chapter), flashcards),
+                               ('quizzes', lambda item: _quiz(item, subject), quizzes)):
+        items = data.get(key, [])
+        if not isinstance(items, list):
+            problems.append(f"'{key}' must be a list")
+            continue
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ContentError("item must be an object")
+                target.append(build(item))
+            except ContentError as e:
+                problems.append(f"{key}[{index}]: {e}")
+    if not flashcards and not quizzes:
+        raise ContentError('; '.join(problems) or "no flashcards or quizzes in the reply")
+    return flashcards, quizzes, problems
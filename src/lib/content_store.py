@@ -0,0 +1,152 @@
+"""
+Generated flashcards and quizzes stored as JSON data files.
+
+Each chapter is one compact <subject>_<chapter>_content.json written with a
+single json.dump, and scripts/manifest.json keeps per-chapter counts so the
+API can list content without opening every chapter file. The dashboard
+fetches both at runtime, so publishing a chapter never touches the bundle.
+Manifest updates hold a lock file, as each upload runs in its own process.
+
+    python content_store.py --rebuild
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+import contextlib
+
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = '.manifest.lock'
+CONTENT_SUFFIX = '_content.json'
+MANIFEST_VERSION = 1
+_manifest_lock = threading.Lock()
+
+def content_file_name(subject, chapter):
+    return f"{subject}_{chapter}{CONTENT_SUFFIX}"
+
+def _write_json(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+@contextlib.contextmanager
+def manifest_lock(scripts_dir):
+    """Exclusive lock on the manifest, across threads and processes"""
+    with _manifest_lock, open(os.path.join(scripts_dir, LOCK_NAME), 'a+b') as lock_file:
+        if os.name == 'nt':
+            import msvcrt
+            while True:
+                try:
+                    # LK_LOCK gives up after ~10 seconds, so keep retrying
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def load_manifest(scripts_dir):
+    """Return the manifest, or None when it is missing or unreadable"""
+    try:
+        with open(os.path.join(scripts_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == MANIFEST_VERSION else None
+
+def _manifest_entry(content, file_name):
+    return {
+        'subject': content['subject'],
+        'chapter': content['chapter'],
+        'file_path': file_name,
+        'total_flashcards': content['total_flashcards'],
+        'total_quizzes': content['total_quizzes'],
+        'generated_at': content.get('generated_at'),
+        'source': content.get('source'),
+    }
+
+def rebuild_manifest(scripts_dir):
+    """Recreate the manifest from the chapter files on disk"""
+    chapters = {}
+    for name in sorted(os.listdir(scripts_dir)):
+        if not name.endswith(CONTENT_SUFFIX):
+            continue
+        try:
+            with open(os.path.join(scripts_dir, name), encoding='utf-8') as f:
+                content = json.load(f)
+            chapters[name[:-len(CONTENT_SUFFIX)]] = _manifest_entry(content, name)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARNING] Skipping unreadable content file {name}: {e}")
+    manifest = {'version': MANIFEST_VERSION, 'chapters': chapters}
+    _write_json(os.path.join(scripts_dir, MANIFEST_NAME), manifest)
+    return manifest
+
+def write_chapter_content(scripts_dir, subject, chapter, flashcards, quizzes, source=None):
+    """
+    Write one chapter's content file and record it in the manifest; returns
+    the file path. source describes what the content was built from (see
+    is_up_to_date) and is left out when the build should be retried.
+    """
+    os.makedirs(scripts_dir, exist_ok=True)
+    file_name = content_file_name(subject, chapter)
+    content = {
+        'subject': subject,
+        'chapter': chapter,
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'flashcards': [dict(card, id=i) for i, card in enumerate(flashcards, 1)],
+        'quizzes': [dict(quiz, id=i) for i, quiz in enumerate(quizzes, 1)],
+        'total_flashcards': len(flashcards),
+        'total_quizzes': len(quizzes),
+        'source': source,
+    }
+    path = os.path.join(scripts_dir, file_name)
+    _write_json(path, content)
+    with manifest_lock(scripts_dir):
+        manifest = load_manifest(scripts_dir) or rebuild_manifest(scripts_dir)
+        manifest['chapters'][file_name[:-len(CONTENT_SUFFIX)]] = _manifest_entry(content, file_name)
+        _write_json(os.path.join(scripts_dir, MANIFEST_NAME), manifest)
+    return path
+
+def is_up_to_date(manifest, subject, chapter, source):
+    """True when the manifest says this chapter was already built from the same source"""
+    entry = (manifest or {}).get('chapters', {}).get(f"{subject}_{chapter}")
+    return bool(entry) and entry.get('source') == source
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the generated content manifest")
+    parser.add_argument('--scripts-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+    parser.add_argument('--rebuild', action='store_true', help='Recreate manifest.json from the chapter files')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        with manifest_lock(args.scripts_dir):
+            manifest = rebuild_manifest(args.scripts_dir)
+    else:
+        manifest = load_manifest(args.scripts_dir)
+    if manifest is None:
+        print("[ERROR] No manifest found; run with --rebuild")
+        raise SystemExit(1)
+    for entry in manifest['chapters'].values():
+        print(f"{entry['subject']} - {entry['chapter']}: {entry['total_flashcards']} flashcards, "
+              f"{entry['total_quizzes']} quizzes ({entry['file_path']})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Content-addressed cache of extracted PDF page text.
+
+Entries are keyed by the SHA-256 of the PDF bytes plus the extractor name
+and version, so a renamed or re-uploaded copy of the same book still hits
+and a changed extractor never serves stale text. Shared by pdfProcessor.py
+and the genrate/ script generators.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+
+CACHE_DIR = os.environ.get(
+    'EXTRACTION_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'extraction')
+)
+# Total size of cached entries before least-recently-used ones are evicted
+MAX_CACHE_BYTES = int(os.environ.get('EXTRACTION_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+CACHE_DISABLED = os.environ.get('EXTRACTION_CACHE_DISABLED', '') == '1'
+
+def hash_file(path, block_size=1024 * 1024):
+    """SHA-256 hex digest of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _entry_path(pdf_hash, extractor, version):
+    key = hashlib.sha256(f"{pdf_hash}:{extractor}:{version}".encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+def load_pages(pdf_hash, extractor, version):
+    """Return cached page texts, or None on a miss"""
+    path = _entry_path(pdf_hash, extractor, version)
+    try:
+        with open(path, encoding='utf-8') as f:
+            pages = json.load(f)['pages']
+    except (OSError, ValueError, KeyError):
+        return None
+    # Bump the mtime so eviction treats it as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return pages
+
+def store_pages(pdf_hash, extractor, version, pages):
+    """Write page texts atomically, then trim the cache to its size cap"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _entry_path(pdf_hash, extractor, version)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'extractor': extractor, 'version': version, 'pages': pages}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARNING] Could not write extraction cache entry: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return
+    evict(MAX_CACHE_BYTES)
+
+def evict(max_bytes):
+    """Delete least-recently-used entries until the cache fits in max_bytes"""
+    try:
+        names = [name for name in os.listdir(CACHE_DIR) if name.endswith('.json')]
+    except OSError:
+        return
+    entries = []
+    total = 0
+    for name in names:
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def cached_extract_pages(pdf_path, extractor, version, extract_pages, pdf_hash=None):
+    """
+    Return the page texts for pdf_path, calling extract_pages(pdf_path) only
+    when this extractor/version has never seen these PDF bytes before.
+    """
+    if CACHE_DISABLED:
+        return extract_pages(pdf_path)
+    pdf_hash = pdf_hash or hash_file(pdf_path)
+    pages = load_pages(pdf_hash, extractor, version)
+    if pages is not None:
+        print(f"[INFO] Extraction cache hit for {os.path.basename(pdf_path)} ({extractor} v{version})")
+        return pages
+    pages = extract_pages(pdf_path)
+    # Don't pin a failed extraction in the cache; the next run should retry it
+    if any(page.strip() for page in pages):
+        store_pages(pdf_hash, extractor, version, pages)
+    return pages
@@ -0,0 +1,107 @@
+"""
+Persistent cache of LLM responses.
+
+A response is keyed by the model name, a hash of the prompt template and a
+hash of the chunk text filled into it, so editing a prompt invalidates its
+entries while unrelated code changes keep them. Entries expire after a TTL
+and the least recently used ones are dropped above a size cap.
+"""
+
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+
+CACHE_PATH = os.environ.get(
+    'LLM_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'llm_responses.sqlite3')
+)
+CACHE_TTL = float(os.environ.get('LLM_CACHE_TTL', 30 * 24 * 3600))
+CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 20000))
+CACHE_BYPASS = os.environ.get('LLM_CACHE_BYPASS', '') == '1'
+
+def _sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class LLMCache:
+    """SQLite-backed response cache, safe to share between generation threads"""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, bypass=CACHE_BYPASS):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # When bypassed, lookups always miss but fresh responses are still stored
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY, model TEXT, response TEXT,'
+                ' created_at REAL, last_used REAL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)')
+        return self._conn
+
+    @staticmethod
+    def make_key(model, template, text):
+        return _sha256(f"{model}\0{_sha256(template)}\0{_sha256(text)}")
+
+    def get(self, model, template, text):
+        """Return the cached response, or None on a miss"""
+        if self.bypass:
+            with self._lock:
+                self.misses += 1
+            return None
+        key = self.make_key(model, template, text)
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute('SELECT response, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+                if row and now - row[1] <= self.ttl:
+                    conn.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+                    conn.commit()
+                    self.hits += 1
+                    return row[0]
+                if row:
+                    conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    conn.commit()
+            except sqlite3.Error as e:
+                print(f"[WARNING] LLM cache lookup failed: {e}")
+            self.misses += 1
+            return None
+
+    def put(self, model, template, text, response):
+        key = self.make_key(model, template, text)
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, model, response, created_at, last_used)'
+                    ' VALUES (?, ?, ?, ?, ?)',
+                    (key, model, response, now, now)
+                )
+                conn.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,))
+                conn.execute(
+                    'DELETE FROM responses WHERE key IN ('
+                    ' SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                    (self.max_entries,)
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"[WARNING] LLM cache write failed: {e}")
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"LLM cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
@@ -0,0 +1,86 @@
+"""
+Bounded-concurrency LLM generation for chunked lesson text.
+
+Ollama serves OLLAMA_NUM_PARALLEL requests per loaded model at once, so
+running that many chunk requests side by side keeps the model busy without
+piling extra work into its queue. Results come back in chunk order.
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+LLM_CONCURRENCY = int(os.environ.get('OLLAMA_NUM_PARALLEL', 4))
+# httpx connect/read timeout for Ollama requests: a request fails (and is retried)
+# when no data arrives for this long, not after this long in total; a streamed
+# reply that keeps producing tokens is never cut off
+LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', 600))
+LLM_RETRIES = int(os.environ.get('LLM_RETRIES', 2))
+# Context window requested from Ollama (its own default of 2048 silently truncates
+# long prompts) and the part of it kept free for the model's reply
+LLM_CONTEXT_TOKENS = int(os.environ.get('LLM_CONTEXT_TOKENS', 4096))
+LLM_REPLY_TOKENS = int(os.environ.get('LLM_REPLY_TOKENS', 1024))
+RETRY_BACKOFF = 2.0
+
+def _call_with_retries(generate, index, item, retries, backoff):
+    attempt = 0
+    while True:
+        try:
+            return generate(index, item)
+        except Exception as e:
+            if attempt >= retries:
+                raise
+            attempt += 1
+            delay = backoff * attempt
+            print(f"[WARNING] Chunk {index} failed ({e}); retry {attempt}/{retries} in {delay:.0f}s")
+            time.sleep(delay)
+
+def generate_in_order(items, generate, concurrency=None, retries=None, backoff=RETRY_BACKOFF, on_error=None):
+    """
+    Run generate(index, item) for every item on a bounded thread pool and
+    yield (index, result) pairs in item order as soon as each one is ready.
+    Indexes start at 1 to match chunk numbering in the logs. A call that
+    still fails after `retries` extra attempts yields on_error(index, exc)
+    instead, or re-raises when no on_error is given.
+
+    items may be a lazy iterable: it is read only a few items ahead of the
+    requests in flight, so a producer (e.g. extraction of the next chapter)
+    can keep feeding the pool while earlier results are consumed.
+    """
+    if isinstance(items, (list, tuple)):
+        if not items:
+            return
+        concurrency = min(concurrency or LLM_CONCURRENCY, len(items))
+    concurrency = max(1, concurrency or LLM_CONCURRENCY)
+    retries = LLM_RETRIES if retries is None else retries
+    items = enumerate(items, 1)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque()
+
+        def fill():
+            # Keep a second round queued so the pool never waits on the producer
+            while len(pending) < concurrency * 2:
+                try:
+                    index, item = next(items)
+                except StopIteration:
+                    return
+                pending.append((index, executor.submit(_call_with_retries, generate, index, item, retries, backoff)))
+
+        try:
+            fill()
+            while pending:
+                index, future = pending.popleft()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    result = on_error(index, e)
+                yield index, result
+                fill()
+        finally:
+            # Stop queued chunks if the caller bails out early
+            for _, future in pending:
+                future.cancel()
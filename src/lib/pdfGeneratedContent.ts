@@ -19,10 +19,19 @@ export const mergeGeneratedContent = (generatedContent: GeneratedContent) => {
   };
 };
 
-// Import generated content from TypeScript files
-export const getGeneratedContent = async (subject: string, chapter: string): Promise<GeneratedContent | null> => {
+// Chapter content is published as JSON data (src/lib/scripts/<subject>_<chapter>_content.json)
+// and fetched at runtime, so new chapters don't need a rebuild
+const loadContentData = async (subject: string, chapter: string): Promise<GeneratedContent | null> => {
+  const params = new URLSearchParams({ action: 'chapter-data', subject, chapter });
+  const response = await fetch(`/api/pdf-process?${params}`);
+  if (response.ok) {
+    return response.json();
+  }
+  if (response.status !== 404) {
+    throw new Error(`Failed to load content for ${subject} - ${chapter}: ${response.status}`);
+  }
+  // Chapters generated before the JSON output only exist as TypeScript modules
   try {
-    // Try to dynamically import the generated TypeScript file
     const module = await import(`./scripts/${subject}_${chapter}_content.ts`);
     return {
       subject,
@@ -33,35 +42,31 @@ export const getGeneratedContent = async (subject: string, chapter: string): Pro
       total_quizzes: module.generatedQuizzes?.length || 0
     };
   } catch (error) {
-    console.error('Error loading generated content:', error);
     return null;
   }
 };
 
-// Functions needed by components
-export const hasPDFContent = async (subject: string, chapter: string): Promise<boolean> => {
+export const getGeneratedContent = async (subject: string, chapter: string): Promise<GeneratedContent | null> => {
   try {
-    const module = await import(`./scripts/${subject}_${chapter}_content.ts`);
-    return (module.generatedFlashcards?.length || 0) > 0 || (module.generatedQuizzes?.length || 0) > 0;
+    return await loadContentData(subject, chapter);
   } catch (error) {
-    return false;
+    console.error('Error loading generated content:', error);
+    return null;
   }
 };
 
+// Functions needed by components
+export const hasPDFContent = async (subject: string, chapter: string): Promise<boolean> => {
+  const content = await getGeneratedContent(subject, chapter);
+  return !!content && (content.flashcards.length > 0 || content.quizzes.length > 0);
+};
+
 export const getPDFFlashcards = async (subject: string, chapter: string): Promise<Flashcard[]> => {
-  try {
-    const module = await import(`./scripts/${subject}_${chapter}_content.ts`);
-    return module.generatedFlashcards || [];
-  } catch (error) {
-    return [];
-  }
+  const content = await getGeneratedContent(subject, chapter);
+  return content?.flashcards || [];
 };
 
 export const getPDFQuizzes = async (subject: string, chapter: string): Promise<QuizQuestion[]> => {
-  try {
-    const module = await import(`./scripts/${subject}_${chapter}_content.ts`);
-    return module.generatedQuizzes || [];
-  } catch (error) {
-    return [];
-  }
-}; 
\ No newline at end of file
+  const content = await getGeneratedContent(subject, chapter);
+  return content?.quizzes || [];
+};
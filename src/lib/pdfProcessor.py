@@ -1,4 +1,5 @@
 import os
+import re
 import sys
 import locale
 import time
@@ -14,78 +15,257 @@ if sys.platform.startswith('win'):
 import fitz  # PyMuPDF
 import pdfplumber
 import gc
+import hashlib
 import json
 import argparse
-from ollama import chat  # Official Python client
+import threading
+import uuid
+import queue
+from contextlib import nullcontext
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from ollama import Client  # Official Python client
+from extraction_cache import cached_extract_pages
+from llm_pool import generate_in_order, LLM_CONCURRENCY, LLM_TIMEOUT, LLM_CONTEXT_TOKENS, LLM_REPLY_TOKENS
+from llm_cache import LLMCache
+from text_chunker import iter_chunks, chunk_budget, estimate_tokens, CHUNK_OVERLAP_TOKENS
+from content_schema import ContentError, JsonStreamChecker, parse_reply, validate_content
+from content_store import write_chapter_content, content_file_name, load_manifest, is_up_to_date
+from pdf_catalog import PdfCatalog
 
 BOOKS_DIR = os.path.join(os.path.dirname(__file__), 'books')
 SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), 'scripts')
 os.makedirs(SCRIPTS_DIR, exist_ok=True)
 os.makedirs(BOOKS_DIR, exist_ok=True)
+CATALOG = PdfCatalog(BOOKS_DIR)
 
-def extract_text_from_pdf(pdf_path):
-    text = ''
+# Shared by the generation threads; the timeout bounds each wait for data from Ollama
+OLLAMA_CLIENT = Client(timeout=LLM_TIMEOUT)
+LESSON_MODEL = "gemma3n"
+LLM_CACHE = LLMCache()
+
+# When streaming (--stream), progress events are written to this file as NDJSON
+EVENT_STREAM = None
+# In worker mode (--serve), events are also handed to this callable
+EVENT_LISTENER = None
+_event_lock = threading.Lock()
+
+def emit_event(event, **fields):
+    """Publish one progress event; no-op unless streaming or serving"""
+    if EVENT_LISTENER is not None:
+        EVENT_LISTENER({"event": event, **fields})
+    if EVENT_STREAM is None:
+        return
+    line = json.dumps({"event": event, **fields}, ensure_ascii=False)
+    with _event_lock:
+        EVENT_STREAM.write(line + "\n")
+        EVENT_STREAM.flush()
+
+# Tokens generated by the model in this process, for the batch throughput summary
+GENERATED_TOKENS = 0
+_tokens_lock = threading.Lock()
+
+def _record_tokens(reply, final_part=None):
+    """Count a reply's tokens: Ollama's eval_count when it sent one, else an estimate"""
+    global GENERATED_TOKENS
+    count = (final_part or {}).get('eval_count') or estimate_tokens(reply)
+    with _tokens_lock:
+        GENERATED_TOKENS += count
+
+# Bump when extraction output changes so stale cache entries are ignored
+EXTRACTOR_NAME = 'pdfplumber+fitz'
+EXTRACTOR_VERSION = 1
+# Number of worker processes used for page-level text extraction
+EXTRACT_WORKERS = int(os.environ.get('PDF_EXTRACT_WORKERS', os.cpu_count() or 1))
+# Documents with fewer pages than this are extracted in-process (pool startup costs more)
+MIN_PAGES_PER_WORKER = 8
+# Long-lived extraction pool, kept warm between jobs in worker mode
+EXTRACT_POOL = None
+
+def _log_to_stderr():
+    # Under spawn/forkserver, workers re-import this module without the parent's
+    # --stream redirect, and their fd 1 is the NDJSON event stream
+    sys.stdout = sys.stderr
+
+def _new_extract_pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_log_to_stderr)
+
+def _extract_page_range(pdf_path, start, end):
+    """Extract pages [start, end) with pdfplumber; failed pages come back as None"""
+    pages = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[start:end]:
+            try:
+                pages.append(page.extract_text() or '')
+            except Exception as e:
+                print(f"[WARNING] pdfplumber failed on page {page.page_number} of {pdf_path}: {e}",
+                      file=sys.stderr)
+                pages.append(None)
+    return pages
+
+def _extract_pages_with_fitz(pdf_path, page_numbers):
+    """Extract only the given (0-based) pages with PyMuPDF"""
+    texts = {}
+    try:
+        doc = fitz.open(pdf_path)
+        for page_no in page_numbers:
+            try:
+                texts[page_no] = doc[page_no].get_text()
+            except Exception as e:
+                print(f"[ERROR] PyMuPDF failed on page {page_no + 1} of {pdf_path}: {e}")
+                texts[page_no] = ''
+        doc.close()
+    except Exception as e:
+        print(f"Failed to extract {pdf_path}: {e}")
+    return texts
+
+def _count_pages(pdf_path):
     try:
         with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ''
+            return len(pdf.pages)
+    except Exception as e:
+        print(f"Error opening {pdf_path} with pdfplumber: {e}, trying PyMuPDF...")
+        return None
+
+def _fitz_page_count(pdf_path):
+    try:
+        with fitz.open(pdf_path) as doc:
+            return doc.page_count
     except Exception as e:
-        print(f"Error extracting {pdf_path} with pdfplumber: {e}, trying PyMuPDF...")
+        print(f"Failed to extract {pdf_path}: {e}")
+        return 0
+
+def extract_pages_from_pdf(pdf_path, workers=None):
+    """Extract the text of every page, in page order, across a process pool"""
+    workers = max(1, workers or EXTRACT_WORKERS)
+    page_count = _count_pages(pdf_path)
+    if page_count is None:
+        # pdfplumber cannot read the document at all, so PyMuPDF gets every page
+        page_count = _fitz_page_count(pdf_path)
+        texts = _extract_pages_with_fitz(pdf_path, range(page_count))
+        return [texts.get(i, '') for i in range(page_count)]
+
+    workers = min(workers, max(1, page_count // MIN_PAGES_PER_WORKER))
+    # A warm pool has no startup cost to amortise, so short documents go to it too
+    # and extraction stays off the calling thread
+    if workers == 1 and EXTRACT_POOL is None:
         try:
-            doc = fitz.open(pdf_path)
-            for page in doc:
-                text += page.get_text()
-        except Exception as e2:
-            print(f"Failed to extract {pdf_path}: {e2}")
-    return text
-
-def chunk_text(text, max_chars=1000, overlap=100):
-    """Create smaller, more focused chunks for faster processing"""
-    start = 0
-    length = len(text)
-    while start < length:
-        end = min(start + max_chars, length)
-        chunk = text[start:end]
-        
-        # Try to end at a sentence boundary
-        if end < length:
-            last_period = chunk.rfind('.')
-            last_question = chunk.rfind('?')
-            last_exclamation = chunk.rfind('!')
-            last_newline = chunk.rfind('\n')
-            
-            best_end = max(last_period, last_question, last_exclamation, last_newline)
-            if best_end > max_chars * 0.7:  # Only adjust if we don't lose too much content
-                end = start + best_end + 1
-                chunk = text[start:end]
-        
-        yield chunk
-        start = end - overlap
+            pages = _extract_page_range(pdf_path, 0, page_count)
+        except Exception as e:
+            print(f"Error extracting {pdf_path} with pdfplumber: {e}, trying PyMuPDF...")
+            pages = [None] * page_count
+    else:
+        # One contiguous page range per worker, so each process opens the PDF once
+        step = -(-page_count // workers)
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        pages = []
+        pool = nullcontext(EXTRACT_POOL) if EXTRACT_POOL else _new_extract_pool(workers)
+        with pool as executor:
+            futures = [executor.submit(_extract_page_range, pdf_path, start, end) for start, end in ranges]
+            for (start, end), future in zip(ranges, futures):
+                try:
+                    pages.extend(future.result())
+                except Exception as e:
+                    print(f"[WARNING] Extraction of pages {start + 1}-{end} failed: {e}")
+                    pages.extend([None] * (end - start))
 
-def generate_lesson_script(raw_text, subject, chapter_name, chunk_idx=None):
-    prompt = f"""Analyze this text and provide a comprehensive summary with key concepts, important facts, and main ideas. Focus on extracting educational content that could be used for learning.
+    failed = [i for i, page in enumerate(pages) if page is None]
+    if failed:
+        print(f"[INFO] Retrying {len(failed)} page(s) with PyMuPDF...")
+        recovered = _extract_pages_with_fitz(pdf_path, failed)
+        for page_no in failed:
+            pages[page_no] = recovered.get(page_no, '')
+    return pages
+
+def extract_text_from_pdf(pdf_path, workers=None, pdf_hash=None):
+    pages = cached_extract_pages(pdf_path, EXTRACTOR_NAME, EXTRACTOR_VERSION,
+                                 lambda path: extract_pages_from_pdf(path, workers=workers), pdf_hash=pdf_hash)
+    return ''.join(pages)
+
+LESSON_PROMPT_TEMPLATE = """Analyze this text and provide a comprehensive summary with key concepts, important facts, and main ideas. Focus on extracting educational content that could be used for learning.
 
-    Text: {raw_text[:800]}
+    Text: {text}
     
     Provide a detailed analysis covering:
     1. Main topics and concepts
     2. Key facts and information
     3. Important details that students should remember
     4. Connections between different ideas in the text"""
+
+LLM_OPTIONS = {'num_ctx': LLM_CONTEXT_TOKENS}
+
+# "json" asks for flashcards and quizzes directly in Ollama's JSON mode;
+# "prose" asks for an analysis and cuts items out of its sentences
+GENERATION_MODES = ('json', 'prose')
+GENERATION_MODE = os.environ.get('PDF_GENERATION_MODE', 'json')
+# Follow-up requests allowed to fix a JSON reply that fails validation
+JSON_REPAIR_RETRIES = int(os.environ.get('JSON_REPAIR_RETRIES', 1))
+# The reply budget also caps generation, so a runaway reply can't fill the window
+JSON_OPTIONS = dict(LLM_OPTIONS, num_predict=LLM_REPLY_TOKENS)
+
+CONTENT_PROMPT_TEMPLATE = """You are an expert children's educator. Create study material from this textbook text.
+
+Create up to 4 flashcards and up to 3 multiple-choice quiz questions about the most important ideas in the text.
+Each quiz question has exactly 4 different options, and "answer" is the index (0-3) of the correct one.
+"difficulty" is "easy", "medium" or "hard".
+
+Respond with ONLY a JSON object in this shape:
+{{
+  "flashcards": [
+    {{"front": "What is photosynthesis?", "back": "How plants make food from sunlight, water and carbon dioxide.", "difficulty": "medium"}}
+  ],
+  "quizzes": [
+    {{"question": "Which part of the plant makes food?", "options": ["Root", "Leaf", "Stem", "Flower"], "answer": 1, "hint": "It is usually green and flat.", "difficulty": "easy", "points": 10}}
+  ]
+}}
+
+Text: {text}"""
+
+CONTENT_REPAIR_PROMPT = """That reply could not be used: {error}
+Respond again with ONLY the corrected JSON object in the same shape."""
+
+# Each chunk fills whatever the context window has left after the longer prompt and the reply
+CHUNK_TOKENS = min(chunk_budget(LLM_CONTEXT_TOKENS, template, LLM_REPLY_TOKENS)
+                   for template in (LESSON_PROMPT_TEMPLATE, CONTENT_PROMPT_TEMPLATE))
+
+def request_lesson_script(raw_text, chunk_idx=None):
+    """Ask the model for a lesson analysis of one chunk; errors propagate to the caller"""
+    cached = LLM_CACHE.get(LESSON_MODEL, LESSON_PROMPT_TEMPLATE, raw_text)
+    if cached is not None:
+        print(f"[CACHE] Chunk {chunk_idx} served from LLM response cache")
+        emit_event("tokens", chunk=chunk_idx, text=cached)
+        emit_event("chunk_done", chunk=chunk_idx, cached=True, seconds=0.0)
+        return cached
+    prompt = LESSON_PROMPT_TEMPLATE.format(text=raw_text)
+    messages = [{"role": "user", "content": prompt}]
+    
+    start_time = time.time()
+    if EVENT_STREAM is not None:
+        # Forward tokens as they arrive so the UI shows output long before the chunk finishes
+        parts = []
+        for part in OLLAMA_CLIENT.chat(model=LESSON_MODEL, messages=messages, stream=True, options=LLM_OPTIONS):
+            token = part['message']['content']
+            if token:
+                parts.append(token)
+                emit_event("tokens", chunk=chunk_idx, text=token)
+        result = ''.join(parts).strip()
+        _record_tokens(result, part)
+    else:
+        response = OLLAMA_CLIENT.chat(model=LESSON_MODEL, messages=messages, options=LLM_OPTIONS)
+        result = response['message']['content'].strip()
+        _record_tokens(result, response)
     
+    processing_time = time.time() - start_time
+    print(f"[SUCCESS] Chunk {chunk_idx} generated in {processing_time:.1f}s")
+    emit_event("chunk_done", chunk=chunk_idx, cached=False, seconds=round(processing_time, 2))
+    LLM_CACHE.put(LESSON_MODEL, LESSON_PROMPT_TEMPLATE, raw_text, result)
+    return result
+
+def generate_lesson_script(raw_text, subject, chapter_name, chunk_idx=None):
     try:
-        import time
-        start_time = time.time()
-        
-        response = chat(model="gemma3n", messages=[
-            {"role": "user", "content": prompt}
-        ])
-        
-        processing_time = time.time() - start_time
-        result = response['message']['content']
-        print(f"[SUCCESS] Chunk {chunk_idx} generated in {processing_time:.1f}s")
-        return result.strip()
-        
+        return request_lesson_script(raw_text, chunk_idx=chunk_idx)
     except KeyboardInterrupt:
         print(f"[WARNING] Chunk {chunk_idx} interrupted by user")
         return "Analysis interrupted by user"
@@ -93,224 +273,239 @@ def generate_lesson_script(raw_text, subject, chapter_name, chunk_idx=None):
         print(f"[ERROR] Error in generating lesson for chunk {chunk_idx}: {e}")
         return "Error occurred during analysis"
 
+def _stream_json_reply(messages, chunk_idx):
+    """Stream one JSON-mode reply; returns (reply, error) and stops early on either outcome"""
+    checker = JsonStreamChecker()
+    parts = []
+    part = None
+    stream = OLLAMA_CLIENT.chat(model=LESSON_MODEL, messages=messages, stream=True,
+                                format='json', options=JSON_OPTIONS)
+    try:
+        for part in stream:
+            token = part['message']['content']
+            if not token:
+                continue
+            parts.append(token)
+            emit_event("tokens", chunk=chunk_idx, text=token)
+            if checker.feed(token):
+                break  # the object is complete; don't wait for trailing padding
+    except ContentError as e:
+        return ''.join(parts), e
+    finally:
+        # Closing the stream drops the connection, which stops generation in Ollama
+        stream.close()
+        _record_tokens(''.join(parts), part if part and part.get('done') else None)
+    return ''.join(parts), None
+
+def request_structured_content(raw_text, subject, chapter, chunk_idx=None):
+    """
+    Generate flashcards and quizzes for one chunk in a single JSON-mode call.
+    A reply that fails validation is sent back once per JSON_REPAIR_RETRIES
+    with the reason; after that the ContentError propagates to the caller.
+    """
+    cached = LLM_CACHE.get(LESSON_MODEL, CONTENT_PROMPT_TEMPLATE, raw_text)
+    if cached is not None:
+        print(f"[CACHE] Chunk {chunk_idx} served from LLM response cache")
+        emit_event("chunk_done", chunk=chunk_idx, cached=True, seconds=0.0)
+        flashcards, quizzes, _ = validate_content(json.loads(cached), subject, chapter)
+        return flashcards, quizzes
+
+    messages = [{"role": "user", "content": CONTENT_PROMPT_TEMPLATE.format(text=raw_text)}]
+    start_time = time.time()
+    for attempt in range(JSON_REPAIR_RETRIES + 1):
+        reply, error = _stream_json_reply(messages, chunk_idx)
+        if error is None:
+            try:
+                flashcards, quizzes, problems = validate_content(parse_reply(reply), subject, chapter)
+                break
+            except ContentError as e:
+                error = e
+        if attempt == JSON_REPAIR_RETRIES:
+            raise error
+        print(f"[WARNING] Chunk {chunk_idx} reply rejected ({error}); asking for a repair")
+        messages = messages[:1] + [
+            {"role": "assistant", "content": reply},
+            {"role": "user", "content": CONTENT_REPAIR_PROMPT.format(error=error)},
+        ]
+
+    processing_time = time.time() - start_time
+    if problems:
+        print(f"[WARNING] Chunk {chunk_idx}: dropped {len(problems)} invalid item(s): {'; '.join(problems)}")
+    print(f"[SUCCESS] Chunk {chunk_idx} generated {len(flashcards)} flashcards and {len(quizzes)} quizzes "
+          f"in {processing_time:.1f}s")
+    emit_event("chunk_done", chunk=chunk_idx, cached=False, seconds=round(processing_time, 2))
+    # Only validated items are cached, so a hit never needs repairing
+    LLM_CACHE.put(LESSON_MODEL, CONTENT_PROMPT_TEMPLATE, raw_text,
+                  json.dumps({'flashcards': flashcards, 'quizzes': quizzes}, ensure_ascii=False))
+    return flashcards, quizzes
+
+def content_from_prose(lesson_script, subject, chapter):
+    """Cut flashcards and quizzes out of a prose analysis (the --generation prose heuristics)"""
+    # Extract key concepts from the AI response for flashcards
+    sentences = re.split(r'[.!?]+', lesson_script)
+    key_concepts = []
+
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if len(sentence) > 20 and len(sentence) < 200:  # Reasonable length for flashcards
+            key_concepts.append(sentence)
+
+    # Create flashcards from key concepts (limit to 3 per chunk)
+    chunk_flashcards = []
+    for i, concept in enumerate(key_concepts[:3]):
+        # Clean the concept text
+        clean_concept = concept.replace('*', '').replace('#', '').strip()
+        if len(clean_concept) > 20:
+            # Create a simple question-answer pair
+            words = clean_concept.split()
+            if len(words) > 8:
+                # Split into question and answer
+                mid_point = len(words) // 2
+                question_words = words[:mid_point]
+                answer_words = words[mid_point:]
+
+                question = ' '.join(question_words)
+                answer = ' '.join(answer_words)
+
+                # Create a proper question
+                if question.lower().startswith('what is'):
+                    front = question
+                else:
+                    front = f"What is {question}?"
+
+                flashcard = {
+                    "front": front,
+                    "back": answer,
+                    "subject": subject,
+                    "category": chapter,
+                    "difficulty": "easy"
+                }
+                chunk_flashcards.append(flashcard)
+
+    # Create quiz questions from the content
+    chunk_quizzes = []
+    for i, concept in enumerate(key_concepts[:2]):
+        clean_concept = concept.replace('*', '').replace('#', '').strip()
+        if len(clean_concept) > 30:
+            # Create a meaningful question
+            question_text = clean_concept[:100] if len(clean_concept) > 100 else clean_concept
+            quiz = {
+                "question": f"What is the main topic discussed in: '{question_text}'?",
+                "options": [
+                    "Traditional craftsmanship",
+                    "Modern technology", 
+                    "Economic development",
+                    "Social issues"
+                ],
+                "answer": 0,
+                "hint": "Think about the traditional aspects mentioned",
+                "subject": subject,
+                "difficulty": "easy",
+                "points": 10
+            }
+            chunk_quizzes.append(quiz)
+
+    return chunk_flashcards, chunk_quizzes
+
+def generate_chunk_content(chunk, subject, chapter, generation, chunk_idx=None):
+    """(flashcards, quizzes) for one chunk in the given generation mode"""
+    if generation == 'json':
+        return request_structured_content(chunk, subject, chapter, chunk_idx=chunk_idx)
+    return content_from_prose(request_lesson_script(chunk, chunk_idx=chunk_idx), subject, chapter)
+
+def chapter_source(entry, generation):
+    """What a chapter's content is built from; unchanged means the content is up to date"""
+    template = CONTENT_PROMPT_TEMPLATE if generation == 'json' else LESSON_PROMPT_TEMPLATE
+    return {
+        'sha256': entry['sha256'],
+        'generation': generation,
+        'model': LESSON_MODEL,
+        'prompt': hashlib.sha256(template.encode('utf-8')).hexdigest()[:16],
+        'chunk_tokens': CHUNK_TOKENS,
+    }
+
+def publish_chapter_content(subject, chapter, flashcards, quizzes, source, failed=False):
+    """
+    Write a chapter's content file and manifest entry, returning its path. A
+    build with failed chunks only fills in a chapter that has no content yet;
+    otherwise the existing file is kept and None is returned.
+    """
+    if failed and os.path.exists(os.path.join(SCRIPTS_DIR, content_file_name(subject, chapter))):
+        print(f"[WARNING] Keeping the existing content for {subject} - {chapter}; some chunks failed")
+        return None
+    return write_chapter_content(SCRIPTS_DIR, subject, chapter, flashcards, quizzes, source)
+
 def find_pdf_by_subject_chapter(subject, chapter):
     """Find PDF file by subject and chapter name"""
-    subject_dir = os.path.join(BOOKS_DIR, subject)
-    if not os.path.exists(subject_dir):
-        return None
-    
-    for file in os.listdir(subject_dir):
-        if file.lower().endswith('.pdf') and chapter.lower() in file.lower():
-            return os.path.join(subject_dir, file)
-    return None
+    entry = CATALOG.find(subject, chapter)
+    return entry['path'] if entry else None
 
-def process_pdf_for_subject_chapter(subject, chapter):
+def process_pdf_for_subject_chapter(subject, chapter, workers=None, max_chunks=None, concurrency=None,
+                                    generation=None):
     """Process PDF for specific subject and chapter"""
-    pdf_path = find_pdf_by_subject_chapter(subject, chapter)
-    if not pdf_path:
+    generation = generation or GENERATION_MODE
+    if generation not in GENERATION_MODES:
+        raise ValueError(f"Unknown generation mode '{generation}' (expected one of {', '.join(GENERATION_MODES)})")
+    entry = CATALOG.find(subject, chapter)
+    if not entry:
         print(f"[ERROR] No PDF found for subject '{subject}' and chapter '{chapter}'")
         return None
+    pdf_path = entry['path']
     
     print(f"[INFO] Extracting text from: {pdf_path}")
-    raw_text = extract_text_from_pdf(pdf_path)
+    start_time = time.time()
+    # The catalog already hashed the PDF, so the extraction cache needn't read it again
+    raw_text = extract_text_from_pdf(pdf_path, workers=workers, pdf_hash=entry['sha256'])
+    print(f"[INFO] Extracted {len(raw_text)} chars in {time.time() - start_time:.1f}s")
     if not raw_text.strip():
         print(f"[WARNING] Extracted text is empty for: {pdf_path}")
         return None
     
-    # Process chunks one by one to avoid memory issues
-    chunk_generator = chunk_text(raw_text, max_chars=1000, overlap=100)
+    chunks = list(iter_chunks(raw_text, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS))
+    if max_chunks:
+        chunks = chunks[:max_chunks]
+    concurrency = concurrency or LLM_CONCURRENCY
+    print(f"[INFO] Generating {len(chunks)} chunks of up to ~{CHUNK_TOKENS} tokens in {generation} mode "
+          f"with up to {concurrency} concurrent requests")
     all_flashcards = []
     all_quizzes = []
     
-    # Process only first 2 chunks for faster results
-    chunk_count = 0
-    max_chunks = 2
+    failed_chunks = []
     
-    for chunk in chunk_generator:
-        if chunk_count >= max_chunks:
-            break
-            
-        chunk_count += 1
-        print(f"[INFO] Processing chunk {chunk_count} ({len(chunk)} chars)...")
-        lesson_script = generate_lesson_script(chunk, subject, chapter, chunk_idx=chunk_count)
-        
-        # Debug: Print the first 200 characters of the response
-        print(f"[DEBUG] AI Response preview: {lesson_script[:200]}...")
-        
-        # Create TypeScript content directly from AI response
-        print(f"[INFO] Creating TypeScript content from chunk {chunk_count}")
-        
-        # Generate flashcards and quizzes based on the AI response
-        # We'll create structured content based on the text analysis
-        import re
-        
-        # Extract key concepts from the AI response for flashcards
-        sentences = re.split(r'[.!?]+', lesson_script)
-        key_concepts = []
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) > 20 and len(sentence) < 200:  # Reasonable length for flashcards
-                key_concepts.append(sentence)
-        
-        # Create flashcards from key concepts (limit to 3 per chunk)
-        chunk_flashcards = []
-        for i, concept in enumerate(key_concepts[:3]):
-            # Clean the concept text
-            clean_concept = concept.replace('*', '').replace('#', '').strip()
-            if len(clean_concept) > 20:
-                # Create a simple question-answer pair
-                words = clean_concept.split()
-                if len(words) > 8:
-                    # Split into question and answer
-                    mid_point = len(words) // 2
-                    question_words = words[:mid_point]
-                    answer_words = words[mid_point:]
-                    
-                    question = ' '.join(question_words)
-                    answer = ' '.join(answer_words)
-                    
-                    # Create a proper question
-                    if question.lower().startswith('what is'):
-                        front = question
-                    else:
-                        front = f"What is {question}?"
-                    
-                    flashcard = {
-                        "front": front,
-                        "back": answer,
-                        "subject": subject,
-                        "category": chapter,
-                        "difficulty": "easy"
-                    }
-                    chunk_flashcards.append(flashcard)
-        
-        # Create quiz questions from the content
-        chunk_quizzes = []
-        for i, concept in enumerate(key_concepts[:2]):
-            clean_concept = concept.replace('*', '').replace('#', '').strip()
-            if len(clean_concept) > 30:
-                # Create a meaningful question
-                question_text = clean_concept[:100] if len(clean_concept) > 100 else clean_concept
-                quiz = {
-                    "question": f"What is the main topic discussed in: '{question_text}'?",
-                    "options": [
-                        "Traditional craftsmanship",
-                        "Modern technology", 
-                        "Economic development",
-                        "Social issues"
-                    ],
-                    "answer": 0,
-                    "hint": "Think about the traditional aspects mentioned",
-                    "subject": subject,
-                    "difficulty": "easy",
-                    "points": 10
-                }
-                chunk_quizzes.append(quiz)
-        
+    def generate_chunk(idx, chunk):
+        print(f"[INFO] Processing chunk {idx} ({len(chunk)} chars)...")
+        emit_event("chunk_started", chunk=idx, total=len(chunks), chars=len(chunk))
+        return generate_chunk_content(chunk, subject, chapter, generation, chunk_idx=idx)
+    
+    def chunk_failed(idx, error):
+        print(f"[ERROR] Error in generating lesson for chunk {idx}: {error}")
+        emit_event("chunk_failed", chunk=idx, error=str(error))
+        failed_chunks.append(idx)
+        return [], []
+    
+    # Results arrive in chunk order, so flashcard and quiz order matches the text
+    for chunk_count, (chunk_flashcards, chunk_quizzes) in generate_in_order(
+            chunks, generate_chunk, concurrency=concurrency, on_error=chunk_failed):
         # Add to main collections
         all_flashcards.extend(chunk_flashcards)
         all_quizzes.extend(chunk_quizzes)
         
         print(f"[INFO] Added {len(chunk_flashcards)} flashcards and {len(chunk_quizzes)} quizzes from chunk {chunk_count}")
+        emit_event("flashcards", chunk=chunk_count, flashcards=chunk_flashcards, quizzes=chunk_quizzes)
         
         gc.collect()
     
-    # Add IDs to flashcards and quizzes
-    for i, flashcard in enumerate(all_flashcards):
-        flashcard['id'] = i + 1
-    
-    for i, quiz in enumerate(all_quizzes):
-        quiz['id'] = i + 1
-    
-    # Generate TypeScript file with the content
-    ts_content = f"""// Auto-generated content from PDF: {subject} - {chapter}
-// Generated on: {time.strftime('%Y-%m-%d %H:%M:%S')}
-
-import {{ QuizQuestion, Flashcard }} from '../quizData';
-
-// Generated Quiz Questions
-export const generatedQuizzes: QuizQuestion[] = [
-"""
-    
-    # Add quiz content
-    for i, quiz in enumerate(all_quizzes, 1):
-        # Clean and escape the question text
-        question_text = quiz.get('question', 'Question')
-        question_text = question_text.replace('"', '\\"').replace('\n', ' ').replace('\r', ' ')
-        question_text = ' '.join(question_text.split())  # Remove extra whitespace
-        
-        hint_text = quiz.get('hint', 'Hint')
-        hint_text = hint_text.replace('"', '\\"').replace('\n', ' ').replace('\r', ' ')
-        hint_text = ' '.join(hint_text.split())  # Remove extra whitespace
-        
-        ts_content += f"""  {{
-    id: {i},
-    question: "{question_text}",
-    options: {json.dumps(quiz.get('options', ['A', 'B', 'C', 'D']))},
-    answer: {quiz.get('answer', 0)},
-    hint: "{hint_text}",
-    subject: "{quiz.get('subject', subject)}",
-    difficulty: "{quiz.get('difficulty', 'easy')}",
-    points: {quiz.get('points', 10)}
-  }},
-"""
-    
-    ts_content += """];
-
-// Generated Flashcards
-export const generatedFlashcards: Flashcard[] = [
-"""
-    
-    # Add flashcard content
-    for i, flashcard in enumerate(all_flashcards, 1):
-        # Clean and escape the flashcard text
-        front_text = flashcard.get('front', 'Question')
-        front_text = front_text.replace('"', '\\"').replace('\n', ' ').replace('\r', ' ')
-        front_text = ' '.join(front_text.split())  # Remove extra whitespace
-        
-        back_text = flashcard.get('back', 'Answer')
-        back_text = back_text.replace('"', '\\"').replace('\n', ' ').replace('\r', ' ')
-        back_text = ' '.join(back_text.split())  # Remove extra whitespace
-        
-        ts_content += f"""  {{
-    id: {i},
-    front: "{front_text}",
-    back: "{back_text}",
-    subject: "{flashcard.get('subject', subject)}",
-    category: "{flashcard.get('category', chapter)}",
-    difficulty: "{flashcard.get('difficulty', 'easy')}"
-  }},
-"""
-    
-    ts_content += """];
-
-// Helper functions
-export const getGeneratedQuizzes = (): QuizQuestion[] => {
-  return generatedQuizzes;
-};
-
-export const getGeneratedFlashcards = (): Flashcard[] => {
-  return generatedFlashcards;
-};
-
-export const getGeneratedContentStats = () => {
-  return {
-    totalQuizzes: generatedQuizzes.length,
-    totalFlashcards: generatedFlashcards.length,
-    subject: "{subject}",
-    chapter: "{chapter}"
-  };
-};
-"""
-    
-    # Save the TypeScript file
-    ts_file_path = os.path.join(SCRIPTS_DIR, f"{subject}_{chapter}_content.ts")
-    with open(ts_file_path, 'w', encoding='utf-8') as f:
-        f.write(ts_content)
-    
-    print(f"[SUCCESS] Generated TypeScript file: {ts_file_path}")
+    # Without a source the chapter counts as stale, so batch runs retry failed or partial builds
+    source = None if failed_chunks or max_chunks else chapter_source(entry, generation)
+    content_path = publish_chapter_content(subject, chapter, all_flashcards, all_quizzes, source,
+                                           failed=bool(failed_chunks))
+    if content_path is None:
+        return None
+    print(f"[SUCCESS] Generated content file: {content_path}")
     print(f"[INFO] Total quizzes: {len(all_quizzes)}, Total flashcards: {len(all_flashcards)}")
+    print(f"[INFO] {LLM_CACHE.summary()}")
+    emit_event("done", total_flashcards=len(all_flashcards), total_quizzes=len(all_quizzes),
+               file_path=os.path.basename(content_path))
     
     return {
         'subject': subject,
@@ -323,37 +518,382 @@ export const getGeneratedContentStats = () => {
 
 def get_available_subjects():
     """Get list of available subjects (folders in BOOKS_DIR)"""
-    if not os.path.exists(BOOKS_DIR):
-        return []
-    return [d for d in os.listdir(BOOKS_DIR) if os.path.isdir(os.path.join(BOOKS_DIR, d))]
+    return CATALOG.subjects()
 
 def get_available_chapters(subject):
     """Get list of available chapters for a subject"""
-    subject_dir = os.path.join(BOOKS_DIR, subject)
-    if not os.path.exists(subject_dir):
-        return []
-    
-    chapters = []
-    for file in os.listdir(subject_dir):
-        if file.lower().endswith('.pdf'):
-            # Extract chapter name from filename (remove .pdf extension)
-            chapter_name = os.path.splitext(file)[0]
-            chapters.append(chapter_name)
-    return chapters
+    return CATALOG.chapters(subject)
+
+# === Batch mode ===
+# Every chapter of the library in one pipeline: the process pool extracts the
+# next chapters while the model works through the chunks of the current ones.
+
+# Chapters extracted ahead of the one being generated
+BATCH_EXTRACT_AHEAD = int(os.environ.get('PDF_BATCH_EXTRACT_AHEAD', 4))
+
+def process_library(subjects=None, workers=None, concurrency=None, generation=None, force=False,
+                    max_chunks=None):
+    """
+    Generate content for every chapter of the given subjects (default: all),
+    skipping chapters whose manifest entry was built from the same PDF and
+    settings. Returns a summary dict with per-chapter failures.
+    """
+    global EXTRACT_POOL
+    generation = generation or GENERATION_MODE
+    if generation not in GENERATION_MODES:
+        raise ValueError(f"Unknown generation mode '{generation}' (expected one of {', '.join(GENERATION_MODES)})")
+    workers = max(1, workers or EXTRACT_WORKERS)
+    concurrency = concurrency or LLM_CONCURRENCY
+
+    entries = CATALOG.entries_for(subjects)
+    for subject in sorted(set(subjects or ()) - {entry['subject'] for entry in entries}):
+        print(f"[WARNING] No chapter PDFs found for subject '{subject}'")
+    manifest = load_manifest(SCRIPTS_DIR)
+    todo = [entry for entry in entries
+            if force or not is_up_to_date(manifest, entry['subject'], entry['chapter'], chapter_source(entry, generation))]
+    summary = {'chapters': len(entries), 'skipped': len(entries) - len(todo), 'done': 0, 'failed': [],
+               'pages': 0, 'chunks': 0, 'tokens': 0, 'seconds': 0.0}
+    print(f"[INFO] {len(entries)} chapters, {summary['skipped']} up to date, {len(todo)} to generate "
+          f"in {generation} mode ({workers} extraction workers, {concurrency} concurrent requests)")
+    if not todo:
+        return summary
+
+    # Chapters whose chunks have been handed to the pool, in order, one per chunk
+    in_flight = deque()
+    start_time = time.time()
+    start_tokens = GENERATED_TOKENS
+
+    def chapter_failed(entry, reason):
+        print(f"[ERROR] {entry['subject']} - {entry['chapter']}: {reason}")
+        summary['failed'].append(f"{entry['subject']}/{entry['chapter']}")
+
+    def chunk_stream(extractor):
+        upcoming = iter(todo)
+        extracting = deque()
+
+        def fill():
+            while len(extracting) < BATCH_EXTRACT_AHEAD:
+                entry = next(upcoming, None)
+                if entry is None:
+                    return
+                extracting.append((entry, extractor.submit(extract_text_from_pdf, entry['path'],
+                                                           workers, entry['sha256'])))
+
+        fill()
+        while extracting:
+            entry, future = extracting.popleft()
+            fill()
+            try:
+                raw_text = future.result()
+            except Exception as e:
+                chapter_failed(entry, f"extraction failed: {e}")
+                continue
+            chunks = list(iter_chunks(raw_text, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS))
+            if max_chunks:
+                chunks = chunks[:max_chunks]
+            if not chunks:
+                chapter_failed(entry, "extracted text is empty")
+                continue
+            summary['pages'] += entry['pages'] or 0
+            print(f"[INFO] {entry['subject']} - {entry['chapter']}: {len(raw_text)} chars, {len(chunks)} chunks")
+            chapter = {'entry': entry, 'chunks': len(chunks), 'received': 0, 'failed': 0,
+                       'flashcards': [], 'quizzes': []}
+            for idx, chunk in enumerate(chunks, 1):
+                in_flight.append(chapter)
+                yield chapter, idx, chunk
+
+    def generate_chunk(index, item):
+        chapter, idx, chunk = item
+        entry = chapter['entry']
+        return generate_chunk_content(chunk, entry['subject'], entry['chapter'], generation, chunk_idx=idx)
+
+    def chunk_failed(index, error):
+        entry = in_flight[0]['entry']
+        print(f"[ERROR] Error in generating content for {entry['subject']} - {entry['chapter']}: {error}")
+        return None
+
+    # One warm pool for the whole run instead of a fresh one per chapter
+    owns_pool = workers > 1 and EXTRACT_POOL is None
+    if owns_pool:
+        EXTRACT_POOL = _new_extract_pool(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix='pdf-extract') as extractor:
+            # Results arrive in the order chunks were produced, so each one belongs to in_flight[0]
+            for _, result in generate_in_order(chunk_stream(extractor), generate_chunk,
+                                               concurrency=concurrency, on_error=chunk_failed):
+                chapter = in_flight.popleft()
+                chapter['received'] += 1
+                summary['chunks'] += 1
+                if result is None:
+                    chapter['failed'] += 1
+                else:
+                    chapter['flashcards'].extend(result[0])
+                    chapter['quizzes'].extend(result[1])
+                if chapter['received'] < chapter['chunks']:
+                    continue
+                entry = chapter['entry']
+                complete = not chapter['failed'] and not max_chunks
+                written = publish_chapter_content(entry['subject'], entry['chapter'], chapter['flashcards'],
+                                                  chapter['quizzes'], chapter_source(entry, generation) if complete else None,
+                                                  failed=bool(chapter['failed']))
+                if chapter['failed']:
+                    chapter_failed(entry, f"{chapter['failed']} of {chapter['chunks']} chunks failed "
+                                          f"({'partial content written' if written else 'existing content kept'})")
+                else:
+                    summary['done'] += 1
+                    print(f"[SUCCESS] {entry['subject']} - {entry['chapter']}: {len(chapter['flashcards'])} "
+                          f"flashcards, {len(chapter['quizzes'])} quizzes")
+                gc.collect()
+    finally:
+        if owns_pool:
+            EXTRACT_POOL.shutdown(cancel_futures=True)
+            EXTRACT_POOL = None
+
+    elapsed = time.time() - start_time
+    summary.update(tokens=GENERATED_TOKENS - start_tokens, seconds=elapsed)
+    rate = lambda count: count / elapsed if elapsed else 0.0
+    print(f"[INFO] Batch finished in {elapsed:.1f}s: {summary['done']} chapters generated, "
+          f"{summary['skipped']} skipped, {len(summary['failed'])} failed")
+    print(f"[INFO] Throughput: {rate(summary['pages']):.2f} pages/s, {rate(summary['chunks']):.2f} chunks/s, "
+          f"{rate(summary['tokens']):.1f} generated tokens/s")
+    print(f"[INFO] {LLM_CACHE.summary()}")
+    return summary
+
+# === Worker mode ===
+# A resident process that keeps imports, caches, the Ollama client and the
+# extraction pool warm, and runs processing jobs one at a time from a queue.
+
+WORKER_HOST = os.environ.get('PDF_WORKER_HOST', '127.0.0.1')
+WORKER_PORT = int(os.environ.get('PDF_WORKER_PORT', 8765))
+# Finished jobs kept around for status lookups
+MAX_FINISHED_JOBS = 200
+# Finished jobs that also keep their progress events, for streams still reading them
+MAX_FINISHED_EVENT_JOBS = 10
+
+class JobQueue:
+    def __init__(self):
+        self.jobs = {}
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+
+    def submit(self, subject, chapter, options):
+        job = {
+            'id': uuid.uuid4().hex,
+            'subject': subject,
+            'chapter': chapter,
+            'options': options,
+            'status': 'queued',
+            'progress': {'chunks_total': None, 'chunks_done': 0},
+            'events': [],
+            'result': None,
+            'error': None,
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+        }
+        with self.lock:
+            self.jobs[job['id']] = job
+            self._prune()
+        self.pending.put(job['id'])
+        return self.snapshot(job['id'])
+
+    def snapshot(self, job_id, events_after=None):
+        """Job status; with events_after, also the progress events after that many"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = {key: value for key, value in job.items() if key != 'events'}
+            snapshot['progress'] = dict(job['progress'])
+            if events_after is not None:
+                snapshot['events'] = job['events'][events_after:]
+            if job['status'] == 'queued':
+                snapshot['position'] = sum(
+                    1 for other in self.jobs.values()
+                    if other['status'] == 'queued' and other['submitted_at'] <= job['submitted_at']
+                )
+            return snapshot
+
+    def summary(self):
+        with self.lock:
+            statuses = [job['status'] for job in self.jobs.values()]
+        return {status: statuses.count(status) for status in ('queued', 'running', 'done', 'failed')}
+
+    def _prune(self):
+        finished = sorted(
+            (job for job in self.jobs.values() if job['status'] in ('done', 'failed')),
+            key=lambda job: job['finished_at']
+        )
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job['id']]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_EVENT_JOBS)]:
+            job['events'] = []
+
+    def _record_event(self, job_id, event):
+        with self.lock:
+            self.jobs[job_id]['events'].append(event)
+            progress = self.jobs[job_id]['progress']
+            if event['event'] == 'chunk_started':
+                progress['chunks_total'] = event['total']
+            elif event['event'] in ('chunk_done', 'chunk_failed'):
+                progress['chunks_done'] += 1
+
+    def run_forever(self):
+        global EVENT_LISTENER
+        while True:
+            job_id = self.pending.get()
+            with self.lock:
+                job = self.jobs[job_id]
+                job['status'] = 'running'
+                job['started_at'] = time.time()
+            print(f"[WORKER] Job {job_id}: {job['subject']} - {job['chapter']}")
+            EVENT_LISTENER = lambda event: self._record_event(job_id, event)
+            try:
+                result = process_pdf_for_subject_chapter(job['subject'], job['chapter'], **job['options'])
+                status, error = ('done', None) if result else ('failed', 'No content generated')
+            except Exception as e:
+                print(f"[ERROR] Job {job_id} failed: {e}")
+                result, status, error = None, 'failed', str(e)
+            finally:
+                EVENT_LISTENER = None
+            with self.lock:
+                job['status'] = status
+                job['error'] = error
+                job['finished_at'] = time.time()
+                if result:
+                    job['result'] = {key: result[key] for key in ('total_flashcards', 'total_quizzes')}
+            print(f"[WORKER] Job {job_id} {status} in {job['finished_at'] - job['started_at']:.1f}s")
+            gc.collect()
+
+def _make_handler(jobs):
+    class WorkerHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {'status': 'ok', 'jobs': jobs.summary()})
+            elif self.path.startswith('/jobs/'):
+                url = urlsplit(self.path)
+                events_after = parse_qs(url.query).get('events_after')
+                try:
+                    events_after = int(events_after[0]) if events_after else None
+                except ValueError:
+                    self._send_json(400, {'error': 'events_after must be a number'})
+                    return
+                job = jobs.snapshot(url.path[len('/jobs/'):], events_after)
+                if job is None:
+                    self._send_json(404, {'error': 'Unknown job'})
+                else:
+                    self._send_json(200, job)
+            else:
+                self._send_json(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            if self.path != '/jobs':
+                self._send_json(404, {'error': 'Not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._send_json(400, {'error': 'Invalid JSON body'})
+                return
+            subject, chapter = payload.get('subject'), payload.get('chapter')
+            if not subject or not chapter:
+                self._send_json(400, {'error': 'Subject and chapter are required'})
+                return
+            options = {'max_chunks': payload.get('max_chunks'), 'concurrency': payload.get('concurrency'),
+                       'generation': payload.get('generation')}
+            self._send_json(202, jobs.submit(subject, chapter, options))
+
+        def log_message(self, format, *args):
+            # Job progress is already logged; skip per-request access lines
+            pass
+
+    return WorkerHandler
+
+def serve(host=WORKER_HOST, port=WORKER_PORT, workers=None):
+    """Run the resident worker: POST /jobs, GET /jobs/<id>[?events_after=N], GET /health"""
+    global EXTRACT_POOL
+    workers = max(1, workers or EXTRACT_WORKERS)
+    if workers > 1:
+        EXTRACT_POOL = _new_extract_pool(workers)
+    jobs = JobQueue()
+    threading.Thread(target=jobs.run_forever, name='pdf-job-worker', daemon=True).start()
+    server = ThreadingHTTPServer((host, port), _make_handler(jobs))
+    print(f"[WORKER] Listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[WORKER] Shutting down")
+    finally:
+        server.server_close()
+        if EXTRACT_POOL:
+            EXTRACT_POOL.shutdown(cancel_futures=True)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Process PDF and generate quizzes/flashcards')
-    parser.add_argument('--subject', required=True, help='Subject name')
-    parser.add_argument('--chapter', required=True, help='Chapter name')
+    parser.add_argument('--subject', help='Subject name')
+    parser.add_argument('--chapter', help='Chapter name')
+    parser.add_argument('--all', action='store_true',
+                        help='Generate content for every chapter in the library, skipping up-to-date ones')
+    parser.add_argument('--subjects', nargs='+', metavar='SUBJECT',
+                        help='Like --all, but only for these subjects')
+    parser.add_argument('--force', action='store_true',
+                        help='With --all/--subjects, regenerate chapters that are already up to date')
+    parser.add_argument('--serve', action='store_true',
+                        help='Run as a resident worker that takes jobs over HTTP instead of processing one chapter')
+    parser.add_argument('--host', default=WORKER_HOST, help='Worker mode bind address')
+    parser.add_argument('--port', type=int, default=WORKER_PORT, help='Worker mode port')
+    parser.add_argument('--workers', type=int, default=EXTRACT_WORKERS,
+                        help='Worker processes for page text extraction (default: PDF_EXTRACT_WORKERS or CPU count)')
+    parser.add_argument('--concurrency', type=int, default=LLM_CONCURRENCY,
+                        help='Concurrent Ollama requests (default: OLLAMA_NUM_PARALLEL or 4)')
+    parser.add_argument('--max-chunks', type=int, default=None,
+                        help='Only generate content for the first N chunks (default: all)')
+    parser.add_argument('--generation', choices=GENERATION_MODES, default=GENERATION_MODE,
+                        help='json: flashcards and quizzes straight from JSON-mode output; '
+                             'prose: cut them out of a free-text analysis (default: PDF_GENERATION_MODE or json)')
+    parser.add_argument('--no-llm-cache', action='store_true',
+                        help='Ignore cached model responses and regenerate every chunk')
+    parser.add_argument('--stream', action='store_true',
+                        help='Emit NDJSON progress events (chunks, tokens, flashcards) on stdout')
     
     args = parser.parse_args()
+    if args.no_llm_cache:
+        LLM_CACHE.bypass = True
+    if args.serve:
+        serve(args.host, args.port, workers=args.workers)
+        sys.exit(0)
+    if args.all or args.subjects:
+        summary = process_library(args.subjects, workers=args.workers, concurrency=args.concurrency,
+                                  generation=args.generation, force=args.force, max_chunks=args.max_chunks)
+        if summary['failed']:
+            print(f"[ERROR] Failed chapters: {', '.join(summary['failed'])}")
+            sys.exit(1)
+        sys.exit(0)
+    if not args.subject or not args.chapter:
+        parser.error('--subject and --chapter are required unless --all, --subjects or --serve is given')
+    if args.stream:
+        # stdout carries only events; the usual log lines move to stderr
+        EVENT_STREAM = sys.stdout
+        sys.stdout = sys.stderr
     
     # Process the specific subject and chapter
-    result = process_pdf_for_subject_chapter(args.subject, args.chapter)
+    result = process_pdf_for_subject_chapter(args.subject, args.chapter, workers=args.workers,
+                                             max_chunks=args.max_chunks, concurrency=args.concurrency,
+                                             generation=args.generation)
     
     if result:
         print(f"[SUCCESS] Successfully processed {args.subject} - {args.chapter}")
         print(f"[INFO] Generated {result['total_flashcards']} flashcards and {result['total_quizzes']} quizzes")
     else:
         print(f"[ERROR] Failed to process {args.subject} - {args.chapter}")
+        emit_event("error", message=f"Failed to process {args.subject} - {args.chapter}")
         sys.exit(1) 
\ No newline at end of file
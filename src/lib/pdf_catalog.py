@@ -0,0 +1,191 @@
+"""
+Index of the chapter PDFs under a books/ tree.
+
+Each <subject>/<chapter>.pdf is recorded with its path, page count, size,
+mtime and SHA-256, in a JSON file under .cache/. A refresh re-reads only the
+subject directories whose mtime changed (a file was added, removed or
+renamed), and a lookup re-stats the one file it returns, so a PDF
+overwritten in place is re-indexed too. Lookups are dictionary hits, and
+the stored hash saves the extraction cache from re-hashing the PDF.
+
+    python pdf_catalog.py ../../genrate/books
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import tempfile
+import threading
+
+from extraction_cache import hash_file
+
+try:
+    import fitz  # PyMuPDF, only for page counts
+except ImportError:
+    fitz = None
+
+CATALOG_DIR = os.environ.get(
+    'PDF_CATALOG_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'catalog')
+)
+CATALOG_VERSION = 1
+
+def _page_count(path):
+    if fitz is None:
+        return None
+    try:
+        with fitz.open(path) as doc:
+            return doc.page_count
+    except Exception as e:
+        print(f"[WARNING] Could not count pages of {path}: {e}")
+        return None
+
+class PdfCatalog:
+    """Incrementally refreshed subject -> chapter -> PDF metadata index"""
+
+    def __init__(self, books_dir, catalog_dir=CATALOG_DIR):
+        self.books_dir = os.path.abspath(books_dir)
+        key = hashlib.sha256(self.books_dir.encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(catalog_dir, f"{key}.json")
+        self.lock = threading.Lock()
+        self.dirs = {}      # subject -> directory mtime_ns when last listed
+        self.entries = {}   # subject -> {chapter: entry}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if saved.get('version') == CATALOG_VERSION and saved.get('books_dir') == self.books_dir:
+            self.dirs = saved['dirs']
+            self.entries = saved['entries']
+
+    def _save(self):
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': CATALOG_VERSION, 'books_dir': self.books_dir,
+                           'dirs': self.dirs, 'entries': self.entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"[WARNING] Could not save PDF catalog: {e}")
+
+    def _index_file(self, subject, name, stat, previous=None):
+        if previous and previous['size'] == stat.st_size and previous['mtime'] == stat.st_mtime_ns:
+            return previous
+        path = os.path.join(self.books_dir, subject, name)
+        self.dirty = True
+        return {
+            'subject': subject,
+            'chapter': os.path.splitext(name)[0],
+            'path': os.path.join(subject, name),
+            'pages': _page_count(path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'sha256': hash_file(path),
+        }
+
+    def _scan_subject(self, subject):
+        directory = os.path.join(self.books_dir, subject)
+        previous = self.entries.get(subject, {})
+        chapters = {}
+        for name in os.listdir(directory):
+            if not name.lower().endswith('.pdf'):
+                continue
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except OSError:
+                continue
+            chapter = os.path.splitext(name)[0]
+            chapters[chapter] = self._index_file(subject, name, stat, previous.get(chapter))
+        if chapters.keys() != previous.keys():
+            self.dirty = True
+        self.entries[subject] = chapters
+
+    def refresh(self):
+        """Re-read the subject directories that changed since the last refresh"""
+        with self.lock:
+            try:
+                subjects = [name for name in os.listdir(self.books_dir)
+                            if os.path.isdir(os.path.join(self.books_dir, name))]
+            except OSError:
+                subjects = []
+            for subject in set(self.entries) - set(subjects):
+                del self.entries[subject]
+                self.dirs.pop(subject, None)
+                self.dirty = True
+            for subject in subjects:
+                try:
+                    mtime = os.stat(os.path.join(self.books_dir, subject)).st_mtime_ns
+                    if self.dirs.get(subject) != mtime or subject not in self.entries:
+                        self._scan_subject(subject)
+                        self.dirs[subject] = mtime
+                        self.dirty = True
+                except OSError as e:
+                    print(f"[WARNING] Could not index {subject}: {e}")
+            self._save()
+
+    def _current(self, entry):
+        # Overwriting a PDF in place leaves its directory's mtime alone, so check the file itself
+        name = os.path.basename(entry['path'])
+        try:
+            stat = os.stat(os.path.join(self.books_dir, entry['path']))
+        except OSError:
+            return None
+        fresh = self._index_file(entry['subject'], name, stat, entry)
+        if fresh is not entry:
+            self.entries[entry['subject']][entry['chapter']] = fresh
+            self._save()
+        return dict(fresh, path=os.path.join(self.books_dir, fresh['path']))
+
+    def subjects(self):
+        self.refresh()
+        return sorted(self.entries)
+
+    def chapters(self, subject):
+        self.refresh()
+        return sorted(self.entries.get(subject, {}))
+
+    def entries_for(self, subjects=None):
+        """All entries (absolute paths) for the given subjects, or every subject"""
+        self.refresh()
+        with self.lock:
+            return [
+                dict(entry, path=os.path.join(self.books_dir, entry['path']))
+                for subject in sorted(subjects or self.entries)
+                for _, entry in sorted(self.entries.get(subject, {}).items())
+            ]
+
+    def find(self, subject, chapter):
+        """Entry for a chapter (exact name, else the first file containing it), or None"""
+        self.refresh()
+        with self.lock:
+            chapters = self.entries.get(subject, {})
+            entry = chapters.get(chapter)
+            if entry is None:
+                wanted = chapter.lower()
+                entry = next((entry for name, entry in sorted(chapters.items()) if wanted in name.lower()), None)
+            return self._current(entry) if entry else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Index the chapter PDFs under a books directory")
+    parser.add_argument("books_dir")
+    args = parser.parse_args()
+
+    catalog = PdfCatalog(args.books_dir)
+    entries = catalog.entries_for()
+    for entry in entries:
+        print(f"{entry['subject']:<24} {entry['chapter']:<16} {entry['pages'] or '?':>4} pages "
+              f"{entry['size'] / 1024:8.0f} KB  {entry['sha256'][:12]}")
+    print(f"[INFO] {len(entries)} chapters in {len(catalog.entries)} subjects; index at {catalog.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Token-budgeted text chunker shared by pdfProcessor.py and the genrate/
+script generators.
+
+Chunks are sized by an estimated token count rather than characters, end
+at the best paragraph, sentence or word break inside the budget, and
+overlap the previous chunk by a configurable number of tokens. Spans are
+yielded as (start, end) offsets into the source, so the text itself is only
+sliced when a chunk is actually sent to the model.
+
+    python text_chunker.py --benchmark ../../genrate/books
+"""
+
+import os
+import time
+import argparse
+
+# Target chunk size and overlap, in estimated tokens
+CHUNK_TOKENS = int(os.environ.get('CHUNK_TOKENS', 1024))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get('CHUNK_OVERLAP_TOKENS', 64))
+# Gemma's tokenizer averages about 4 characters per token on English text
+# and far fewer on Devanagari, so the two are estimated separately
+ASCII_CHARS_PER_TOKEN = 4.0
+OTHER_CHARS_PER_TOKEN = 1.5
+# A chunk may end at a break no earlier than this fraction of its budget
+MIN_FILL = 0.6
+# Characters sampled to estimate a document's token density
+DENSITY_SAMPLE = 64 * 1024
+
+# Break points, best first: paragraph, sentence, line, word
+BREAKS = (
+    ('\n\n',),
+    ('.\n', '?\n', '!\n', '। ', '. ', '? ', '! ', '।\n'),
+    ('\n',),
+    (' ',),
+)
+
+def estimate_tokens(text):
+    """Rough token count for a prompt or chunk"""
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    return int(ascii_chars / ASCII_CHARS_PER_TOKEN + (len(text) - ascii_chars) / OTHER_CHARS_PER_TOKEN + 0.5)
+
+def chars_per_token(text):
+    """Average characters per estimated token, measured on the start of the text"""
+    sample = text[:DENSITY_SAMPLE]
+    tokens = estimate_tokens(sample)
+    return len(sample) / tokens if tokens else ASCII_CHARS_PER_TOKEN
+
+def chunk_budget(context_tokens, template, reserve_tokens):
+    """Tokens left for chunk text once the prompt template and the reply are accounted for"""
+    return max(128, context_tokens - estimate_tokens(template.replace('{text}', '')) - reserve_tokens)
+
+def _find_break(text, low, high):
+    # Bounded rfind scans only the tail of the window and copies nothing
+    for separators in BREAKS:
+        best = -1
+        for separator in separators:
+            found = text.rfind(separator, low, high)
+            if found >= 0:
+                best = max(best, found + len(separator))
+        if best > low:
+            return best
+    return high
+
+def _find_resume(text, low, high):
+    # First break at or after low that starts the next chunk before high; the
+    # break the previous chunk ended on sits at high and is never picked
+    for separators in BREAKS:
+        best = high
+        for separator in separators:
+            found = text.find(separator, low, high)
+            if found >= 0:
+                best = min(best, found + len(separator))
+        if best < high:
+            return best
+    return high
+
+def _skip_space(text, pos, end):
+    while pos < end and text[pos].isspace():
+        pos += 1
+    return pos
+
+def iter_chunk_spans(text, max_tokens=CHUNK_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """Yield (start, end) offsets of chunks of at most about max_tokens tokens"""
+    length = len(text)
+    density = chars_per_token(text)
+    max_chars = max(1, int(max_tokens * density))
+    overlap = min(int(max(0, overlap_tokens) * density), max_chars // 2)
+    start = _skip_space(text, 0, length)
+    while start < length:
+        end = min(start + max_chars, length)
+        # The density comes from the start of the document; shrink windows in a
+        # denser script (English front matter, then Devanagari) to fit the budget
+        tokens = estimate_tokens(text[start:end])
+        while tokens > max_tokens and end - start > 1:
+            end = start + max(1, int((end - start) * max_tokens / tokens))
+            tokens = estimate_tokens(text[start:end])
+        if end < length:
+            end = _find_break(text, start + int((end - start) * MIN_FILL), end)
+        stop = end
+        while stop > start and text[stop - 1].isspace():
+            stop -= 1
+        yield start, stop
+        if end >= length:
+            return
+        next_start = end
+        if overlap:
+            # Begin the overlap on a sentence or word boundary, never mid-word
+            next_start = _find_resume(text, end - overlap, end)
+        start = _skip_space(text, max(next_start, start + 1), length)
+
+def iter_chunks(text, max_tokens=CHUNK_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """Yield chunk strings; see iter_chunk_spans"""
+    for start, end in iter_chunk_spans(text, max_tokens, overlap_tokens):
+        yield text[start:end]
+
+# --- Benchmark ---
+def _legacy_char_chunks(text, max_chars, overlap):
+    # pdfProcessor's old 1000/100 chunker, which tried four rfinds per chunk.
+    # It never stopped at the end of the text; this copy does.
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + max_chars, length)
+        if end < length:
+            chunk = text[start:end]
+            best_end = max(chunk.rfind('.'), chunk.rfind('?'), chunk.rfind('!'), chunk.rfind('\n'))
+            if best_end > max_chars * 0.7:
+                end = start + best_end + 1
+        yield start, end
+        if end >= length:
+            return
+        start = end - overlap
+
+def _legacy_window_chunks(text, max_chars, overlap):
+    # pdf_script's old fixed 4500/700 window
+    start = 0
+    while start < len(text):
+        yield start, min(start + max_chars, len(text))
+        start += max_chars - overlap
+
+def _fitz_pages(pdf_path):
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        return [page.get_text() for page in doc]
+
+def _read_source(path):
+    if not path.lower().endswith('.pdf'):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    from extraction_cache import cached_extract_pages
+    return '\n'.join(cached_extract_pages(path, 'fitz', 1, _fitz_pages))
+
+def _collect(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.lower().endswith('.pdf'))
+        else:
+            files.append(path)
+    return files
+
+def benchmark(paths, context_tokens, reserve_tokens, template_tokens):
+    budget = context_tokens - template_tokens - reserve_tokens
+    texts = [_read_source(path) for path in _collect(paths)]
+    total_chars = sum(len(text) for text in texts)
+    print(f"[BENCH] {len(texts)} documents, {total_chars} chars, "
+          f"~{sum(estimate_tokens(t) for t in texts)} tokens; {budget}-token chunk budget")
+    strategies = (
+        # name, span generator, chars actually sent per chunk
+        ('token-aware', lambda t: iter_chunk_spans(t, budget, CHUNK_OVERLAP_TOKENS), None),
+        ('old pdfProcessor', lambda t: _legacy_char_chunks(t, 1000, 100), 800),
+        ('old pdf_script', lambda t: _legacy_window_chunks(t, 4500, 700), None),
+    )
+    for name, spans, sent_limit in strategies:
+        started = time.perf_counter()
+        chunks = sent = tokens = 0
+        for text in texts:
+            for start, end in spans(text):
+                end = min(end, start + sent_limit) if sent_limit else end
+                chunks += 1
+                sent += end - start
+                tokens += estimate_tokens(text[start:end])
+        elapsed = time.perf_counter() - started
+        fill = tokens / (chunks * budget) * 100 if chunks else 0
+        print(f"  {name:<17} {chunks:>6} model calls  {tokens / max(chunks, 1):7.0f} tokens/call "
+              f"({fill:5.1f}% of budget)  {sent / max(total_chars, 1) * 100:6.1f}% of text sent  "
+              f"{total_chars / elapsed / 1e6 if elapsed else 0:7.1f} Mchars/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Split text into token-budgeted chunks")
+    parser.add_argument("paths", nargs="+", help="Text files, PDFs or directories of PDFs")
+    parser.add_argument("--max-tokens", type=int, default=CHUNK_TOKENS)
+    parser.add_argument("--overlap-tokens", type=int, default=CHUNK_OVERLAP_TOKENS)
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare model calls per book against the old character chunkers")
+    parser.add_argument("--context-tokens", type=int, default=4096, help="Model context window for --benchmark")
+    parser.add_argument("--reserve-tokens", type=int, default=1024, help="Tokens kept free for the reply")
+    parser.add_argument("--template-tokens", type=int, default=150, help="Tokens used by the prompt template")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.paths, args.context_tokens, args.reserve_tokens, args.template_tokens)
+        return
+    for path in _collect(args.paths):
+        text = _read_source(path)
+        for index, (start, end) in enumerate(iter_chunk_spans(text, args.max_tokens, args.overlap_tokens), 1):
+            print(f"{path} chunk {index}: chars {start}-{end}, ~{estimate_tokens(text[start:end])} tokens")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the chatbot answer cache in src/components/answer_cache.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'components'))
+from answer_cache import AnswerCache, normalize
+from interaction_log import InteractionLogger
+
+def _cache(**options):
+    cache_dir = tempfile.mkdtemp()
+    return cache_dir, AnswerCache(path=os.path.join(cache_dir, 'answers.json'), **options)
+
+def test_exact_and_similar_matches():
+    """Rephrased questions hit the cache; different questions miss"""
+    cache_dir, cache = _cache()
+    try:
+        cache.put("What is photosynthesis?", "How plants make food.")
+        assert cache.get("what is   PHOTOSYNTHESIS") == ("How plants make food.", "exact")
+        assert cache.get("Can you explain photosynthesis please?") == ("How plants make food.", "similar")
+        assert cache.get("What is respiration?") is None
+    finally:
+        shutil.rmtree(cache_dir)
+
+def test_numbers_need_exact_match():
+    """Questions with numbers only match exactly"""
+    cache_dir, cache = _cache()
+    try:
+        cache.put("What is 2 + 3?", "5")
+        assert cache.get("what is 2+3") == ("5", "exact")
+        assert cache.get("What is 2 + 5?") is None
+    finally:
+        shutil.rmtree(cache_dir)
+
+def test_lru_bound_and_persistence():
+    """The cache keeps the most recently used entries and reloads them from disk"""
+    cache_dir, cache = _cache(max_entries=2)
+    try:
+        cache.put("Why is the sky blue?", "Scattering.")
+        cache.put("Why is grass green?", "Chlorophyll.")
+        cache.get("Why is the sky blue?")
+        cache.put("Why do stars twinkle?", "The air moves.")
+        assert cache.get("Why is grass green?") is None
+        cache.save()
+        reloaded = AnswerCache(path=cache.path, max_entries=2)
+        assert reloaded.get("Why is the sky blue?") == ("Scattering.", "exact")
+        assert normalize("Why is the sky blue?") in reloaded.entries
+    finally:
+        shutil.rmtree(cache_dir)
+
+def test_follow_up_answers_not_cached():
+    """Answers given with conversation history are not stored for other users' fresh questions"""
+    import gemma3n
+    cache_dir, cache = _cache()
+    saved = gemma3n.ANSWER_CACHE, gemma3n.INTERACTION_LOG, gemma3n.stream_response
+    replies = iter(["France is a country in Europe.", "Its capital is Paris.", "Which country do you mean?"])
+
+    def fake_stream_response(prompt, session_id=None):
+        reply = next(replies)
+        gemma3n.SESSIONS.append(session_id, prompt, reply)
+        yield reply
+
+    gemma3n.ANSWER_CACHE = cache
+    gemma3n.INTERACTION_LOG = InteractionLogger(path=os.path.join(cache_dir, 'chat.jsonl'))
+    gemma3n.stream_response = fake_stream_response
+    try:
+        gemma3n.answer("Tell me about France", session_id="first")
+        assert gemma3n.answer("And what about its capital?", session_id="first") == "Its capital is Paris."
+        assert cache.get("And what about its capital?") is None
+        # The same words as a first question reach the model instead of the other conversation's answer
+        assert gemma3n.answer("And what about its capital?", session_id="second") == "Which country do you mean?"
+        assert cache.get("Tell me about France") == ("France is a country in Europe.", "exact")
+    finally:
+        gemma3n.INTERACTION_LOG.close()
+        gemma3n.ANSWER_CACHE, gemma3n.INTERACTION_LOG, gemma3n.stream_response = saved
+        gemma3n.SESSIONS.reset("first")
+        gemma3n.SESSIONS.reset("second")
+        shutil.rmtree(cache_dir)
+
+if __name__ == "__main__":
+    tests = [test_exact_and_similar_matches, test_numbers_need_exact_match, test_lru_bound_and_persistence,
+             test_follow_up_answers_not_cached]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+    sys.exit(1 if failed else 0)
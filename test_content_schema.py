@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the JSON-mode reply checks in src/lib/content_schema.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'lib'))
+from content_schema import ContentError, JsonStreamChecker, parse_reply, validate_content
+
+def _quiz(**fields):
+    quiz = {"question": "Which part of the plant makes food?", "options": ["Root", "Leaf", "Stem"], "answer": 1}
+    quiz.update(fields)
+    return quiz
+
+def test_answer_normalisation():
+    """Answers given as option text or digit strings become option indexes"""
+    data = {"quizzes": [_quiz(answer="Leaf"), _quiz(answer=" Stem "), _quiz(answer="0"), _quiz(answer=2)]}
+    _, quizzes, problems = validate_content(data, "Science", "Plants")
+    assert [quiz['answer'] for quiz in quizzes] == [1, 2, 0, 2]
+    assert not problems
+
+def test_invalid_answers_dropped():
+    """Out-of-range, boolean and unknown answers drop the quiz and are reported"""
+    data = {"quizzes": [_quiz(answer=3), _quiz(answer=True), _quiz(answer="Flower"), _quiz()]}
+    _, quizzes, problems = validate_content(data, "Science", "Plants")
+    assert len(quizzes) == 1 and len(problems) == 3
+    assert all(problem.startswith("quizzes[") for problem in problems)
+
+def test_defaults_filled_in():
+    """Difficulty falls back to easy, points to 10, and subject/category come from the chapter"""
+    data = {
+        "flashcards": [{"front": " What is  a leaf? ", "back": "Where food is made", "difficulty": "Impossible"}],
+        "quizzes": [_quiz(difficulty="HARD", points=-5)],
+    }
+    flashcards, quizzes, _ = validate_content(data, "Science", "Plants")
+    assert flashcards[0] == {"front": "What is a leaf?", "back": "Where food is made",
+                             "subject": "Science", "category": "Plants", "difficulty": "easy"}
+    assert quizzes[0]['difficulty'] == "hard" and quizzes[0]['points'] == 10
+
+def test_nothing_usable_raises():
+    """A reply without a single valid item raises ContentError"""
+    for data in ({}, {"flashcards": "none"}, {"quizzes": [_quiz(options=["Only one"])]}):
+        try:
+            validate_content(data, "Science", "Plants")
+        except ContentError:
+            continue
+        raise AssertionError(f"accepted {data}")
+
+def test_stream_checker():
+    """The stream checker stops at the closing brace and rejects non-objects early"""
+    checker = JsonStreamChecker()
+    assert not checker.feed('  {"a": "}{", "b": [')
+    assert checker.feed('1, {"c": 2}]} trailing')
+    for text in ('Sure! Here is', ' ' * 300):
+        try:
+            JsonStreamChecker().feed(text)
+        except ContentError:
+            continue
+        raise AssertionError(f"accepted {text[:20]!r}")
+    try:
+        parse_reply('[1, 2]')
+    except ContentError:
+        pass
+    else:
+        raise AssertionError("accepted a JSON list")
+
+if __name__ == "__main__":
+    tests = [test_answer_normalisation, test_invalid_answers_dropped, test_defaults_filled_in,
+             test_nothing_usable_raises, test_stream_checker]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+    sys.exit(1 if failed else 0)
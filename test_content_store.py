@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the content files and manifest in src/lib/content_store.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'lib'))
+from content_store import write_chapter_content, load_manifest, rebuild_manifest, is_up_to_date
+
+FLASHCARDS = [{"front": "Sun", "back": "A star", "subject": "Science", "category": "Space", "difficulty": "easy"}]
+QUIZZES = [{"question": "Is the sun a star?", "options": ["Yes", "No"], "answer": 0, "hint": "",
+            "subject": "Science", "difficulty": "easy", "points": 10}]
+SOURCE = {"sha256": "abc", "generation": "json", "model": "gemma3n", "prompt": "p1", "chunk_tokens": 1024}
+
+def _write(args):
+    scripts_dir, index = args
+    write_chapter_content(scripts_dir, "Science", f"Chapter{index}", FLASHCARDS, QUIZZES)
+
+def test_chapter_file_and_manifest():
+    """A chapter is written with item ids and recorded in the manifest with its counts"""
+    scripts_dir = tempfile.mkdtemp()
+    try:
+        path = write_chapter_content(scripts_dir, "Science", "Space", FLASHCARDS, QUIZZES, SOURCE)
+        with open(path, encoding='utf-8') as f:
+            content = json.load(f)
+        assert content['flashcards'][0]['id'] == 1 and content['quizzes'][0]['id'] == 1
+        entry = load_manifest(scripts_dir)['chapters']['Science_Space']
+        assert entry['total_flashcards'] == 1 and entry['total_quizzes'] == 1
+        assert entry['file_path'] == "Science_Space_content.json" and entry['source'] == SOURCE
+    finally:
+        shutil.rmtree(scripts_dir)
+
+def test_up_to_date_detection():
+    """A chapter is up to date only when its recorded source matches exactly"""
+    scripts_dir = tempfile.mkdtemp()
+    try:
+        write_chapter_content(scripts_dir, "Science", "Space", FLASHCARDS, QUIZZES, SOURCE)
+        write_chapter_content(scripts_dir, "Science", "Partial", FLASHCARDS, QUIZZES, None)
+        manifest = load_manifest(scripts_dir)
+        assert is_up_to_date(manifest, "Science", "Space", dict(SOURCE))
+        assert not is_up_to_date(manifest, "Science", "Space", dict(SOURCE, sha256="changed"))
+        assert not is_up_to_date(manifest, "Science", "Space", dict(SOURCE, model="other"))
+        assert not is_up_to_date(manifest, "Science", "Partial", SOURCE)
+        assert not is_up_to_date(manifest, "Science", "Missing", SOURCE)
+        assert not is_up_to_date(None, "Science", "Space", SOURCE)
+    finally:
+        shutil.rmtree(scripts_dir)
+
+def test_rebuild_manifest():
+    """--rebuild recreates the manifest from the chapter files on disk"""
+    scripts_dir = tempfile.mkdtemp()
+    try:
+        write_chapter_content(scripts_dir, "Science", "Space", FLASHCARDS, QUIZZES, SOURCE)
+        os.remove(os.path.join(scripts_dir, "manifest.json"))
+        assert load_manifest(scripts_dir) is None
+        manifest = rebuild_manifest(scripts_dir)
+        assert manifest['chapters']['Science_Space']['source'] == SOURCE
+    finally:
+        shutil.rmtree(scripts_dir)
+
+def test_concurrent_writers():
+    """Chapters written from several processes at once all end up in the manifest"""
+    scripts_dir = tempfile.mkdtemp()
+    try:
+        with Pool(4) as pool:
+            pool.map(_write, [(scripts_dir, index) for index in range(40)])
+        assert len(load_manifest(scripts_dir)['chapters']) == 40
+    finally:
+        shutil.rmtree(scripts_dir)
+
+if __name__ == "__main__":
+    tests = [test_chapter_file_and_manifest, test_up_to_date_detection, test_rebuild_manifest,
+             test_concurrent_writers]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the extracted page text cache in src/lib/extraction_cache.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'lib'))
+import extraction_cache
+
+def _with_cache_dir(test):
+    def run():
+        cache_dir = tempfile.mkdtemp()
+        saved = extraction_cache.CACHE_DIR, extraction_cache.CACHE_DISABLED
+        extraction_cache.CACHE_DIR, extraction_cache.CACHE_DISABLED = cache_dir, False
+        try:
+            test(cache_dir)
+        finally:
+            extraction_cache.CACHE_DIR, extraction_cache.CACHE_DISABLED = saved
+            shutil.rmtree(cache_dir)
+    run.__doc__ = test.__doc__
+    run.__name__ = test.__name__
+    return run
+
+def _pdf(cache_dir, name, data):
+    path = os.path.join(cache_dir, name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+@_with_cache_dir
+def test_hit_by_content(cache_dir):
+    """A renamed copy of the same bytes hits the cache; another extractor version misses"""
+    calls = []
+    def extract(path):
+        calls.append(path)
+        return ['page one', 'page two']
+    first = _pdf(cache_dir, 'a.pdf', b'%PDF same bytes')
+    copy = _pdf(cache_dir, 'b.pdf', b'%PDF same bytes')
+    assert extraction_cache.cached_extract_pages(first, 'plumber', 1, extract) == ['page one', 'page two']
+    assert extraction_cache.cached_extract_pages(copy, 'plumber', 1, extract) == ['page one', 'page two']
+    assert calls == [first]
+    extraction_cache.cached_extract_pages(copy, 'plumber', 2, extract)
+    assert calls == [first, copy]
+
+@_with_cache_dir
+def test_empty_extraction_not_cached(cache_dir):
+    """An extraction with no text is retried next time instead of being cached"""
+    calls = []
+    def extract(path):
+        calls.append(path)
+        return ['', '  ']
+    pdf = _pdf(cache_dir, 'scan.pdf', b'%PDF scanned')
+    extraction_cache.cached_extract_pages(pdf, 'plumber', 1, extract)
+    extraction_cache.cached_extract_pages(pdf, 'plumber', 1, extract)
+    assert len(calls) == 2
+
+@_with_cache_dir
+def test_eviction_keeps_recent(cache_dir):
+    """Eviction drops the least recently used entries first"""
+    for index in range(3):
+        extraction_cache.store_pages(f"hash{index}", 'plumber', 1, ['x' * 1000])
+        time.sleep(0.02)
+    assert extraction_cache.load_pages('hash0', 'plumber', 1) is not None  # now the most recent
+    extraction_cache.evict(2500)
+    assert extraction_cache.load_pages('hash0', 'plumber', 1) is not None
+    assert extraction_cache.load_pages('hash1', 'plumber', 1) is None
+
+if __name__ == "__main__":
+    tests = [test_hit_by_content, test_empty_extraction_not_cached, test_eviction_keeps_recent]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the chatbot interaction log in src/components/interaction_log.py
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'components'))
+from interaction_log import InteractionLogger
+
+def _read_jsonl(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+def test_records_written_on_close():
+    """Every logged record is in the file, in order, once the logger is closed"""
+    log_dir = tempfile.mkdtemp()
+    try:
+        logger = InteractionLogger(path=os.path.join(log_dir, 'chat.jsonl'))
+        for index in range(250):
+            logger.log({"question": f"q{index}"})
+        logger.close()
+        records = _read_jsonl(logger.path)
+        assert [record['question'] for record in records] == [f"q{index}" for index in range(250)]
+    finally:
+        shutil.rmtree(log_dir)
+
+def test_rotation_and_pruning():
+    """Full files are gzipped away, and only backup_count rotated files are kept"""
+    log_dir = tempfile.mkdtemp()
+    try:
+        logger = InteractionLogger(path=os.path.join(log_dir, 'chat.jsonl'), max_bytes=200, backup_count=2)
+        # Pausing between records lets each one go out as its own batch, with its own size check
+        for index in range(20):
+            logger.log({"question": f"q{index}", "answer": "x" * 60})
+            time.sleep(0.02)
+        logger.close()
+        backups = sorted(name for name in os.listdir(log_dir) if name.endswith('.gz'))
+        assert len(backups) == 2, backups
+        rotated = [record for name in backups for record in _read_jsonl(os.path.join(log_dir, name))]
+        live = _read_jsonl(logger.path)
+        assert live and live[-1]['question'] == 'q19'
+        assert all(record['answer'] == "x" * 60 for record in rotated + live)
+    finally:
+        shutil.rmtree(log_dir)
+
+if __name__ == "__main__":
+    tests = [test_records_written_on_close, test_rotation_and_pruning]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+    sys.exit(1 if failed else 0)
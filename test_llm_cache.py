@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the LLM response cache in src/lib/llm_cache.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'lib'))
+from llm_cache import LLMCache
+
+def _cache(**options):
+    cache_dir = tempfile.mkdtemp()
+    return cache_dir, LLMCache(path=os.path.join(cache_dir, 'responses.sqlite3'), **options)
+
+def test_keyed_by_model_template_and_text():
+    """A response is only served for the same model, prompt template and text"""
+    cache_dir, cache = _cache()
+    try:
+        cache.put('gemma3n', 'Summarise: {text}', 'plants', 'reply')
+        assert cache.get('gemma3n', 'Summarise: {text}', 'plants') == 'reply'
+        assert cache.get('gemma3n', 'Summarise: {text}', 'animals') is None
+        assert cache.get('gemma3n', 'Explain: {text}', 'plants') is None
+        assert cache.get('llama3', 'Summarise: {text}', 'plants') is None
+        assert (cache.hits, cache.misses) == (1, 3)
+    finally:
+        shutil.rmtree(cache_dir)
+
+def test_ttl_and_size_cap():
+    """Expired entries miss, and the least recently used go beyond max_entries"""
+    cache_dir, cache = _cache(ttl=0.05, max_entries=2)
+    try:
+        cache.put('m', 't', 'old', 'reply')
+        time.sleep(0.1)
+        assert cache.get('m', 't', 'old') is None
+        cache.ttl = 3600
+        for text in ('a', 'b', 'c'):
+            cache.put('m', 't', text, text.upper())
+            time.sleep(0.01)
+        assert cache.get('m', 't', 'a') is None
+        assert cache.get('m', 't', 'c') == 'C'
+    finally:
+        shutil.rmtree(cache_dir)
+
+def test_bypass_still_stores():
+    """A bypassed cache always misses but still records fresh responses"""
+    cache_dir, cache = _cache(bypass=True)
+    try:
+        cache.put('m', 't', 'x', 'reply')
+        assert cache.get('m', 't', 'x') is None
+        cache.bypass = False
+        assert cache.get('m', 't', 'x') == 'reply'
+    finally:
+        shutil.rmtree(cache_dir)
+
+if __name__ == "__main__":
+    tests = [test_keyed_by_model_template_and_text, test_ttl_and_size_cap, test_bypass_still_stores]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the chapter PDF index in src/lib/pdf_catalog.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'lib'))
+import fitz
+from pdf_catalog import PdfCatalog
+
+def _write_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {number + 1}")
+    doc.save(path)
+    doc.close()
+
+def _books():
+    root = tempfile.mkdtemp()
+    books_dir = os.path.join(root, 'books')
+    os.makedirs(os.path.join(books_dir, 'Science'))
+    _write_pdf(os.path.join(books_dir, 'Science', 'Chapter1.pdf'), 2)
+    _write_pdf(os.path.join(books_dir, 'Science', 'Chapter2.pdf'), 3)
+    return root, books_dir, os.path.join(root, 'catalog')
+
+def test_lookup():
+    """Chapters are found by exact name or substring, with page counts and hashes"""
+    root, books_dir, catalog_dir = _books()
+    try:
+        catalog = PdfCatalog(books_dir, catalog_dir=catalog_dir)
+        assert catalog.subjects() == ['Science']
+        assert catalog.chapters('Science') == ['Chapter1', 'Chapter2']
+        entry = catalog.find('Science', 'Chapter2')
+        assert entry['pages'] == 3 and entry['path'] == os.path.join(books_dir, 'Science', 'Chapter2.pdf')
+        assert len(entry['sha256']) == 64
+        assert catalog.find('Science', 'ter1')['chapter'] == 'Chapter1'
+        assert catalog.find('Science', 'Chapter9') is None
+    finally:
+        shutil.rmtree(root)
+
+def test_overwrite_in_place():
+    """A PDF overwritten in place is re-indexed on lookup, though its directory mtime is unchanged"""
+    root, books_dir, catalog_dir = _books()
+    try:
+        catalog = PdfCatalog(books_dir, catalog_dir=catalog_dir)
+        before = catalog.find('Science', 'Chapter1')
+        subject_dir = os.path.join(books_dir, 'Science')
+        dir_mtime = os.stat(subject_dir).st_mtime_ns
+        time.sleep(0.01)
+        with open(before['path'], 'r+b') as f:
+            data = f.read()
+            f.seek(0)
+            f.truncate()
+            f.write(data + b'\n% revised\n')
+        assert os.stat(subject_dir).st_mtime_ns == dir_mtime
+        after = catalog.find('Science', 'Chapter1')
+        assert after['sha256'] != before['sha256'] and after['size'] == before['size'] + 11
+        # The fresh entry is saved, so a new catalog sees it without re-hashing
+        assert PdfCatalog(books_dir, catalog_dir=catalog_dir).entries['Science']['Chapter1']['sha256'] == after['sha256']
+    finally:
+        shutil.rmtree(root)
+
+def test_added_and_removed_files():
+    """Adding or removing a chapter or subject shows up on the next refresh"""
+    root, books_dir, catalog_dir = _books()
+    try:
+        catalog = PdfCatalog(books_dir, catalog_dir=catalog_dir)
+        assert len(catalog.entries_for()) == 2
+        os.makedirs(os.path.join(books_dir, 'Maths'))
+        _write_pdf(os.path.join(books_dir, 'Maths', 'Numbers.pdf'), 1)
+        os.remove(os.path.join(books_dir, 'Science', 'Chapter2.pdf'))
+        assert [entry['chapter'] for entry in catalog.entries_for()] == ['Numbers', 'Chapter1']
+        assert [entry['chapter'] for entry in catalog.entries_for(['Science'])] == ['Chapter1']
+        shutil.rmtree(os.path.join(books_dir, 'Maths'))
+        assert catalog.subjects() == ['Science']
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    tests = [test_lookup, test_overwrite_in_place, test_added_and_removed_files]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script for the lesson script parser in genrate/script_parser.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'genrate'))
+from script_parser import parse_script
+
+SCRIPT = '''**Chunk 1: Plants**
+Scene 1: The Garden
+Pet: "Hello friends!"
+Child: "Hi Pet."
+**Pet:** “Plants make food
+from sunlight.
+
+Isn't that amazing?”
+Scene: Summary
+Pet: "Leaves are green." she smiles
+[Script for Chunk 2]
+Pet: "Roots drink water
+---
+Pet: ""
+'''
+
+def _parse():
+    return list(parse_script(SCRIPT.splitlines(keepends=True)))
+
+def test_speakers_and_text():
+    """Quoted lines are returned per speaker with whitespace collapsed and quotes removed"""
+    utterances = _parse()
+    assert [(u.speaker, u.text) for u in utterances] == [
+        ("Pet", "Hello friends!"),
+        ("Child", "Hi Pet."),
+        ("Pet", "Plants make food from sunlight. Isn't that amazing?"),
+        ("Pet", "Leaves are green."),
+        ("Pet", "Roots drink water"),
+    ]
+
+def test_chunk_scene_and_line_numbers():
+    """Each utterance records its chunk, scene and starting line"""
+    utterances = _parse()
+    assert [(u.chunk, u.scene, u.line) for u in utterances] == [
+        ("1", "The Garden", 3),
+        ("1", "The Garden", 4),
+        ("1", "The Garden", 5),
+        ("1", "Summary", 10),
+        ("2", None, 12),
+    ]
+
+if __name__ == "__main__":
+    tests = [test_speakers_and_text, test_chunk_scene_and_line_numbers]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+    sys.exit(1 if failed else 0)
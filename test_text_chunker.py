@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for the token-budgeted chunker in src/lib/text_chunker.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'lib'))
+from text_chunker import iter_chunk_spans, iter_chunks, estimate_tokens
+
+SAMPLE = ' '.join(
+    f"Sentence number {i} talks about plants and the sun." + ("\n\n" if i % 7 == 0 else "")
+    for i in range(600)
+)
+
+def test_chunks_overlap():
+    """Consecutive chunks share text when an overlap is requested"""
+    for text in (SAMPLE, 'hello world. ' * 2000):
+        spans = list(iter_chunk_spans(text, 300, 64))
+        assert len(spans) > 2
+        for (_, end), (next_start, _) in zip(spans, spans[1:]):
+            assert end > next_start, f"no overlap between chunks ending at {end} and starting at {next_start}"
+
+def test_chunks_cover_text():
+    """Every word of the text lands in some chunk, in order, and no chunk is over budget"""
+    spans = list(iter_chunk_spans(SAMPLE, 300, 64))
+    assert spans[0][0] == 0
+    assert spans[-1][1] == len(SAMPLE.rstrip())
+    for (start, end), (next_start, _) in zip(spans, spans[1:]):
+        assert start < next_start <= end + 1
+    for chunk in iter_chunks(SAMPLE, 300, 64):
+        assert estimate_tokens(chunk) <= 300
+
+def test_mixed_script_within_budget():
+    """English front matter followed by Devanagari still gives chunks within budget"""
+    text = SAMPLE * 3 + '\n\n' + 'पौधे सूरज की रोशनी से अपना भोजन बनाते हैं। ' * 3000
+    spans = list(iter_chunk_spans(text, 1000, 64))
+    assert spans[-1][1] == len(text.rstrip())
+    for start, end in spans:
+        assert estimate_tokens(text[start:end]) <= 1000, estimate_tokens(text[start:end])
+
+def test_no_overlap_when_disabled():
+    """With no overlap, each chunk starts after the previous one ends"""
+    spans = list(iter_chunk_spans(SAMPLE, 300, 0))
+    for (_, end), (next_start, _) in zip(spans, spans[1:]):
+        assert next_start >= end
+
+def test_chunks_end_on_breaks():
+    """Chunks end at a sentence or paragraph break rather than mid-word"""
+    for chunk in list(iter_chunks(SAMPLE, 300, 64))[:-1]:
+        assert chunk.endswith('.'), chunk[-20:]
+
+if __name__ == "__main__":
+    tests = [test_chunks_overlap, test_chunks_cover_text, test_mixed_script_within_budget,
+             test_no_overlap_when_disabled, test_chunks_end_on_breaks]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+    sys.exit(1 if failed else 0)
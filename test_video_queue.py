@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the video job queue in genrate/video_queue.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'genrate'))
+import video_queue
+
+def _with_queue_dir(test):
+    def run():
+        queue_dir = tempfile.mkdtemp()
+        saved = video_queue.QUEUE_DIR
+        video_queue.QUEUE_DIR = queue_dir
+        try:
+            test()
+        finally:
+            video_queue.QUEUE_DIR = saved
+            shutil.rmtree(queue_dir)
+    run.__doc__ = test.__doc__
+    run.__name__ = test.__name__
+    return run
+
+def _jobs(state):
+    return sorted(name[:-5] for name in os.listdir(video_queue._dir(state)) if name.endswith('.json'))
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+@_with_queue_dir
+def test_claim_in_submission_order():
+    """Jobs are claimed oldest first, once each, and stamped with the claiming pid"""
+    first = video_queue.submit('a.txt', 'a.mp4')
+    second = video_queue.submit('b.txt', 'b.mp4')
+    assert video_queue.read_status(first)['state'] == 'queued'
+    claimed = [video_queue.claim(), video_queue.claim(), video_queue.claim()]
+    assert [job and job['id'] for job in claimed] == sorted([first, second]) + [None]
+    assert claimed[0]['owner_pid'] == os.getpid()
+    assert _jobs('running') == sorted([first, second]) and not _jobs('pending')
+
+@_with_queue_dir
+def test_requeue_only_orphaned_jobs():
+    """Starting a pool requeues jobs of dead workers and leaves live ones running"""
+    live = video_queue.submit('live.txt', 'live.mp4')
+    orphan = video_queue.submit('orphan.txt', 'orphan.mp4')
+    jobs = {}
+    for _ in range(2):
+        job = video_queue.claim()
+        jobs[job['id']] = job
+    jobs[orphan]['owner_pid'] = _dead_pid()
+    video_queue._write_json(os.path.join(video_queue._dir('running'), f"{orphan}.json"), jobs[orphan])
+    video_queue.requeue_running()
+    assert _jobs('running') == [live]
+    assert _jobs('pending') == [orphan]
+
+@_with_queue_dir
+def test_supervise_requeues_and_restarts():
+    """A worker that dies mid-job is restarted and its job is run again"""
+    job_id = video_queue.submit('missing.txt', 'missing.mp4')
+    # Stands in for a worker killed after claiming: it exits holding the job
+    crashed = multiprocessing.Process(target=video_queue.claim)
+    crashed.start()
+    crashed.join()
+    assert _jobs('running') == [job_id]
+    processes = [crashed]
+    try:
+        video_queue.supervise(processes, 1, timeout=0)
+        assert processes[0] is not crashed and processes[0].is_alive()
+        deadline = time.time() + 10
+        while not _jobs('failed') and time.time() < deadline:
+            time.sleep(0.1)
+        assert _jobs('failed') == [job_id]
+        assert 'Script file not found' in video_queue.read_status(job_id)['error']
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+if __name__ == "__main__":
+    tests = [test_claim_in_submission_order, test_requeue_only_orphaned_jobs, test_supervise_requeues_and_restarts]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+    sys.exit(1 if failed else 0)